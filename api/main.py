@@ -0,0 +1,162 @@
+"""
+Servicio HTTP de scoring (FastAPI), independiente de Streamlit.
+
+    uvicorn api.main:app --host 0.0.0.0 --port 8000
+
+Configuración por variables de entorno:
+    MAX_BATCH_SIZE  filas máximas por micro-lote (64)
+    MAX_WAIT_MS     espera máxima para llenar un micro-lote (5 ms)
+    SCORING_WORKERS hilos que ejecutan el modelo (1)
+    METRICS_ENABLED 1 para activar la instrumentación y GET /metrics (0)
+    MODEL_WATCH     1 para recargar en caliente los .joblib de models/ (1)
+"""
+import asyncio
+import json
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from typing import Any, Dict, List
+
+import pandas as pd
+from fastapi import FastAPI, HTTPException
+from fastapi.responses import PlainTextResponse
+from pydantic import BaseModel
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from src.models.inference import ModelLoader, DEFAULT_THRESHOLD
+from src.models.registry import model_registry
+from src.models.microbatch import MicroBatcher, DEFAULT_MAX_BATCH_SIZE, DEFAULT_MAX_WAIT_MS
+from src.models.schema import SchemaValidationError
+
+MAX_BATCH_SIZE = int(os.getenv('MAX_BATCH_SIZE', DEFAULT_MAX_BATCH_SIZE))
+MAX_WAIT_MS = float(os.getenv('MAX_WAIT_MS', DEFAULT_MAX_WAIT_MS))
+SCORING_WORKERS = int(os.getenv('SCORING_WORKERS', 1))
+METRICS_ENABLED = os.getenv('METRICS_ENABLED', '0') == '1'
+MODEL_WATCH = os.getenv('MODEL_WATCH', '1') == '1'
+
+if METRICS_ENABLED:
+    model_registry.enable_metrics()
+
+
+def _score(df: pd.DataFrame) -> list:
+    """
+    Siempre con el campeón vigente: tras un hot-swap el siguiente lote ya usa el nuevo.
+    Modelo y calibración se toman juntos, una vez por lote: (probabilidad, calibrada, tramo) por fila.
+    """
+    loader = model_registry.get()
+    probabilities = loader.predict_proba_batch(df)
+    calibrator = loader.calibrator
+    calibrated = calibrator.calibrate(probabilities)
+    tiers = [calibrator.tier_labels[code] for code in calibrator.tier_codes(calibrated)]
+    return list(zip(probabilities.tolist(), calibrated.tolist(), tiers))
+
+
+class PredictRequest(BaseModel):
+    employee: Dict[str, Any]
+    threshold: float = DEFAULT_THRESHOLD
+
+
+class BatchPredictRequest(BaseModel):
+    employees: List[Dict[str, Any]]
+    threshold: float = DEFAULT_THRESHOLD
+
+
+executor = ThreadPoolExecutor(max_workers=SCORING_WORKERS)
+batcher = MicroBatcher(
+    _score,
+    max_batch_size=MAX_BATCH_SIZE,
+    max_wait_ms=MAX_WAIT_MS,
+    workers=SCORING_WORKERS,
+    executor=executor
+)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Cargar el modelo antes de aceptar tráfico, sin bloquear el event loop
+    await asyncio.get_running_loop().run_in_executor(executor, model_registry.get)
+    if MODEL_WATCH:
+        model_registry.start_watching()
+    await batcher.start()
+    yield
+    await batcher.stop()
+    model_registry.stop_watching()
+    executor.shutdown()
+
+
+app = FastAPI(title="Retention AI Scoring API", lifespan=lifespan)
+
+
+def _validation_error(e: SchemaValidationError) -> HTTPException:
+    """422 con la tabla de errores por fila (row / column / value / error)."""
+    errors = json.loads(e.errors.to_json(orient='records'))
+    return HTTPException(status_code=422, detail={"message": "Invalid input data", "errors": errors})
+
+
+def _server_error(e: Exception) -> HTTPException:
+    """Fallo del servicio (no de los datos de entrada): 500, sin culpar al cliente."""
+    print(f"❌ Error interno al puntuar: {type(e).__name__}: {e}")
+    return HTTPException(status_code=500, detail=f"Internal scoring error: {type(e).__name__}")
+
+
+def _result(scored: tuple, threshold: float) -> dict:
+    probability, calibrated, risk_tier = scored
+    prediction = int(probability >= threshold)
+    return {
+        "prediction": prediction,
+        "probability": probability,
+        "label": ModelLoader._label(prediction),
+        "calibrated_probability": calibrated,
+        "risk_tier": risk_tier
+    }
+
+
+@app.get("/health")
+async def health():
+    return {
+        "status": "ok",
+        "models": model_registry.versions().to_dict(orient='records'),
+        "micro_batches": batcher.batches,
+        "rows_scored": batcher.rows
+    }
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Métricas de inferencia en formato de texto de Prometheus."""
+    if not model_registry.metrics_enabled:
+        raise HTTPException(status_code=404, detail="Metrics disabled (set METRICS_ENABLED=1)")
+    return model_registry.enable_metrics().to_prometheus()
+
+
+@app.post("/predict")
+async def predict(request: PredictRequest):
+    """Un empleado. Las peticiones concurrentes se agrupan en micro-lotes."""
+    try:
+        scored = await batcher.submit(request.employee)
+    except SchemaValidationError as e:
+        raise _validation_error(e)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=f"Error en inferencia: {e}")
+    except Exception as e:
+        raise _server_error(e)
+    return _result(scored, request.threshold)
+
+
+@app.post("/predict/batch")
+async def predict_batch(request: BatchPredictRequest):
+    """Lista de empleados puntuada con un solo predict_proba en el pool."""
+    if not request.employees:
+        return {"results": []}
+    df = pd.DataFrame.from_records(request.employees)
+    loop = asyncio.get_running_loop()
+    try:
+        scored = await loop.run_in_executor(executor, _score, df)
+    except SchemaValidationError as e:
+        raise _validation_error(e)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=f"Batch Inference Error: {e}")
+    except Exception as e:
+        raise _server_error(e)
+    return {"results": [_result(row, request.threshold) for row in scored]}
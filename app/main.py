@@ -1,13 +1,21 @@
 import streamlit as st
 import sys
 import os
+import functools
+import hashlib
+import numpy as np
 import pandas as pd
 import altair as alt
 
 # --- 1. CONFIGURACIÓN DEL PATH ---
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 try:
-    from src.models.inference import model_service
+    from src.models.registry import model_registry
+    from src.models.metrics import InProcessMetrics, session_metrics
+    from src.models.simulation import RetentionSimulator, scenario_grid
+    from src.models.risk_store import RiskStore, ID_COLUMN
+    from src.models.schema import SchemaValidationError
+    from src.models.results import BatchResults
 except ImportError:
     st.error("⚠️ Backend not found. Please run from root.")
     st.stop()
@@ -26,6 +34,117 @@ if 'page' not in st.session_state:
 def navigate_to(page):
     st.session_state['page'] = page
 
+# --- MODELOS: registro de models/*.joblib con recarga en caliente ---
+# Cada rerun coge la versión vigente; un .joblib nuevo o sustituido entra sin reiniciar
+model_registry.start_watching()
+try:
+    model_names = model_registry.names()
+    if not model_names:
+        raise FileNotFoundError("models/ is empty")
+    with st.sidebar:
+        default_model = model_registry.champion if model_registry.champion in model_names else model_names[0]
+        selected_model = st.selectbox("🧠 Model", model_names, index=model_names.index(default_model),
+                                      help="Any .joblib dropped into models/ is loaded automatically.")
+    model_service = model_registry.get(selected_model)
+    # Métricas por sesión: los modelos reenvían al colector de esta sesión solo si activó el diagnóstico
+    model_registry.enable_metrics(session_metrics)
+    if st.session_state.get('diagnostics'):
+        session_metrics.use(st.session_state.setdefault('metrics', InProcessMetrics()))
+    else:
+        session_metrics.use(None)
+except FileNotFoundError as e:
+    st.error(f"⚠️ No model available: {e}")
+    st.stop()
+
+# --- CACHÉS COMPARTIDAS ENTRE SESIONES ---
+# Cada interacción re-ejecuta el script entero: lo caro (leer el fichero, puntuarlo,
+# tablas del modelo) se memoiza por contenido y versión del modelo, con límite de
+# entradas y caducidad. Los objetos de cache_resource se comparten entre sesiones: el DF
+# leído se entrega como copia superficial (Copy-on-Write) y el array de scores es de solo lectura.
+UPLOAD_CACHE_ENTRIES = 4       # DataFrames leídos (lo que más memoria ocupa)
+SCORES_CACHE_ENTRIES = 16      # arrays de probabilidades
+TABLES_CACHE_ENTRIES = 64      # tablas pequeñas derivadas del modelo
+CACHE_TTL = "1h"
+
+
+def upload_digest(uploaded_file) -> str:
+    """sha256 del contenido subido; se calcula una vez por subida (file_id) y sesión."""
+    file_id = getattr(uploaded_file, 'file_id', uploaded_file.name)
+    digests = st.session_state.setdefault('upload_digests', {})
+    if file_id not in digests:
+        digests.clear()
+        digests[file_id] = hashlib.sha256(uploaded_file.getvalue()).hexdigest()[:16]
+    return digests[file_id]
+
+
+# Con Copy-on-Write una copia superficial no comparte escrituras con el original
+# (activo siempre desde pandas 3; en pandas 2 hay que pedirlo)
+if int(pd.__version__.split('.')[0]) < 3:
+    pd.set_option('mode.copy_on_write', True)
+
+
+@st.cache_resource(max_entries=UPLOAD_CACHE_ENTRIES, ttl=CACHE_TTL, show_spinner="Reading file...")
+def _read_upload(digest: str, model_version: str, _model_service, _uploaded_file):
+    # Todas las columnas (las que no usa el modelo van al informe); los tipos dependen
+    # del modelo: la versión forma parte de la clave
+    return _model_service.read_batch_file(_uploaded_file, all_columns=True)
+
+
+def load_upload(digest: str, model_version: str, _model_service, _uploaded_file) -> pd.DataFrame:
+    """
+    DF leído una sola vez por contenido y modelo (sin copiarlo en cada rerun como haría
+    cache_data). Cada llamada recibe su propia copia superficial: añadir, quitar o
+    modificar columnas no afecta al DF cacheado ni a las demás sesiones.
+    """
+    return _read_upload(digest, model_version, _model_service, _uploaded_file).copy(deep=False)
+
+
+@st.cache_resource(max_entries=SCORES_CACHE_ENTRIES, ttl=CACHE_TTL, show_spinner=False)
+def score_upload(digest: str, model_version: str, _model_service, _df, _use_cache: bool = False):
+    probabilities = _model_service.predict_proba_batch(_df, use_cache=_use_cache)
+    probabilities.flags.writeable = False
+    return probabilities
+
+
+@st.cache_data(max_entries=TABLES_CACHE_ENTRIES, ttl=CACHE_TTL, show_spinner=False)
+def drift_report(digest: str, model_version: str, _model_service, _df) -> pd.DataFrame:
+    return _model_service.check_drift(_df)
+
+
+@st.cache_data(max_entries=TABLES_CACHE_ENTRIES, ttl=CACHE_TTL, show_spinner=False)
+def importance_table(model_version: str, input_data: dict, _model_service) -> pd.DataFrame:
+    """Contribuciones de este empleado (o pesos globales) con nombres legibles, ordenadas."""
+    df_imp = _model_service.explain(input_data)
+    if df_imp.empty:
+        df_imp = _model_service.get_feature_importance()
+    if df_imp.empty:
+        return df_imp
+    df_imp['Variable'] = df_imp['Variable'].apply(clean_names)
+    df_imp['Tipo'] = df_imp['Peso'].apply(lambda x: 'Increases Risk 🚨' if x > 0 else 'Protects (Retains) 🛡️')
+    df_imp['Color'] = df_imp['Peso'].apply(lambda x: '#ff4b4b' if x > 0 else '#22c55e')
+
+    # REINTRODUCIMOS LA ORDENACIÓN POR MAGNITUD ABSOLUTA
+    df_imp['AbsPeso'] = df_imp['Peso'].abs()
+    return df_imp.sort_values(by='AbsPeso', ascending=False)
+
+
+def clean_names(name):
+    name = name.replace('num__', '').replace('cat__', '').replace('remainder__', '')
+    translations = {
+        'TotalSatisfaction': 'Total Sat.', 'StockOptionLevel': 'Stock Options',
+        'OverTime_Yes': 'OverTime (Yes)', 'OverTime_No': 'OverTime (No)',
+        'MonthlyIncome': 'Salary', 'Age': 'Age', 'YearsAtCompany': 'Years at Company',
+        'YearsWithCurrManager': 'Years w/ Manager', 'DistanceFromHome': 'Distance',
+        'EnvironmentSatisfaction': 'Env. Sat.', 'JobSatisfaction': 'Job Sat.',
+        'WorkLifeBalance': 'Work Life Balance', 'JobInvolvement': 'Job Involvement',
+        'NumCompaniesWorked': 'Num Companies', 'Log_MonthlyIncome': 'Log Salary',
+        'BusinessTravel_Travel_Frequently': 'Travel Freq.', 'JobRole_Laboratory Technician': 'Lab Tech',
+        'StockOptionLevel_0': 'No Stocks', 'BusinessTravel_Non-Travel': 'Non-Travel',
+        'YearsSinceLastPromotion': 'Years Since Promo'
+    }
+    return translations.get(name, name)
+
+
 # --- 4. CSS GENERAL ---
 st.markdown("""
 <style>
@@ -111,7 +230,7 @@ if st.session_state['page'] == 'home':
             st.rerun()
 
     with col_batch:
-        txt_batch = "📂 BATCH ANALYSIS\nUpload a CSV/Excel file.\nProcess hundreds of employees at once."
+        txt_batch = "📂 BATCH ANALYSIS\nUpload a CSV/Excel/Parquet file.\nProcess hundreds of employees at once."
         if st.button(txt_batch, use_container_width=True):
             navigate_to('batch')
             st.rerun()
@@ -185,8 +304,6 @@ elif st.session_state['page'] == 'manual':
         with col4:
             years_promo = st.number_input("Years Since Last Promo", 0, 20, 1)
 
-    total_satisfaction = env_sat + job_sat + rel_sat + involvement
-
     input_data = {
         'Age': age, 'DistanceFromHome': distance, 'MonthlyIncome': income,
         'NumCompaniesWorked': companies, 'TrainingTimesLastYear': training,
@@ -196,7 +313,7 @@ elif st.session_state['page'] == 'manual':
         'RelationshipSatisfaction': rel_sat, 'WorkLifeBalance': wlb, 'Education': education,
         'BusinessTravel': travel, 'Department': dept, 'EducationField': edu_field,
         'JobRole': role, 'MaritalStatus': marital, 'OverTime': overtime,
-        'StockOptionLevel': stock, 'TotalSatisfaction': total_satisfaction
+        'StockOptionLevel': stock
     }
 
     st.markdown("<br>", unsafe_allow_html=True)
@@ -209,19 +326,34 @@ elif st.session_state['page'] == 'manual':
         threshold = st.slider("Risk Threshold", 0.0, 1.0, 0.50, 0.05)
         predict_btn = st.button("Calculate Risk", type="primary", use_container_width=True)
 
+    with c_info:
+        st.subheader("🧪 Retention Scenarios (What-if)")
+        sim_raises = st.multiselect("Salary increase", [0.05, 0.10, 0.15, 0.20, 0.30], default=[0.10],
+                                    format_func=lambda x: f"+{x:.0%}")
+        sim_c1, sim_c2, sim_c3 = st.columns(3)
+        with sim_c1:
+            sim_overtime = st.checkbox("Remove OverTime", value=overtime == "Yes")
+        with sim_c2:
+            sim_stock = st.checkbox("Stock +1 level", value=False)
+        with sim_c3:
+            sim_promo = st.checkbox("Promote now", value=False)
+
     st.markdown("---")
 
     if predict_btn:
         with st.spinner('Analyzing patterns with AI model...'):
             try:
-                result = model_service.predict(input_data)
+                result = model_service.predict(input_data, threshold=threshold)
                 prob = result['probability']
-                is_churn = prob >= threshold
+                is_churn = result['prediction'] == 1
                 
                 col_res1, col_res2 = st.columns([1, 2])
                 
                 with col_res1:
                     st.metric("Estimated Churn Probability", f"{prob:.1%}", delta=f"Threshold: {threshold:.0%}", delta_color="off")
+                    tier_icons = {'Low': '🟢', 'Watchlist': '🟡', 'High': '🔴'}
+                    st.caption(f"{tier_icons.get(result['risk_tier'], '')} Risk tier: **{result['risk_tier']}** "
+                               f"(calibrated probability {result['calibrated_probability']:.1%})")
                 
                 with col_res2:
                     if is_churn:
@@ -235,39 +367,41 @@ elif st.session_state['page'] == 'manual':
                         
             except Exception as e:
                 st.error(f"Prediction Error: {e}")
+
+            # --- WHAT-IF ---
+            # Todas las combinaciones se puntúan en un solo lote
+            scenarios = scenario_grid(
+                income_multipliers=[1.0] + [1.0 + r for r in sim_raises],
+                overtime=(None, "No") if sim_overtime else (None,),
+                stock_option_bumps=(0, 1) if sim_stock else (0,),
+                promoted=(False, True) if sim_promo else (False,)
+            )[1:]  # el primero es "No change"
+
+            if scenarios:
+                st.markdown("---")
+                st.subheader("🧪 What if we act?")
+                try:
+                    deltas, summary = RetentionSimulator(model_service).run(pd.DataFrame([input_data]), scenarios)
+                    summary['New Probability'] = summary['Mean_Simulated']
+                    summary['Change'] = summary['Mean_Delta']
+                    summary['Below Threshold'] = summary['New Probability'] < threshold
+                    st.dataframe(
+                        summary[['Scenario', 'New Probability', 'Change', 'Below Threshold']].style.format(
+                            {'New Probability': '{:.1%}', 'Change': '{:+.1%}'}),
+                        use_container_width=True, hide_index=True
+                    )
+                except Exception as e:
+                    st.warning(f"⚠️ Could not run the simulation: {e}")
                 
             # --- XAI ---
             st.markdown("---")
             st.subheader("🔍 Why this result?")
             st.write("Factors influencing this specific decision:")
 
-            df_imp = model_service.get_feature_importance()
+            # Contribuciones de ESTE empleado; si el modelo no lo soporta, pesos globales
+            df_imp = importance_table(model_service.model_fingerprint, input_data, model_service)
             
             if not df_imp.empty:
-                def clean_names(name):
-                    name = name.replace('num__', '').replace('cat__', '').replace('remainder__', '')
-                    translations = {
-                        'TotalSatisfaction': 'Total Sat.', 'StockOptionLevel': 'Stock Options',
-                        'OverTime_Yes': 'OverTime (Yes)', 'OverTime_No': 'OverTime (No)',
-                        'MonthlyIncome': 'Salary', 'Age': 'Age', 'YearsAtCompany': 'Years at Company',
-                        'YearsWithCurrManager': 'Years w/ Manager', 'DistanceFromHome': 'Distance',
-                        'EnvironmentSatisfaction': 'Env. Sat.', 'JobSatisfaction': 'Job Sat.',
-                        'WorkLifeBalance': 'Work Life Balance', 'JobInvolvement': 'Job Involvement',
-                        'NumCompaniesWorked': 'Num Companies', 'Log_MonthlyIncome': 'Log Salary',
-                        'BusinessTravel_Travel_Frequently': 'Travel Freq.', 'JobRole_Laboratory Technician': 'Lab Tech',
-                        'StockOptionLevel_0': 'No Stocks', 'BusinessTravel_Non-Travel': 'Non-Travel',
-                        'YearsSinceLastPromotion': 'Years Since Promo'
-                    }
-                    return translations.get(name, name)
-
-                df_imp['Variable'] = df_imp['Variable'].apply(clean_names)
-                df_imp['Tipo'] = df_imp['Peso'].apply(lambda x: 'Increases Risk 🚨' if x > 0 else 'Protects (Retains) 🛡️')
-                df_imp['Color'] = df_imp['Peso'].apply(lambda x: '#ff4b4b' if x > 0 else '#22c55e')
-                
-                # REINTRODUCIMOS LA ORDENACIÓN POR MAGNITUD ABSOLUTA
-                df_imp['AbsPeso'] = df_imp['Peso'].abs()
-                df_imp = df_imp.sort_values(by='AbsPeso', ascending=False)
-
                 top_5 = df_imp.head(5)
                 orden_visual = top_5["Variable"].to_list()
                 
@@ -308,55 +442,226 @@ elif st.session_state['page'] == 'batch':
 
     st.title("📂 Batch Employee Analysis")
     st.markdown("""
-    Upload a **CSV** or **Excel** file containing employee data. 
+    Upload a **CSV**, **Excel**, **Parquet** or **Arrow** file containing employee data. 
     The AI will predict churn risk for the entire list instantly.
     """)
     st.markdown("---")
     
-    uploaded_file = st.file_uploader("Drop your file here", type=['csv', 'xlsx'])
+    uploaded_file = st.file_uploader("Drop your file here", type=['csv', 'xlsx', 'parquet', 'arrow', 'feather'])
     
     if uploaded_file:
         try:
-            if uploaded_file.name.endswith('.csv'):
-                df = pd.read_csv(uploaded_file)
-            else:
-                df = pd.read_excel(uploaded_file)
+            # En pantalla: estas columnas del modelo + todas las que no son del modelo
+            # (IDs, nombres...); el informe descargable lleva todas
+            report_cols = ['EmployeeNumber', 'Department', 'JobRole', 'Age', 'MonthlyIncome']
+
+            digest = upload_digest(uploaded_file)
+            model_version = model_service.model_fingerprint
+            df = load_upload(digest, model_version, model_service, uploaded_file)
+            model_cols = set(model_service.required_columns())
+            display_cols = [c for c in df.columns if c in report_cols or c not in model_cols]
+
+            # Resultado del último "Run" de esta sesión; se descarta si cambia el fichero o el modelo
+            upload_key = (digest, selected_model, model_version)
+            batch_run = st.session_state.get('batch_run')
+            if batch_run is not None and batch_run['key'] != upload_key:
+                batch_run = st.session_state['batch_run'] = None
             
             st.write(f"**Loaded {len(df)} employees.** Preview:")
             st.dataframe(df.head(3))
+
+            # Antes de puntuar: ¿se parece esta población a la de entrenamiento?
+            drift = drift_report(digest, model_version, model_service, df)
+            if not drift.empty:
+                drifted = drift.loc[drift['Status'] == 'drift', 'Feature'].tolist()
+                if drifted:
+                    st.warning(f"⚠️ This file doesn't look like the training data ({', '.join(drifted)}). "
+                               "Its scores may be unreliable.")
+                with st.expander("📊 Population drift vs training data", expanded=bool(drifted)):
+                    st.dataframe(drift.style.format({'PSI': '{:.3f}', 'KS': '{:.3f}', 'Missing_Or_Unknown': '{:.1%}'},
+                                                    na_rep='–'),
+                                 hide_index=True, use_container_width=True)
+                    st.caption("PSI < 0.10 stable · 0.10–0.25 moderate · > 0.25 drift. KS is computed on the binned numeric distributions.")
             
+            # Cambiar el umbral solo vuelve a filtrar las probabilidades ya calculadas
             batch_threshold = st.slider("Risk Filter Threshold", 0.0, 1.0, 0.50, 0.05)
+
+            # Histórico por empleado: solo si el fichero trae EmployeeNumber
+            track_risk = False
+            if ID_COLUMN in df.columns:
+                track_risk = st.checkbox("📈 Track risk over time",
+                                         help="Store this upload and compare it with previous ones (only new or changed employees are re-scored).")
+
+            # Shadow scoring: el mismo lote con otro modelo, para compararlos con datos reales
+            shadow_model = None
+            other_models = [n for n in model_names if n != selected_model]
+            if other_models:
+                shadow_choice = st.selectbox("🧪 Shadow-score with challenger", ['(none)'] + other_models)
+                shadow_model = None if shadow_choice == '(none)' else shadow_choice
+
+            # La caché de SQLite solo compensa si el modelo es más lento que el lookup (árboles)
+            use_cache = st.checkbox("⚡ Reuse cached scores", value=model_service.expensive_to_score,
+                                    help="Skip rows already scored by this model version in any earlier upload. "
+                                         "Worth it for tree models; a linear model scores faster than the lookup.")
             
             if st.button("Run Batch Prediction", type="primary"):
                 with st.spinner("Processing all rows..."):
+                    if use_cache:
+                        model_registry.enable_cache()
+                    model_service.take_cache_counts()
+                    batch_run = {'key': upload_key, 'shadow': None, 'risk_status': None, 'risers': None}
+                    if track_risk:
+                        risk_store = RiskStore()
+                        # ingest añade columnas al DF (al de esta sesión: el cacheado no cambia)
+                        scored = risk_store.ingest(df.copy(deep=False), model_service, use_cache=use_cache)
+                        probabilities = scored.pop('Churn_Probability').to_numpy()
+                        batch_run['risk_status'] = scored['Risk_Status'].value_counts()
+                        batch_run['risers'] = risk_store.risers(points=0.20)
+                        risk_store.close()
+                    elif shadow_model:
+                        # Un solo preprocesado para los dos modelos
+                        shadow_scores, _ = model_registry.shadow_score(df, challenger=shadow_model, champion=selected_model)
+                        probabilities = shadow_scores['Champion_Probability'].to_numpy()
+                    else:
+                        probabilities = score_upload(digest, model_version, model_service, df, use_cache)
+
+                    if shadow_model:
+                        if track_risk:
+                            shadow_scores, _ = model_registry.shadow_score(df, challenger=shadow_model, champion=selected_model)
+                        batch_run['shadow'] = (shadow_model, shadow_scores)
+                    batch_run['results'] = BatchResults(df, probabilities)
+                    # Solo lo de esta ejecución (la caché y sus contadores son de todas las sesiones)
+                    batch_run['cache_stats'] = model_service.take_cache_counts()
+                    st.session_state['batch_run'] = batch_run
+
+            if batch_run is not None:
+                results = batch_run['results']
+                n_high_risk = results.count_at_risk(batch_threshold)
+
+                st.markdown("---")
+                col_m1, col_m2 = st.columns(2)
+                with col_m1:
+                    st.metric("Total Employees", len(results))
+                with col_m2:
+                    st.metric("High Risk Detected", n_high_risk, delta="Action Needed", delta_color="inverse")
+
+                # Tramos sobre la probabilidad calibrada (no dependen del slider)
+                calibrator = model_service.calibrator
+                tier_counts = np.bincount(calibrator.tier_codes(calibrator.calibrate(results.probabilities)),
+                                          minlength=len(calibrator.tier_labels))
+                for col, label, count in zip(st.columns(len(tier_counts)), calibrator.tier_labels, tier_counts):
+                    with col:
+                        st.metric(f"{label} tier", int(count))
+
+                cache_stats = batch_run['cache_stats']
+                if cache_stats:
+                    st.caption(f"⚡ Cache: {cache_stats['hits']} rows reused, {cache_stats['misses']} rows scored "
+                               f"({cache_stats['hit_rate']:.0%} hit rate)")
+                
+                if batch_run['shadow'] is not None:
+                    challenger_name, shadow_scores = batch_run['shadow']
+                    champion_flag = shadow_scores['Champion_Probability'].to_numpy() >= batch_threshold
+                    challenger_flag = shadow_scores['Challenger_Probability'].to_numpy() >= batch_threshold
+                    st.subheader(f"🧪 Shadow Comparison: {selected_model} vs {challenger_name}")
+                    col_s1, col_s2, col_s3 = st.columns(3)
+                    with col_s1:
+                        st.metric("Decision Agreement", f"{(champion_flag == challenger_flag).mean():.1%}")
+                    with col_s2:
+                        st.metric("Mean |Δ Probability|", f"{shadow_scores['Difference'].abs().mean():.3f}")
+                    with col_s3:
+                        st.metric("High Risk (challenger)", int(challenger_flag.sum()),
+                                  delta=int(challenger_flag.sum()) - int(champion_flag.sum()), delta_color="off")
+                    disagreements = shadow_scores.iloc[np.argsort(-shadow_scores['Difference'].abs().to_numpy(), kind='stable')[:10]]
+                    if ID_COLUMN in df.columns:
+                        disagreements.insert(0, ID_COLUMN, df.loc[disagreements.index, ID_COLUMN])
+                    with st.expander("Largest disagreements"):
+                        st.dataframe(disagreements, hide_index=True, use_container_width=True)
+
+                if batch_run['risk_status'] is not None:
+                    status = batch_run['risk_status']
+                    st.caption(f"📈 Risk history: {status.get('new', 0)} new, {status.get('changed', 0)} changed, "
+                               f"{status.get('unchanged', 0)} unchanged since the last upload")
+                    st.subheader("📈 Risk Risers This Month")
+                    if not batch_run['risers'].empty:
+                        st.dataframe(batch_run['risers'], hide_index=True, use_container_width=True)
+                    else:
+                        st.write("No employee's risk rose by more than 20 points this month.")
+                
+                st.subheader("🔥 Top At-Risk Employees")
+                
+                if n_high_risk:
+                    # Paginación en el servidor: solo se seleccionan, explican y pintan las filas de la página
+                    col_p1, col_p2 = st.columns([1, 3])
+                    with col_p1:
+                        page_size = st.selectbox("Rows per page", [25, 50, 100, 250], index=1)
+                    n_pages = results.n_pages(page_size, batch_threshold)
+                    with col_p2:
+                        page = st.number_input(f"Page (of {n_pages})", min_value=1, max_value=n_pages, value=1) - 1
+                    page_df = results.page(page, page_size, batch_threshold)
+                    cols_to_show = ['Churn_Probability'] + display_cols
+
+                    # Top 3 drivers por empleado de la página, en una sola operación de matriz
+                    try:
+                        drivers = model_service.explain_batch(page_df, top_k=3)
+                        drivers = drivers[drivers['Peso'] > 0]
+                        page_df['Top Drivers'] = drivers.groupby('row')['Variable'].agg(', '.join)
+                        page_df['Top Drivers'] = page_df['Top Drivers'].fillna('')
+                        cols_to_show.append('Top Drivers')
+                    except Exception as e:
+                        st.caption(f"⚠️ Could not compute per-employee drivers: {e}")
                     
-                    sat_cols = ['EnvironmentSatisfaction', 'JobSatisfaction', 'RelationshipSatisfaction', 'JobInvolvement']
-                    if all(col in df.columns for col in sat_cols) and 'TotalSatisfaction' not in df.columns:
-                        df['TotalSatisfaction'] = df[sat_cols].sum(axis=1)
-                    
-                    results_df = model_service.predict_batch(df)
-                    high_risk_df = results_df[results_df['Churn_Probability'] >= batch_threshold].sort_values(by='Churn_Probability', ascending=False)
-                    
-                    st.markdown("---")
-                    col_m1, col_m2 = st.columns(2)
-                    with col_m1:
-                        st.metric("Total Employees", len(results_df))
-                    with col_m2:
-                        st.metric("High Risk Detected", len(high_risk_df), delta="Action Needed", delta_color="inverse")
-                    
-                    st.subheader("🔥 Top At-Risk Employees")
+                    st.dataframe(page_df[cols_to_show].style.background_gradient(subset=['Churn_Probability'], cmap='Reds', vmin=0.0, vmax=1.0),
+                                 use_container_width=True)
                     
-                    if not high_risk_df.empty:
-                        cols_possible = ['EmployeeNumber', 'Department', 'JobRole', 'Age', 'MonthlyIncome']
-                        cols_to_show = ['Churn_Probability'] + [c for c in df.columns if c in cols_possible]
-                        
-                        st.dataframe(high_risk_df[cols_to_show].style.background_gradient(subset=['Churn_Probability'], cmap='Reds'), use_container_width=True)
-                        
-                        csv = high_risk_df.to_csv(index=False).encode('utf-8')
-                        st.download_button("📥 Download High Risk Report (CSV)", csv, 'high_risk_employees.csv', 'text/csv')
-                    else:
-                        st.success("Great news! No employees exceeded the risk threshold.")
+                    # El informe se genera por trozos al pulsar, no en cada rerun
+                    col_d1, col_d2 = st.columns(2)
+                    with col_d1:
+                        st.download_button("📥 Download High Risk Report (CSV)",
+                                           functools.partial(results.report_bytes, batch_threshold, 'csv'),
+                                           'high_risk_employees.csv', 'text/csv')
+                    with col_d2:
+                        st.download_button("📥 Download High Risk Report (Parquet)",
+                                           functools.partial(results.report_bytes, batch_threshold, 'parquet'),
+                                           'high_risk_employees.parquet', 'application/vnd.apache.parquet')
+                else:
+                    st.success("Great news! No employees exceeded the risk threshold.")
                         
+        except SchemaValidationError as e:
+            st.error(f"⚠️ {len(e.errors)} problems found in the file. Fix these rows and upload it again:")
+            st.dataframe(e.errors, hide_index=True, use_container_width=True)
         except Exception as e:
             st.error(f"Error processing file: {e}")
-            st.warning("Ensure your file columns match the training data format.")
\ No newline at end of file
+            st.warning("Ensure your file columns match the training data format.")
+
+# ==============================================================================
+# DIAGNÓSTICO (OPCIONAL): tiempos por etapa de inferencia
+# ==============================================================================
+with st.sidebar:
+    if st.toggle("🔧 Diagnostics", key='diagnostics'):
+        metrics = st.session_state.setdefault('metrics', InProcessMetrics())
+        histograms, counters = metrics.snapshot()
+
+        st.caption("Inference timings of this session since the diagnostics were enabled.")
+        if histograms:
+            df_timings = pd.DataFrame(histograms)
+            df_timings = df_timings[df_timings['metric'].str.endswith('_seconds')]
+            df_timings['mean_ms'] = df_timings['mean'] * 1000
+            df_timings['p95_ms'] = df_timings['p95'] * 1000
+            label_cols = [c for c in ['metric', 'stage', 'path'] if c in df_timings.columns]
+            df_timings[label_cols] = df_timings[label_cols].fillna('')
+            st.dataframe(df_timings[label_cols + ['count', 'mean_ms', 'p95_ms']].round(2),
+                         hide_index=True, use_container_width=True)
+        if counters:
+            st.dataframe(pd.DataFrame(counters).fillna(''), hide_index=True, use_container_width=True)
+        if not histograms and not counters:
+            st.info("No predictions recorded yet.")
+
+        with st.expander("Prometheus export"):
+            st.code(metrics.to_prometheus(), language="text")
+
+        with st.expander("Loaded models"):
+            st.dataframe(model_registry.versions(), hide_index=True, use_container_width=True)
+
+        if st.button("Reset metrics"):
+            metrics.reset()
+            st.rerun()
@@ -0,0 +1,60 @@
+"""
+Prueba de carga del servicio de scoring (api/main.py) con un cliente local.
+
+    uvicorn api.main:app --port 8000 &
+    python -m benchmarks.api_load --url http://127.0.0.1:8000 --requests 5000 --concurrency 64
+"""
+import argparse
+import asyncio
+import time
+
+import httpx
+import numpy as np
+
+from benchmarks.synthetic import make_population
+
+
+async def _worker(client, url, payloads, latencies):
+    while payloads:
+        payload = payloads.pop()
+        start = time.perf_counter()
+        response = await client.post(url, json=payload)
+        response.raise_for_status()
+        latencies.append(time.perf_counter() - start)
+
+
+async def run(base_url: str, n_requests: int, concurrency: int):
+    employees = make_population(n_requests).drop(columns=['EmployeeNumber']).to_dict('records')
+    payloads = [{"employee": employee} for employee in employees]
+    latencies = []
+
+    limits = httpx.Limits(max_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+        await client.post('/predict', json=payloads[0])  # warm-up
+        start = time.perf_counter()
+        await asyncio.gather(*[
+            _worker(client, '/predict', payloads, latencies) for _ in range(concurrency)
+        ])
+        elapsed = time.perf_counter() - start
+        health = (await client.get('/health')).json()
+
+    latencies_ms = np.array(latencies) * 1000
+    print(f"requests     : {len(latencies)} (concurrency {concurrency})")
+    print(f"throughput   : {len(latencies) / elapsed:,.0f} req/s")
+    print(f"latency p50  : {np.percentile(latencies_ms, 50):.1f} ms")
+    print(f"latency p99  : {np.percentile(latencies_ms, 99):.1f} ms")
+    if health.get('micro_batches'):
+        print(f"avg batch    : {health['rows_scored'] / health['micro_batches']:.1f} rows")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--url', default='http://127.0.0.1:8000')
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--concurrency', type=int, default=32)
+    args = parser.parse_args()
+    asyncio.run(run(args.url, args.requests, args.concurrency))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,93 @@
+"""
+Tiempo de lectura de un fichero de empleados según el formato (CSV / XLSX / Parquet / Arrow).
+
+Compara la lectura completa con pandas (lo que hacía la página batch) con
+ModelLoader.read_batch_file, que solo lee las columnas del modelo y fija los tipos
+al leer. Los ficheros se generan con una población sintética más `--extra-columns`
+columnas de relleno, para parecerse a un export de RRHH real.
+
+    python -m benchmarks.ingestion --rows 50000 --repeat 3
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+FORMATS = ('csv', 'xlsx', 'parquet', 'arrow')
+
+
+def _write(df: pd.DataFrame, path: str, fmt: str):
+    if fmt == 'csv':
+        df.to_csv(path, index=False)
+    elif fmt == 'xlsx':
+        df.to_excel(path, index=False)
+    elif fmt == 'parquet':
+        df.to_parquet(path, index=False)
+    else:
+        df.to_feather(path)
+
+
+def _read_full(path: str, fmt: str) -> pd.DataFrame:
+    if fmt == 'csv':
+        return pd.read_csv(path)
+    if fmt == 'xlsx':
+        return pd.read_excel(path)
+    if fmt == 'parquet':
+        return pd.read_parquet(path)
+    return pd.read_feather(path)
+
+
+def _median_time(fn, repeat: int) -> float:
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+def main():
+    import joblib
+    from benchmarks.pipelines import build_pipeline
+    from benchmarks.synthetic import make_population
+    from src.models.inference import ModelLoader
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=50_000)
+    parser.add_argument('--extra-columns', type=int, default=20)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--formats', default=','.join(FORMATS))
+    args = parser.parse_args()
+
+    df = make_population(args.rows)
+    rng = np.random.default_rng(0)
+    for i in range(args.extra_columns):
+        df[f'Extra_{i}'] = rng.random(args.rows) if i % 2 else rng.choice(['A', 'B', 'C'], args.rows)
+
+    with tempfile.TemporaryDirectory() as workdir:
+        model_path = os.path.join(workdir, 'logreg.joblib')
+        joblib.dump(build_pipeline('logreg'), model_path)
+        loader = ModelLoader(model_path=model_path)
+        loader.warm_up()
+
+        print(f"{args.rows} filas x {df.shape[1]} columnas (mediana de {args.repeat})")
+        print(f"{'formato':<8} {'MB':>7} {'pandas':>10} {'read_batch_file':>16} {'+ scoring':>10}")
+        for fmt in args.formats.split(','):
+            path = os.path.join(workdir, f'employees.{fmt}')
+            _write(df, path, fmt)
+            size_mb = os.path.getsize(path) / 1024 / 1024
+
+            full = _median_time(lambda: _read_full(path, fmt), args.repeat)
+            pruned = _median_time(lambda: loader.read_batch_file(path), args.repeat)
+            scoring = _median_time(lambda: loader.predict_proba_batch(loader.read_batch_file(path),
+                                                                      inplace=True, use_cache=False),
+                                   args.repeat)
+            print(f"{fmt:<8} {size_mb:7.1f} {full * 1000:8.0f}ms {pruned * 1000:14.0f}ms {scoring * 1000:8.0f}ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,44 @@
+"""
+Rows/sec de ParallelBatchScorer con 1..N procesos.
+
+    python -m benchmarks.parallel_scaling --rows 500000 --max-workers 8
+"""
+import argparse
+import os
+import time
+
+from benchmarks.synthetic import make_population
+from src.models.inference import model_service
+from src.models.parallel import ParallelBatchScorer, DEFAULT_SHARD_SIZE
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=200_000)
+    parser.add_argument('--max-workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--shard-size', type=int, default=DEFAULT_SHARD_SIZE)
+    parser.add_argument('--compiled', action='store_true')
+    args = parser.parse_args()
+
+    df = make_population(args.rows)
+    columns = model_service.required_columns()
+
+    start = time.perf_counter()
+    model_service.predict_proba_batch(df)
+    baseline = time.perf_counter() - start
+    print(f"{'single-thread':>14} | {args.rows / baseline:>12,.0f} rows/s")
+
+    workers = 1
+    while workers <= args.max_workers:
+        with ParallelBatchScorer(n_workers=workers, shard_size=args.shard_size,
+                                 compiled=args.compiled) as scorer:
+            scorer.warm_up()
+            start = time.perf_counter()
+            scorer.predict_proba_batch(df, columns=columns)
+            elapsed = time.perf_counter() - start
+        print(f"{workers:>6} workers | {args.rows / elapsed:>12,.0f} rows/s | x{baseline / elapsed:.2f}")
+        workers *= 2
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+import numpy as np
+
+from benchmarks.synthetic import make_population
+
+# Mismas listas de features que notebooks/02_modeling.ipynb
+NUMERIC_FEATURES = [
+    'Age', 'Log_DistanceFromHome', 'Log_MonthlyIncome', 'YearsAtCompany',
+    'YearsSinceLastPromotion', 'YearsWithCurrManager', 'NumCompaniesWorked',
+    'TrainingTimesLastYear', 'Education', 'EnvironmentSatisfaction', 'JobInvolvement',
+    'JobLevel', 'JobSatisfaction', 'RelationshipSatisfaction', 'WorkLifeBalance'
+]
+CATEGORICAL_FEATURES = [
+    'BusinessTravel', 'Department', 'EducationField', 'JobRole',
+    'MaritalStatus', 'OverTime', 'StockOptionLevel'
+]
+
+VARIANTS = ('logreg', 'xgboost', 'random_forest')
+
+
+def training_frame(n_rows: int = 1470, seed: int = 42):
+    """
+    X, y sintéticos con la misma preparación que el notebook (log1p + categóricas a str).
+    El target sigue los drivers del EDA (OverTime, salario bajo, pocos años, soltero).
+    """
+    df = make_population(n_rows, seed=seed)
+    df['Log_MonthlyIncome'] = np.log1p(df['MonthlyIncome'])
+    df['Log_DistanceFromHome'] = np.log1p(df['DistanceFromHome'])
+    for col in CATEGORICAL_FEATURES:
+        df[col] = df[col].astype(str)
+
+    rng = np.random.default_rng(seed)
+    logit = (-1.5
+             + 1.4 * (df['OverTime'] == 'Yes')
+             - 1.1 * (df['Log_MonthlyIncome'] - df['Log_MonthlyIncome'].mean())
+             - 0.05 * df['YearsAtCompany']
+             + 0.6 * (df['MaritalStatus'] == 'Single')
+             - 0.3 * (df['JobSatisfaction'] - 2.5))
+    y = (rng.random(n_rows) < 1 / (1 + np.exp(-logit))).astype(int)
+    return df[NUMERIC_FEATURES + CATEGORICAL_FEATURES], y
+
+
+def build_pipeline(variant: str, seed: int = 42):
+    """Pipeline ('preprocessor', 'classifier') como el que guarda el notebook, entrenado offline."""
+    from sklearn.compose import ColumnTransformer
+    from sklearn.pipeline import Pipeline
+    from sklearn.preprocessing import StandardScaler, OneHotEncoder
+
+    preprocessor = ColumnTransformer(
+        transformers=[
+            ('num', Pipeline(steps=[('scaler', StandardScaler())]), NUMERIC_FEATURES),
+            ('cat', Pipeline(steps=[('onehot', OneHotEncoder(handle_unknown='ignore', sparse_output=False))]),
+             CATEGORICAL_FEATURES)
+        ],
+        verbose_feature_names_out=False
+    )
+
+    if variant == 'logreg':
+        from sklearn.linear_model import LogisticRegression
+        classifier = LogisticRegression(class_weight='balanced', max_iter=1000, random_state=seed)
+    elif variant == 'xgboost':
+        from xgboost import XGBClassifier
+        classifier = XGBClassifier(n_estimators=300, max_depth=6, learning_rate=0.1,
+                                   eval_metric='logloss', random_state=seed, n_jobs=1)
+    elif variant == 'random_forest':
+        from sklearn.ensemble import RandomForestClassifier
+        classifier = RandomForestClassifier(n_estimators=100, class_weight='balanced',
+                                            random_state=seed, n_jobs=1)
+    else:
+        raise ValueError(f"Variante desconocida: {variant} (opciones: {', '.join(VARIANTS)})")
+
+    X, y = training_frame(seed=seed)
+    return Pipeline(steps=[('preprocessor', preprocessor), ('classifier', classifier)]).fit(X, y)
@@ -0,0 +1,50 @@
+"""
+Tiempo de import y cold start del servicio de modelo, cada medida en un proceso nuevo.
+
+    python -m benchmarks.startup --repeat 5
+"""
+import argparse
+import statistics
+import subprocess
+import sys
+
+IMPORT_SNIPPET = """
+import time
+t = time.perf_counter()
+import src.models.inference
+print(time.perf_counter() - t)
+"""
+
+COLD_START_SNIPPET = """
+import time
+t = time.perf_counter()
+from src.models.inference import ModelLoader
+loader = ModelLoader({kwargs})
+loader.warm_up() if hasattr(loader, 'warm_up') else None
+print(time.perf_counter() - t)
+"""
+
+
+def _measure(snippet: str, repeat: int) -> float:
+    times = []
+    for _ in range(repeat):
+        out = subprocess.run([sys.executable, '-c', snippet], capture_output=True, text=True, check=True)
+        times.append(float(out.stdout.strip().splitlines()[-1]))
+    return statistics.median(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--mmap', action='store_true', help="medir también el artefacto memory-mapped")
+    args = parser.parse_args()
+
+    print(f"import src.models.inference : {_measure(IMPORT_SNIPPET, args.repeat) * 1000:8.1f} ms")
+    print(f"cold start (load + warm-up)  : {_measure(COLD_START_SNIPPET.format(kwargs=''), args.repeat) * 1000:8.1f} ms")
+    if args.mmap:
+        snippet = COLD_START_SNIPPET.format(kwargs='mmap=True')
+        print(f"cold start (mmap artifact)   : {_measure(snippet, args.repeat) * 1000:8.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,278 @@
+"""
+Suite de benchmarks de inferencia, reproducible y sin datos reales.
+
+Para cada variante de pipeline (entrenada con datos sintéticos, o un .joblib propio)
+y cada tamaño de población mide: tiempo de carga del modelo, latencia de predict()
+para una fila, throughput de predict_proba_batch (y, aparte, cuánto de ese tiempo es
+preprocesado, transformación y clasificador) y pico de RSS. Cada medida corre
+en un proceso nuevo para que la RSS y la carga no se contaminen entre sí.
+
+    python -m benchmarks.suite --sizes 1,1000,100000,1000000 --out bench.json
+    python -m benchmarks.suite --variants logreg --model models/churn_pipeline.joblib
+    python -m benchmarks.suite --out new.json --compare bench.json --tolerance 0.2
+"""
+import argparse
+import datetime
+import json
+import multiprocessing
+import os
+import platform
+import queue as queue_module
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+DEFAULT_SIZES = (1, 1_000, 100_000, 1_000_000)
+# Más allá de esto se puntúa por trozos para no medir el swap en vez del modelo
+SCORING_CHUNK = 1_000_000
+SINGLE_ROW_REPEATS = 200
+# Segundos máximos por caso (carga + población + medidas) antes de darlo por colgado
+DEFAULT_CASE_TIMEOUT = 1800
+# Cada cuánto se comprueba si el proceso hijo sigue vivo mientras se espera su resultado
+_POLL_SECONDS = 1.0
+
+# Métrica -> True si "más alto es mejor"
+HIGHER_IS_BETTER = {
+    'rows_per_sec': True,
+    'single_row_p50_ms': False,
+    'single_row_p99_ms': False,
+    'model_load_s': False,
+    'preprocess_s': False,
+    'transform_s': False,
+    'classify_s': False,
+    'peak_rss_mb': False,
+}
+
+
+def _peak_rss_mb() -> float:
+    # Linux devuelve KB, macOS bytes
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / 1024 / 1024 if sys.platform == 'darwin' else rss / 1024
+
+
+def _run_case(model_path: str, n_rows: int, compiled: bool, queue):
+    """Proceso hijo: carga el modelo, genera la población y mide."""
+    try:
+        queue.put(_measure(model_path, n_rows, compiled))
+    except Exception as e:
+        queue.put({'error': f"{type(e).__name__}: {e}"})
+
+
+def _measure(model_path: str, n_rows: int, compiled: bool) -> dict:
+    from benchmarks.synthetic import make_population
+    from src.models.inference import ModelLoader
+
+    result = {}
+    loader = ModelLoader(compiled=compiled, model_path=model_path)
+    start = time.perf_counter()
+    loader.warm_up()
+    result['model_load_s'] = time.perf_counter() - start
+
+    population = make_population(n_rows)
+
+    row = population.iloc[0].to_dict()
+    latencies = []
+    for _ in range(SINGLE_ROW_REPEATS):
+        start = time.perf_counter()
+        loader.predict(row)
+        latencies.append(time.perf_counter() - start)
+    result['single_row_p50_ms'] = float(np.percentile(latencies, 50) * 1000)
+    result['single_row_p99_ms'] = float(np.percentile(latencies, 99) * 1000)
+
+    start = time.perf_counter()
+    for offset in range(0, n_rows, SCORING_CHUNK):
+        loader.predict_proba_batch(population.iloc[offset:offset + SCORING_CHUNK])
+    elapsed = time.perf_counter() - start
+    result['batch_s'] = elapsed
+    result['rows_per_sec'] = n_rows / elapsed if elapsed > 0 else float('inf')
+    result.update(_measure_stages(loader, population))
+    result['peak_rss_mb'] = _peak_rss_mb()
+    return result
+
+
+def _measure_stages(loader, population) -> dict:
+    """
+    Segunda pasada por etapas: _preprocess (esquema, features derivadas), transformación
+    a matriz y clasificador. En modo compilado no hay transformación: todo es classify_s.
+    """
+    stages = dict.fromkeys(('preprocess_s', 'transform_s', 'classify_s'), 0.0)
+    for offset in range(0, len(population), SCORING_CHUNK):
+        chunk = population.iloc[offset:offset + SCORING_CHUNK]
+        start = time.perf_counter()
+        prepared = loader._preprocess(chunk)
+        stages['preprocess_s'] += time.perf_counter() - start
+        if loader.compiled_scorer is not None:
+            start = time.perf_counter()
+            loader.compiled_scorer.predict_proba_prepared(prepared)
+            stages['classify_s'] += time.perf_counter() - start
+            continue
+        start = time.perf_counter()
+        X = loader._transform(prepared)
+        stages['transform_s'] += time.perf_counter() - start
+        start = time.perf_counter()
+        loader.model[-1].predict_proba(X)
+        stages['classify_s'] += time.perf_counter() - start
+    return stages
+
+
+def run_case(model_path: str, n_rows: int, compiled: bool, timeout: float = DEFAULT_CASE_TIMEOUT) -> dict:
+    """
+    Mide un caso en un proceso nuevo. Si el hijo muere (ej: OOM killer) o no termina
+    en `timeout` segundos, devuelve {'error': ...} en vez de esperar para siempre.
+    """
+    ctx = multiprocessing.get_context('spawn')
+    queue = ctx.Queue()
+    proc = ctx.Process(target=_run_case, args=(model_path, n_rows, compiled, queue))
+    proc.start()
+    deadline = time.monotonic() + timeout
+    result = None
+    while result is None:
+        try:
+            result = queue.get(timeout=_POLL_SECONDS)
+        except queue_module.Empty:
+            if not proc.is_alive():
+                # El resultado puede haber llegado justo antes de que el hijo saliera
+                try:
+                    result = queue.get(timeout=_POLL_SECONDS)
+                except queue_module.Empty:
+                    result = {'error': f"el proceso terminó sin resultado (exitcode {proc.exitcode})"}
+            elif time.monotonic() > deadline:
+                proc.terminate()
+                result = {'error': f"sin resultado tras {timeout:.0f} s"}
+    proc.join(_POLL_SECONDS)
+    if proc.is_alive():
+        proc.kill()
+        proc.join()
+    return result
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def _metadata() -> dict:
+    import sklearn
+    import pandas as pd
+
+    return {
+        'timestamp': datetime.datetime.now().isoformat(timespec='seconds'),
+        'git_commit': _git_commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'sklearn': sklearn.__version__,
+    }
+
+
+def _prepare_variants(variants, model_path, workdir):
+    """Entrena (con datos sintéticos) y guarda cada variante; devuelve {nombre: ruta}."""
+    import joblib
+    from benchmarks.pipelines import build_pipeline
+
+    paths = {}
+    for variant in variants:
+        try:
+            pipeline = build_pipeline(variant)
+        except ImportError as e:
+            print(f"⚠️ Variante '{variant}' omitida: {e}")
+            continue
+        path = os.path.join(workdir, f'{variant}.joblib')
+        joblib.dump(pipeline, path)
+        paths[variant] = path
+    if model_path:
+        paths[f"model:{os.path.basename(model_path)}"] = os.path.abspath(model_path)
+    return paths
+
+
+def compare(results, baseline, tolerance: float):
+    """Devuelve las métricas que empeoran más de `tolerance` (relativo) respecto a baseline."""
+    index = {(r['variant'], r['compiled'], r['rows']): r for r in baseline['results']}
+    regressions = []
+    for r in results:
+        ref = index.get((r['variant'], r['compiled'], r['rows']))
+        if ref is None:
+            continue
+        for metric, higher_is_better in HIGHER_IS_BETTER.items():
+            old, new = ref.get(metric), r.get(metric)
+            if not old or new is None:
+                continue
+            change = (new - old) / old
+            worse = -change if higher_is_better else change
+            if worse > tolerance:
+                regressions.append({**{k: r[k] for k in ('variant', 'compiled', 'rows')},
+                                    'metric': metric, 'baseline': old, 'current': new,
+                                    'change': change})
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', default=','.join(map(str, DEFAULT_SIZES)),
+                        help="tamaños de población separados por comas (hasta 10000000)")
+    parser.add_argument('--variants', default='logreg,xgboost',
+                        help="variantes sintéticas: logreg, xgboost, random_forest")
+    parser.add_argument('--model', default=None, help="medir también este .joblib")
+    parser.add_argument('--compiled', action='store_true', help="medir también el modo compilado")
+    parser.add_argument('--out', default='bench_results.json')
+    parser.add_argument('--compare', default=None, help="JSON de referencia para detectar regresiones")
+    parser.add_argument('--tolerance', type=float, default=0.2)
+    parser.add_argument('--timeout', type=float, default=DEFAULT_CASE_TIMEOUT,
+                        help="segundos máximos por caso antes de darlo por fallido")
+    args = parser.parse_args()
+
+    sizes = [int(s) for s in args.sizes.split(',') if s]
+    variants = [v for v in args.variants.split(',') if v]
+    modes = (False, True) if args.compiled else (False,)
+
+    results, failed = [], []
+    with tempfile.TemporaryDirectory() as workdir:
+        paths = _prepare_variants(variants, args.model, workdir)
+        for name, path in paths.items():
+            for compiled in modes:
+                for n_rows in sizes:
+                    result = run_case(path, n_rows, compiled, timeout=args.timeout)
+                    result.update(variant=name, compiled=compiled, rows=n_rows)
+                    if 'error' in result:
+                        failed.append(result)
+                        print(f"❌ {name} {'compiled' if compiled else 'pipeline'} {n_rows:,} rows: "
+                              f"{result['error']}", file=sys.stderr)
+                        continue
+                    results.append(result)
+                    print(f"{name:>14} {'compiled' if compiled else 'pipeline':>8} {n_rows:>10,} rows | "
+                          f"{result['rows_per_sec']:>12,.0f} rows/s | "
+                          f"p50 {result['single_row_p50_ms']:6.2f} ms | "
+                          f"prep/transform/classify {result['preprocess_s']:.2f}/"
+                          f"{result['transform_s']:.2f}/{result['classify_s']:.2f} s | "
+                          f"load {result['model_load_s']:5.2f} s | RSS {result['peak_rss_mb']:7.0f} MB")
+
+    report = {'meta': _metadata(), 'results': results, 'failed': failed}
+    with open(args.out, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"💾 Resultados guardados en {args.out}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.tolerance)
+        for reg in regressions:
+            print(f"🚨 {reg['variant']} ({reg['rows']:,} rows) {reg['metric']}: "
+                  f"{reg['baseline']:.4g} -> {reg['current']:.4g} ({reg['change']:+.0%})")
+        if regressions:
+            sys.exit(1)
+        print("✅ Sin regresiones respecto a la referencia")
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,51 @@
+import numpy as np
+import pandas as pd
+
+# Mismos valores que ofrece el formulario manual de app/main.py
+BUSINESS_TRAVEL = ["Non-Travel", "Travel_Rarely", "Travel_Frequently"]
+DEPARTMENTS = ["Sales", "Research & Development", "Human Resources"]
+EDUCATION_FIELDS = ["Life Sciences", "Medical", "Marketing", "Technical Degree", "Human Resources", "Other"]
+JOB_ROLES = ['Sales Executive', 'Research Scientist', 'Laboratory Technician',
+             'Manufacturing Director', 'Healthcare Representative', 'Manager',
+             'Sales Representative', 'Research Director', 'Human Resources']
+MARITAL_STATUS = ["Single", "Married", "Divorced"]
+
+
+def make_population(n_rows: int, seed: int = 42) -> pd.DataFrame:
+    """
+    Población sintética con el esquema de `input_data` en app/main.py
+    (+ EmployeeNumber), para medir rendimiento sin el CSV real de IBM.
+    """
+    rng = np.random.default_rng(seed)
+
+    def ints(low, high):
+        return rng.integers(low, high + 1, n_rows, dtype=np.int64)
+
+    df = pd.DataFrame({
+        'EmployeeNumber': np.arange(1, n_rows + 1, dtype=np.int64),
+        'Age': ints(18, 65),
+        'DistanceFromHome': ints(1, 30),
+        'MonthlyIncome': np.round(rng.lognormal(8.6, 0.5, n_rows).clip(1000, 20000)).astype(np.int64),
+        'NumCompaniesWorked': ints(0, 10),
+        'TrainingTimesLastYear': ints(0, 6),
+        'YearsAtCompany': ints(0, 40),
+        'YearsSinceLastPromotion': ints(0, 15),
+        'YearsWithCurrManager': ints(0, 17),
+        'EnvironmentSatisfaction': ints(1, 4),
+        'JobInvolvement': ints(1, 4),
+        'JobLevel': ints(1, 5),
+        'JobSatisfaction': ints(1, 4),
+        'RelationshipSatisfaction': ints(1, 4),
+        'WorkLifeBalance': ints(1, 4),
+        'Education': ints(1, 5),
+        'BusinessTravel': rng.choice(BUSINESS_TRAVEL, n_rows, p=[0.1, 0.71, 0.19]),
+        'Department': rng.choice(DEPARTMENTS, n_rows, p=[0.3, 0.65, 0.05]),
+        'EducationField': rng.choice(EDUCATION_FIELDS, n_rows),
+        'JobRole': rng.choice(JOB_ROLES, n_rows),
+        'MaritalStatus': rng.choice(MARITAL_STATUS, n_rows, p=[0.32, 0.46, 0.22]),
+        'OverTime': rng.choice(["Yes", "No"], n_rows, p=[0.28, 0.72]),
+        'StockOptionLevel': ints(0, 3),
+    })
+    df['TotalSatisfaction'] = (df['EnvironmentSatisfaction'] + df['JobSatisfaction'] +
+                               df['RelationshipSatisfaction'] + df['JobInvolvement'])
+    return df
@@ -0,0 +1,84 @@
+"""
+Ajuste offline de la calibración de probabilidades y los tramos de riesgo de un modelo.
+
+    python -m cli.calibrate data/holdout.csv --target Attrition --method isotonic
+    python -m cli.calibrate data/holdout.parquet --model models/churn_xgboost.joblib --method sigmoid \
+        --tiers Low=0,Watchlist=0.25,High=0.5
+
+Usar datos que el modelo NO haya visto al entrenar (hold-out / validación).
+Guarda <modelo>.calibration.json junto al .joblib; ModelLoader lo carga solo
+y comprueba que corresponde a esa versión del artefacto.
+"""
+import argparse
+import os
+import sys
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from src.models.calibration import DEFAULT_KNOTS, DEFAULT_TIERS, RiskCalibrator, calibration_path
+from src.models.inference import MODEL_PATH, ModelLoader
+
+
+def _parse_tiers(text: str) -> dict:
+    tiers = {}
+    for item in text.split(','):
+        label, _, cut = item.partition('=')
+        tiers[label.strip()] = float(cut)
+    return tiers
+
+
+def _binary_target(values) -> np.ndarray:
+    """Yes/No, True/False o 1/0 -> 1/0."""
+    if values.dtype.kind in 'biuf':
+        return values.astype(np.float64).to_numpy()
+    return values.astype(str).str.strip().str.lower().isin(['yes', 'true', '1']).astype(np.float64).to_numpy()
+
+
+def _brier(probabilities, target) -> float:
+    return float(np.mean((probabilities - target) ** 2))
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('data', help="Fichero con las features y la etiqueta real (CSV, XLSX, Parquet, Arrow)")
+    parser.add_argument('--target', default='Attrition')
+    parser.add_argument('--model', default=MODEL_PATH, help="Ruta del pipeline .joblib")
+    parser.add_argument('--method', choices=('isotonic', 'sigmoid'), default='isotonic')
+    parser.add_argument('--knots', type=int, default=DEFAULT_KNOTS,
+                        help="Puntos máximos de la tabla isotónica (0 = tabla exacta, sin reducir)")
+    parser.add_argument('--tiers', default=','.join(f"{k}={v}" for k, v in DEFAULT_TIERS.items()),
+                        help="Tramos sobre la probabilidad calibrada: Etiqueta=corte,... (el primero en 0)")
+    parser.add_argument('--output', default=None, help="Por defecto, junto al modelo")
+    args = parser.parse_args(argv)
+    try:
+        # Se validan antes de cargar el modelo y puntuar el hold-out
+        tiers = RiskCalibrator(tiers=_parse_tiers(args.tiers)).tiers
+    except ValueError as e:
+        parser.error(f"--tiers: {e}")
+
+    model = ModelLoader(model_path=args.model).warm_up()
+    df = model.read_batch_file(args.data, keep_columns=[args.target])
+    target = _binary_target(df[args.target])
+    probabilities = model.predict_proba_batch(df, use_cache=False)
+
+    calibrator = RiskCalibrator.fit(probabilities, target, method=args.method, n_knots=args.knots or None,
+                                    tiers=tiers, model=model.model_fingerprint)
+    calibrated = calibrator.calibrate(probabilities)
+
+    print(f"📈 {len(df):,} filas, tasa real {target.mean():.1%} | media modelo {probabilities.mean():.1%} "
+          f"-> calibrada {calibrated.mean():.1%}")
+    print(f"   Brier: {_brier(probabilities, target):.4f} -> {_brier(calibrated, target):.4f} "
+          f"({len(calibrator.x)} puntos en la tabla)")
+    codes = calibrator.tier_codes(calibrated)
+    for code, (label, cut) in enumerate(calibrator.tiers.items()):
+        in_tier = codes == code
+        rate = target[in_tier].mean() if in_tier.any() else 0.0
+        print(f"   {label:<10} >= {cut:.2f}: {int(in_tier.sum()):,} filas, tasa real {rate:.1%}")
+
+    calibrator.save(args.output or calibration_path(args.model))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
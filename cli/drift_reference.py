@@ -0,0 +1,37 @@
+"""
+Guarda los histogramas de referencia (datos de entrenamiento) junto a un modelo, para
+comparar cada lote subido con ellos (PSI / KS por feature).
+
+    python -m cli.drift_reference data/WA_Fn-UseC_-HR-Employee-Attrition.csv
+    python -m cli.drift_reference data/train.parquet --model models/churn_xgboost.joblib --bins 20
+
+Escribe <modelo>.drift.json junto al .joblib; ModelLoader lo carga solo y comprueba
+que corresponde a esa versión del artefacto.
+"""
+import argparse
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from src.models.drift import DEFAULT_BINS, DriftReference, drift_path
+from src.models.inference import MODEL_PATH, ModelLoader
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('data', help="Datos de entrenamiento (CSV, XLSX, Parquet, Arrow)")
+    parser.add_argument('--model', default=MODEL_PATH, help="Ruta del pipeline .joblib")
+    parser.add_argument('--bins', type=int, default=DEFAULT_BINS)
+    parser.add_argument('--output', default=None, help="Por defecto, junto al modelo")
+    args = parser.parse_args(argv)
+
+    model = ModelLoader(model_path=args.model)
+    df = model.read_batch_file(args.data)
+    reference = DriftReference.fit(df, model.schema, n_bins=args.bins, model=model.model_fingerprint)
+    print(f"📊 {len(df):,} filas, {len(reference.features)} features de referencia")
+    reference.save(args.output or drift_path(args.model))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,283 @@
+"""
+Scoring por lotes desde la línea de comandos (cron / contenedores), sin Streamlit.
+
+    python -m cli.score "exports/*.csv" --output scored/ --threshold 0.6
+    python -m cli.score exports/hris.parquet --output scored/hris.parquet --high-risk
+    python -m cli.score exports/departments/ --output scored/ --workers 4
+
+Cada entrada (ruta, glob o directorio) se lee y puntúa por chunks, así que la
+memoria depende de --chunk-size y no del tamaño del fichero. Con --workers > 1
+los ficheros se reparten entre procesos (un modelo cargado por proceso); si solo
+hay un fichero, cada chunk se reparte entre los procesos (ParallelBatchScorer).
+
+Por cada fichero se escribe <nombre>_scored.<formato> y, con --high-risk,
+<nombre>_high_risk.<formato> con las filas sobre el umbral, de mayor a menor riesgo
+(se ordenan desde un volcado Arrow temporal en disco, no en memoria).
+Si dos entradas se llaman igual (sales.csv y sales.parquet), el nombre lleva también
+la extensión (sales_csv_scored.csv) y, si hace falta, la ruta (2024_sales_csv_scored.csv).
+Con --drift, además <nombre>_drift.csv con el PSI / KS de cada feature frente al
+entrenamiento (hace falta el <modelo>.drift.json de cli.drift_reference).
+Termina con código 1 si algún fichero ha fallado.
+"""
+import argparse
+import glob
+import os
+import sys
+import tempfile
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from src.models.inference import DEFAULT_THRESHOLD, MODEL_PATH, ModelLoader
+from src.models.parallel import ParallelBatchScorer
+from src.models.schema import SchemaValidationError
+from src.models.streaming import DEFAULT_CHUNKSIZE, ChunkWriter
+
+INPUT_EXTENSIONS = ('.csv', '.xlsx', '.xlsm', '.parquet', '.pq', '.arrow', '.feather', '.ipc')
+DEFAULT_KEEP_COLUMNS = ['EmployeeNumber', 'Department', 'JobRole']
+
+# Modelo propio de cada proceso (se carga una vez en el initializer, no por fichero)
+_worker_model = None
+
+
+def _init_worker(model_path: str, single_threaded: bool):
+    global _worker_model
+    _worker_model = ModelLoader(model_path=model_path).warm_up()
+    # Varios procesos ya ocupan los cores: que XGBoost/RandomForest no lancen sus propios hilos
+    classifier = _worker_model.model.named_steps.get('classifier')
+    if single_threaded and classifier is not None and 'n_jobs' in classifier.get_params():
+        classifier.set_params(n_jobs=1)
+
+
+def expand_inputs(patterns) -> list:
+    """Rutas, globs o directorios -> lista ordenada y sin duplicados de ficheros soportados."""
+    paths = []
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            matches = [os.path.join(pattern, name) for name in os.listdir(pattern)]
+        else:
+            matches = glob.glob(pattern) or [pattern]
+        paths.extend(p for p in matches if os.path.splitext(p)[1].lower() in INPUT_EXTENSIONS
+                     or not os.path.exists(p))
+    return sorted(dict.fromkeys(os.path.abspath(p) for p in paths))
+
+
+def output_stems(sources) -> dict:
+    """
+    Nombre base de la salida de cada entrada (sin duplicados): el del fichero sin extensión;
+    si dos entradas lo comparten, con la extensión (sales_csv / sales_parquet) y, si aún
+    coinciden (2024/sales.csv y 2025/sales.csv), con la ruta desde su directorio común.
+    """
+    def with_extension(path):
+        stem, ext = os.path.splitext(os.path.basename(path))
+        return f"{stem}_{ext.lstrip('.').lower()}"
+
+    def with_path(path, common):
+        stem, ext = os.path.splitext(os.path.relpath(path, common))
+        return f"{stem.replace(os.sep, '_')}_{ext.lstrip('.').lower()}"
+
+    stems = {source: os.path.splitext(os.path.basename(source))[0] for source in sources}
+    for rename in (with_extension, with_path):
+        counts = Counter(stems.values())
+        clashing = [source for source in sources if counts[stems[source]] > 1]
+        if not clashing:
+            break
+        common = os.path.commonpath(clashing)
+        for source in clashing:
+            stems[source] = rename(source) if rename is with_extension else rename(source, common)
+
+    clashes = [stem for stem, n in Counter(stems.values()).items() if n > 1]
+    if clashes:
+        raise ValueError(f"varias entradas darían la misma salida: {', '.join(clashes)}")
+    return stems
+
+
+def output_paths(source: str, output: str, fmt: str, single: bool, stem: str = None):
+    """(scored, high_risk, drift): `output` es un fichero si hay una sola entrada y lleva extensión."""
+    if single and os.path.splitext(output)[1]:
+        stem, ext = os.path.splitext(output)
+        return output, f"{stem}_high_risk{ext}", f"{stem}_drift.csv"
+    stem = stem or os.path.splitext(os.path.basename(source))[0]
+    return (os.path.join(output, f"{stem}_scored.{fmt}"),
+            os.path.join(output, f"{stem}_high_risk.{fmt}"),
+            os.path.join(output, f"{stem}_drift.csv"))
+
+
+def write_sorted_extract(spill_path: str, probabilities: np.ndarray, target: str, chunksize: int) -> int:
+    """
+    Escribe en `target` las filas de `spill_path` (Arrow IPC) de mayor a menor probabilidad.
+    La tabla se lee con mmap y solo se materializan `chunksize` filas a la vez: en RAM
+    solo está el array de probabilidades (8 bytes por fila en riesgo).
+    """
+    import pyarrow as pa
+
+    order = np.argsort(-probabilities, kind='stable')
+    table = pa.ipc.open_file(pa.memory_map(spill_path)).read_all()
+    with ChunkWriter(target) as writer:
+        # Al menos una escritura: sin filas en riesgo queda un extracto vacío con sus columnas
+        for start in range(0, max(len(order), 1), chunksize):
+            writer.write(table.take(order[start:start + chunksize]).to_pandas())
+    return writer.rows
+
+
+def score_file(source: str, scored_path: str, high_risk_path: str = None,
+               threshold: float = DEFAULT_THRESHOLD, chunksize: int = DEFAULT_CHUNKSIZE,
+               keep_columns=None, drift_path: str = None, model: ModelLoader = None,
+               scorer: ParallelBatchScorer = None) -> dict:
+    """
+    Puntúa un fichero por chunks (ModelLoader.predict_batch_iter) y escribe el resultado.
+    Las filas sobre el umbral se vuelcan a un Arrow temporal junto a la salida y al
+    final se escriben ordenadas, sin tenerlas en memoria; el drift se calcula en la
+    misma pasada. Con `scorer`, cada chunk se reparte entre sus procesos.
+    """
+    model = model or _worker_model
+    start = time.perf_counter()
+    at_risk = 0
+    monitor = model.drift_monitor() if drift_path else None
+    spill_path, spill, risk_probabilities = None, None, []
+    if high_risk_path:
+        fd, spill_path = tempfile.mkstemp(suffix='.arrow', dir=os.path.dirname(high_risk_path) or '.')
+        os.close(fd)
+        spill = ChunkWriter(spill_path)
+    try:
+        with ChunkWriter(scored_path) as writer:
+            for result in model.predict_batch_iter(source, chunksize=chunksize, threshold=threshold,
+                                                   keep_columns=keep_columns, drift=monitor, scorer=scorer):
+                writer.write(result)
+                at_risk += int(result['Churn_Prediction'].sum())
+                if spill is not None:
+                    # El primer chunk se escribe aunque no tenga filas en riesgo: fija las columnas
+                    extract = result[result['Churn_Prediction'] == 1]
+                    if len(extract) or not risk_probabilities:
+                        spill.write(extract)
+                        risk_probabilities.append(extract['Churn_Probability'].to_numpy())
+        if spill is not None:
+            spill.close()
+            if risk_probabilities:
+                write_sorted_extract(spill_path, np.concatenate(risk_probabilities), high_risk_path, chunksize)
+    finally:
+        if spill is not None:
+            spill.close()
+            os.remove(spill_path)
+
+    # None = se pidió drift pero el modelo no tiene histogramas de referencia
+    drifted = [] if monitor is not None or not drift_path else None
+    if monitor is not None:
+        report = monitor.report()
+        report.to_csv(drift_path, index=False)
+        drifted = report.loc[report['Status'] == 'drift', 'Feature'].tolist()
+
+    elapsed = time.perf_counter() - start
+    return {'source': source, 'output': scored_path, 'rows': writer.rows, 'at_risk': at_risk,
+            'seconds': elapsed, 'rows_per_second': writer.rows / elapsed if elapsed else 0.0,
+            'drifted': drifted}
+
+
+def _score_job(job: dict) -> dict:
+    try:
+        return score_file(**job)
+    except SchemaValidationError as e:
+        return {'source': job['source'], 'error': str(e)}
+    except Exception as e:
+        return {'source': job['source'], 'error': f"{type(e).__name__}: {e}"}
+
+
+def _report(stats: dict):
+    name = os.path.basename(stats['source'])
+    if 'error' in stats:
+        print(f"❌ {name}: {stats['error']}", file=sys.stderr)
+        return
+    print(f"✅ {name}: {stats['rows']:,} filas en {stats['seconds']:.2f}s "
+          f"({stats['rows_per_second']:,.0f} filas/s), {stats['at_risk']:,} en riesgo -> {stats['output']}")
+    if stats['drifted'] is None:
+        print(f"⚠️ {name}: el modelo no tiene referencia de drift (python -m cli.drift_reference)", file=sys.stderr)
+    elif stats['drifted']:
+        print(f"⚠️ {name}: población distinta del entrenamiento en {', '.join(stats['drifted'])}", file=sys.stderr)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('inputs', nargs='+', help="Ficheros, globs o directorios (CSV, XLSX, Parquet, Arrow)")
+    parser.add_argument('-o', '--output', required=True,
+                        help="Directorio de salida (o fichero, si hay una sola entrada)")
+    parser.add_argument('--format', choices=('csv', 'parquet'), default=None,
+                        help="Formato de salida en modo directorio (csv por defecto)")
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD)
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNKSIZE)
+    parser.add_argument('--workers', type=int, default=1,
+                        help="Procesos: ficheros puntuados a la vez o, con un solo fichero, procesos por chunk")
+    parser.add_argument('--high-risk', action='store_true', help="Escribir también el extracto de alto riesgo")
+    parser.add_argument('--drift', action='store_true', help="Comparar cada fichero con el entrenamiento (PSI / KS)")
+    parser.add_argument('--keep-columns', default=','.join(DEFAULT_KEEP_COLUMNS),
+                        help="Columnas de la entrada que se copian a la salida (separadas por comas)")
+    parser.add_argument('--model', default=MODEL_PATH, help="Ruta del pipeline .joblib")
+    args = parser.parse_args(argv)
+
+    sources = expand_inputs(args.inputs)
+    missing = [p for p in sources if not os.path.isfile(p)]
+    if missing or not sources:
+        parser.error(f"no hay ficheros que puntuar: {', '.join(missing) or ' '.join(args.inputs)}")
+
+    single = len(sources) == 1
+    fmt = args.format or 'csv'
+    output_dir = os.path.dirname(args.output) if single and os.path.splitext(args.output)[1] else args.output
+    os.makedirs(output_dir or '.', exist_ok=True)
+    keep_columns = [c for c in args.keep_columns.split(',') if c]
+
+    try:
+        stems = output_stems(sources)
+    except ValueError as e:
+        parser.error(str(e))
+
+    jobs = []
+    for source in sources:
+        scored_path, high_risk_path, drift_path = output_paths(source, args.output, fmt, single, stems[source])
+        jobs.append({'source': source, 'scored_path': scored_path,
+                     'high_risk_path': high_risk_path if args.high_risk else None,
+                     'drift_path': drift_path if args.drift else None,
+                     'threshold': args.threshold, 'chunksize': args.chunk_size,
+                     'keep_columns': keep_columns})
+
+    workers = max(1, min(args.workers, len(jobs)))
+    if 1 < len(jobs) < args.workers:
+        print(f"⚠️ --workers {args.workers} con {len(jobs)} ficheros: se usan {workers} procesos (uno por fichero)",
+              file=sys.stderr)
+    start = time.perf_counter()
+    if workers == 1:
+        _init_worker(args.model, single_threaded=False)
+        scorer = None
+        if args.workers > 1:
+            # Un solo fichero: sus chunks se reparten entre los procesos
+            workers = args.workers
+            scorer = ParallelBatchScorer(n_workers=workers, shard_size=-(-args.chunk_size // workers),
+                                         model_loader=_worker_model)
+        results = []
+        try:
+            for job in jobs:
+                results.append(_score_job({**job, 'scorer': scorer}))
+                _report(results[-1])
+        finally:
+            if scorer is not None:
+                scorer.close()
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(args.model, True)) as pool:
+            results = []
+            for stats in pool.map(_score_job, jobs):
+                results.append(stats)
+                _report(stats)
+    elapsed = time.perf_counter() - start
+
+    done = [r for r in results if 'error' not in r]
+    rows = sum(r['rows'] for r in done)
+    print(f"📊 {len(done)}/{len(results)} ficheros, {rows:,} filas, "
+          f"{sum(r['at_risk'] for r in done):,} en riesgo en {elapsed:.2f}s "
+          f"({rows / elapsed if elapsed else 0:,.0f} filas/s, {workers} worker(s))")
+    return 0 if len(done) == len(results) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
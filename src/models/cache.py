@@ -0,0 +1,166 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_MAX_ROWS = 2_000_000
+
+# Segundos durante los que un acierto no vuelve a actualizar last_used
+_TOUCH_INTERVAL = 3600
+
+
+def file_fingerprint(path: str) -> str:
+    """sha256 del artefacto del modelo: si el .joblib cambia, la caché antigua deja de servir."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()[:16]
+
+
+def row_hashes(df: pd.DataFrame, columns) -> np.ndarray:
+    """
+    Hash de 64 bits por fila usando solo las columnas que ve el modelo.
+    Se normaliza por tipo de columna: las numéricas pasan a float (StockOptionLevel=1
+    y 1.0 dan la misma clave) y el resto a str. Una columna de texto ('1') da otra
+    clave que la numérica: eso solo cuesta un fallo de caché, nunca un acierto erróneo.
+    """
+    normalized = {}
+    for col in columns:
+        values = df[col] if col in df.columns else pd.Series(np.nan, index=df.index)
+        if pd.api.types.is_numeric_dtype(values) and not pd.api.types.is_bool_dtype(values):
+            normalized[col] = values.astype(np.float64)
+        else:
+            normalized[col] = values.astype(str)
+    hashes = pd.util.hash_pandas_object(pd.DataFrame(normalized), index=False).to_numpy()
+    # SQLite guarda enteros con signo de 64 bits
+    return hashes.view(np.int64)
+
+
+class PredictionCache:
+    """
+    Caché persistente (SQLite) de probabilidades, direccionada por contenido:
+    clave = (huella del modelo, hash de las features de la fila).
+
+    Cuando la tabla supera `max_rows` se borran las entradas usadas hace más tiempo.
+    Es segura entre hilos (las sesiones de Streamlit comparten la misma instancia).
+    """
+
+    def __init__(self, path: str, max_rows: int = DEFAULT_MAX_ROWS):
+        self.path = path
+        self.max_rows = max_rows
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS predictions (
+                model TEXT NOT NULL,
+                key INTEGER NOT NULL,
+                probability REAL NOT NULL,
+                last_used REAL NOT NULL,
+                PRIMARY KEY (model, key)
+            ) WITHOUT ROWID
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_last_used ON predictions (last_used)")
+        self._conn.commit()
+
+    def get_many(self, model: str, keys: np.ndarray) -> np.ndarray:
+        """
+        Devuelve un array alineado con `keys` con la probabilidad cacheada o NaN si no está.
+        """
+        unique_keys = np.unique(keys)
+        with self._lock:
+            # Tabla temporal + JOIN: una sola consulta en vez de miles de IN (...)
+            self._conn.execute("CREATE TEMP TABLE IF NOT EXISTS lookup (key INTEGER PRIMARY KEY)")
+            self._conn.execute("DELETE FROM lookup")
+            self._conn.executemany("INSERT INTO lookup (key) VALUES (?)",
+                                   ((k,) for k in unique_keys.tolist()))
+            rows = self._conn.execute(
+                "SELECT p.key, p.probability FROM lookup l "
+                "JOIN predictions p ON p.model = ? AND p.key = l.key",
+                (model,)
+            ).fetchall()
+            if rows:
+                # Refrescar last_used para la eviction LRU, pero sin reescribir
+                # filas que ya se tocaron hace poco (reruns seguidos del mismo fichero)
+                now = time.time()
+                self._conn.execute(
+                    "UPDATE predictions SET last_used = ? "
+                    "WHERE model = ? AND last_used < ? AND key IN (SELECT key FROM lookup)",
+                    (now, model, now - _TOUCH_INTERVAL)
+                )
+            self._conn.commit()
+
+            result = np.full(len(keys), np.nan)
+            if rows:
+                found_keys = np.fromiter((k for k, _ in rows), dtype=np.int64, count=len(rows))
+                found_probs = np.fromiter((p for _, p in rows), dtype=np.float64, count=len(rows))
+                order = np.argsort(found_keys)
+                found_keys, found_probs = found_keys[order], found_probs[order]
+                idx = np.minimum(np.searchsorted(found_keys, keys), len(found_keys) - 1)
+                hit = found_keys[idx] == keys
+                result[hit] = found_probs[idx[hit]]
+
+            n_hits = int(np.count_nonzero(~np.isnan(result)))
+            self.hits += n_hits
+            self.misses += len(result) - n_hits
+        return result
+
+    def put_many(self, model: str, keys: np.ndarray, probabilities: np.ndarray):
+        """Guarda las probabilidades; las no finitas (NaN / inf) no se cachean."""
+        now = time.time()
+        probabilities = np.asarray(probabilities, dtype=np.float64)
+        finite = np.isfinite(probabilities)
+        rows = [(model, int(k), float(p), now)
+                for k, p in zip(np.asarray(keys)[finite].tolist(), probabilities[finite].tolist())]
+        if not rows:
+            return
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO predictions (model, key, probability, last_used) VALUES (?, ?, ?, ?)",
+                rows
+            )
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self):
+        """Eviction por tamaño: borra las filas menos usadas recientemente."""
+        total = self._conn.execute("SELECT COUNT(*) FROM predictions").fetchone()[0]
+        excess = total - self.max_rows
+        if excess > 0:
+            self._conn.execute(
+                "DELETE FROM predictions WHERE (model, key) IN "
+                "(SELECT model, key FROM predictions ORDER BY last_used LIMIT ?)",
+                (excess,)
+            )
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        with self._lock:
+            size = self._conn.execute("SELECT COUNT(*) FROM predictions").fetchone()[0]
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / total if total else 0.0,
+            'entries': size,
+        }
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM predictions")
+            self._conn.commit()
+        self.hits = 0
+        self.misses = 0
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,172 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+# Fichero junto al artefacto: churn_pipeline.joblib -> churn_pipeline.calibration.json
+CALIBRATION_SUFFIX = '.calibration.json'
+# Tramos sobre la probabilidad calibrada: cada uno empieza en su corte (el primero en 0)
+DEFAULT_TIERS = {'Low': 0.0, 'Watchlist': 0.30, 'High': 0.60}
+# Puntos máximos de la tabla (la isotónica suele necesitar muchos menos; si no, se
+# reduce a este número de cuantiles y se avisa)
+DEFAULT_KNOTS = 256
+_EPS = 1e-6
+
+
+def calibration_path(model_path: str) -> str:
+    return os.path.splitext(model_path)[0] + CALIBRATION_SUFFIX
+
+
+class RiskCalibrator:
+    """
+    Calibración de probabilidades + tramos de riesgo (Low / Watchlist / High).
+
+    Los modelos se entrenan con class_weight='balanced' / scale_pos_weight, así que
+    predict_proba sobreestima el riesgo. La calibración (isotónica o Platt) se ajusta
+    offline y se guarda como una tabla monótona de puntos (x = probabilidad del
+    modelo, y = probabilidad calibrada): calibrar es un searchsorted + interpolación
+    lineal y el tramo otro searchsorted sobre los cortes, sin llamar a ningún estimador.
+
+    Sin fichero de calibración se usa la identidad (los tramos salen de la probabilidad
+    del modelo tal cual).
+    """
+
+    def __init__(self, x=(0.0, 1.0), y=(0.0, 1.0), method: str = 'identity',
+                 tiers: dict = None, model: str = None):
+        self.x = np.asarray(x, dtype=np.float64)
+        self.y = np.maximum.accumulate(np.asarray(y, dtype=np.float64))
+        if len(self.x) < 2 or np.any(np.diff(self.x) <= 0):
+            raise ValueError("La tabla de calibración necesita al menos 2 puntos con x creciente")
+        # Pendiente de cada tramo precalculada: calibrar es buscar el tramo y una multiplicación
+        self._slopes = np.diff(self.y) / np.diff(self.x)
+        self.method = method
+        tiers = self._check_tiers(tiers or DEFAULT_TIERS)
+        self.tier_labels = list(tiers)
+        # El primer tramo empieza en 0: solo hacen falta los cortes de los siguientes
+        self.tier_cuts = np.asarray(list(tiers.values())[1:], dtype=np.float64)
+        self.model = model
+
+    @staticmethod
+    def _check_tiers(tiers: dict) -> dict:
+        """
+        Tramos ordenados por corte. El más bajo tiene que empezar en 0 (si no, las
+        probabilidades por debajo de su corte caerían en él igualmente) y los cortes
+        no se pueden repetir (el tramo repetido quedaría vacío).
+        """
+        tiers = dict(sorted(tiers.items(), key=lambda item: item[1]))
+        cuts = np.asarray(list(tiers.values()), dtype=np.float64)
+        if len(cuts) == 0 or cuts[0] != 0.0:
+            raise ValueError(f"El primer tramo de riesgo debe empezar en 0: {tiers}")
+        if np.any(np.diff(cuts) <= 0) or cuts[-1] > 1.0:
+            raise ValueError(f"Los cortes de los tramos deben ser distintos y estar en [0, 1]: {tiers}")
+        return tiers
+
+    @property
+    def tiers(self) -> dict:
+        return dict(zip(self.tier_labels, [0.0] + self.tier_cuts.tolist()))
+
+    # ------------------------------------------------------------------
+    # AJUSTE (OFFLINE)
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def fit(cls, probabilities, target, method: str = 'isotonic', n_knots: int = DEFAULT_KNOTS,
+            tiers: dict = None, model: str = None):
+        """
+        Ajusta la calibración con probabilidades del modelo y la etiqueta real (0/1)
+        de un conjunto que el modelo no haya visto en el entrenamiento.
+
+        Si la isotónica tiene más de `n_knots` puntos, la tabla se reduce a `n_knots`
+        cuantiles de las probabilidades (aproximación, con aviso); n_knots=None la
+        guarda exacta. En 'sigmoid', `n_knots` es el tamaño de la rejilla.
+        """
+        probabilities = np.clip(np.asarray(probabilities, dtype=np.float64), 0.0, 1.0)
+        target = np.asarray(target, dtype=np.float64)
+
+        if method == 'isotonic':
+            from sklearn.isotonic import IsotonicRegression
+
+            iso = IsotonicRegression(y_min=0.0, y_max=1.0, out_of_bounds='clip').fit(probabilities, target)
+            # La isotónica ya es lineal a trozos: sus puntos son la tabla exacta
+            x, y = iso.X_thresholds_, iso.y_thresholds_
+            if n_knots is not None and len(x) > n_knots:
+                print(f"⚠️ La calibración isotónica tiene {len(x)} puntos: se aproxima con {n_knots} "
+                      f"(n_knots / --knots para cambiarlo)")
+                x = np.quantile(probabilities, np.linspace(0.0, 1.0, n_knots))
+                y = iso.predict(x)
+        elif method == 'sigmoid':
+            from sklearn.linear_model import LogisticRegression
+
+            n_knots = n_knots or DEFAULT_KNOTS
+            platt = LogisticRegression(C=1e6).fit(cls._logit(probabilities)[:, None], target)
+            # Más puntos donde hay datos (cuantiles) y una rejilla fija para cubrir [0, 1]
+            x = np.unique(np.concatenate([np.quantile(probabilities, np.linspace(0.0, 1.0, n_knots // 2)),
+                                          np.linspace(0.0, 1.0, n_knots // 2)]))
+            y = platt.predict_proba(cls._logit(x)[:, None])[:, 1]
+        else:
+            raise ValueError(f"Método de calibración desconocido: {method} (isotonic / sigmoid)")
+
+        x, y = cls._cover_unit_interval(np.asarray(x, dtype=np.float64), np.asarray(y, dtype=np.float64))
+        return cls(x, y, method=method, tiers=tiers, model=model)
+
+    @staticmethod
+    def _logit(p):
+        p = np.clip(p, _EPS, 1.0 - _EPS)
+        return np.log(p / (1.0 - p))
+
+    @staticmethod
+    def _cover_unit_interval(x, y):
+        """La tabla debe ir de 0 a 1: fuera de los datos se mantiene el valor del extremo."""
+        x, first = np.unique(x, return_index=True)
+        y = y[first]
+        if x[0] > 0.0:
+            x, y = np.r_[0.0, x], np.r_[y[0], y]
+        if x[-1] < 1.0:
+            x, y = np.r_[x, 1.0], np.r_[y, y[-1]]
+        return x, y
+
+    # ------------------------------------------------------------------
+    # APLICACIÓN (VECTORIZADA)
+    # ------------------------------------------------------------------
+
+    def calibrate(self, probabilities) -> np.ndarray:
+        """Probabilidad calibrada por interpolación lineal en la tabla (un searchsorted)."""
+        p = np.clip(np.asarray(probabilities, dtype=np.float64), 0.0, 1.0)
+        if self.method == 'identity':
+            return p
+        i = np.clip(np.searchsorted(self.x, p, side='right') - 1, 0, len(self._slopes) - 1)
+        return self.y[i] + (p - self.x[i]) * self._slopes[i]
+
+    def tier_codes(self, calibrated) -> np.ndarray:
+        """Índice del tramo de cada probabilidad YA calibrada (0 = el más bajo)."""
+        return np.searchsorted(self.tier_cuts, calibrated, side='right').astype(np.int8)
+
+    def risk_tiers(self, calibrated) -> pd.Categorical:
+        """Tramo de cada probabilidad ya calibrada, como categórica ordenada."""
+        return pd.Categorical.from_codes(self.tier_codes(calibrated), categories=self.tier_labels, ordered=True)
+
+    def risk_tier(self, calibrated: float) -> str:
+        return self.tier_labels[int(np.searchsorted(self.tier_cuts, calibrated, side='right'))]
+
+    # ------------------------------------------------------------------
+    # PERSISTENCIA
+    # ------------------------------------------------------------------
+
+    def save(self, path: str):
+        with open(path, 'w') as f:
+            json.dump({
+                'method': self.method,
+                'model': self.model,
+                'tiers': self.tiers,
+                'x': self.x.tolist(),
+                'y': self.y.tolist(),
+            }, f)
+        print(f"💾 Calibración guardada en: {path}")
+        return path
+
+    @classmethod
+    def load(cls, path: str):
+        with open(path) as f:
+            data = json.load(f)
+        return cls(data['x'], data['y'], method=data['method'], tiers=data.get('tiers'), model=data.get('model'))
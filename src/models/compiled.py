@@ -0,0 +1,172 @@
+import numpy as np
+import pandas as pd
+
+from src.models.schema import LOG_PREFIX, SATISFACTION_COLUMNS, InputSchema, _codes_of
+
+
+def _unwrap(transformer):
+    """Devuelve el estimador final de un sub-pipeline (ej: Pipeline([('scaler', ...)]))."""
+    from sklearn.pipeline import Pipeline
+
+    if isinstance(transformer, Pipeline):
+        steps = [step for _, step in transformer.steps if step not in (None, 'passthrough')]
+        if len(steps) != 1:
+            return None
+        return steps[0]
+    return transformer
+
+
+class CompiledLinearScorer:
+    """
+    Flattened version of a `preprocessor` + linear `classifier` Pipeline.
+
+    The StandardScaler statistics are folded into the coefficients and every
+    one-hot vocabulary becomes an array of weights indexed by the InputSchema
+    category codes, so scoring is one dot product plus a gather per categorical column.
+    """
+
+    def __init__(self, intercept, num_cols, num_weights, cat_cols, cat_vocab, cat_weights, schema=None):
+        self.intercept = float(intercept)
+        self.num_cols = list(num_cols)
+        self.num_weights = np.asarray(num_weights, dtype=np.float64)
+        self.cat_cols = list(cat_cols)
+        self.cat_vocab = cat_vocab            # col -> categorías del OneHotEncoder (mismo orden)
+        self.cat_weights = cat_weights        # col -> np.ndarray de pesos alineados con cat_vocab
+        # Mismo esquema que el camino del Pipeline: StockOptionLevel=1, 1.0 y '1' -> mismo código
+        self.schema = schema
+
+    @classmethod
+    def from_pipeline(cls, pipeline):
+        """
+        Extrae los arrays del Pipeline entrenado.
+        Devuelve None si el pipeline no es (scaler + onehot) -> modelo lineal binario.
+        """
+        # sklearn se importa aquí (no al importar el módulo) para no frenar el arranque
+        from sklearn.preprocessing import StandardScaler, OneHotEncoder
+
+        try:
+            preprocessor = pipeline.named_steps['preprocessor']
+            classifier = pipeline.named_steps['classifier']
+        except (AttributeError, KeyError):
+            return None
+
+        coef = getattr(classifier, 'coef_', None)
+        intercept = getattr(classifier, 'intercept_', None)
+        if coef is None or intercept is None or np.ndim(coef) != 2 or coef.shape[0] != 1:
+            return None
+        if not hasattr(classifier, 'predict_proba'):
+            return None
+        coef = np.asarray(coef[0], dtype=np.float64)
+
+        num_cols, num_weights = [], []
+        cat_cols, cat_vocab, cat_weights = [], {}, {}
+        bias = float(np.ravel(intercept)[0])
+        offset = 0
+
+        for _, transformer, columns in preprocessor.transformers_:
+            if isinstance(transformer, str) and transformer == 'drop':
+                continue
+            est = _unwrap(transformer)
+            columns = list(columns)
+
+            if isinstance(est, StandardScaler):
+                n = len(columns)
+                w = coef[offset:offset + n]
+                mean = est.mean_ if est.with_mean else np.zeros(n)
+                scale = est.scale_ if est.with_std else np.ones(n)
+                # (x - mean) / scale * w  ==  x * (w / scale) - mean * w / scale
+                num_cols.extend(columns)
+                num_weights.extend(w / scale)
+                bias -= float(np.sum(mean * w / scale))
+                offset += n
+
+            elif isinstance(est, OneHotEncoder):
+                if est.drop is not None or est.handle_unknown != 'ignore':
+                    return None
+                for col, cats in zip(columns, est.categories_):
+                    n = len(cats)
+                    cat_cols.append(col)
+                    cat_vocab[col] = np.asarray(cats, dtype=object)
+                    cat_weights[col] = coef[offset:offset + n].copy()
+                    offset += n
+
+            else:
+                return None
+
+        if offset != coef.shape[0]:
+            return None
+
+        schema = InputSchema.from_pipeline(pipeline)
+        if any(not np.array_equal(schema.categorical[col], cat_vocab[col]) for col in cat_cols):
+            return None
+        return cls(bias, num_cols, num_weights, cat_cols, cat_vocab, cat_weights, schema=schema)
+
+    # ------------------------------------------------------------------
+    # SCORING
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _sigmoid(z):
+        return 1.0 / (1.0 + np.exp(-z))
+
+    def predict_proba_prepared(self, prepared) -> np.ndarray:
+        """
+        Probabilidades a partir de la salida de InputSchema.prepare (dict de arrays o DF):
+        numéricas y Log_* ya derivadas, categóricas como códigos del encoder.
+        Las categorías desconocidas (código -1) aportan 0, igual que handle_unknown='ignore'.
+        """
+        n = len(prepared[self.schema.features[0]])
+        z = np.full(n, self.intercept)
+        if self.num_cols:
+            X = np.column_stack([np.asarray(prepared[col], dtype=np.float64) for col in self.num_cols])
+            z += X @ self.num_weights
+        for col in self.cat_cols:
+            codes = _codes_of(prepared[col])
+            z += np.where(codes >= 0, self.cat_weights[col][codes], 0.0)
+        return self._sigmoid(z)
+
+    def predict_proba_one(self, record: dict) -> float:
+        """Probabilidad de churn para un solo diccionario de valores crudos."""
+        return float(self.predict_proba_prepared(self.schema.prepare(record))[0])
+
+    def predict_proba(self, records) -> np.ndarray:
+        """
+        Probabilidades para valores crudos (pasan por el esquema): un dict, un DataFrame,
+        un record array de NumPy o una lista de dicts.
+        """
+        return self.predict_proba_prepared(self.schema.prepare(records))
+
+    # ------------------------------------------------------------------
+    # PARITY CHECK
+    # ------------------------------------------------------------------
+
+    def _probe_records(self, n_rows: int = 16):
+        """
+        (crudos, esperados): filas sintéticas que recorren el vocabulario de cada categoría.
+        Los crudos llevan las columnas de origen (MonthlyIncome, no Log_MonthlyIncome) y las
+        categorías numéricas como número (StockOptionLevel=1.0); los esperados, la preparación
+        del notebook (log1p + categorías como texto) que es lo que vio el Pipeline al entrenar.
+        """
+        rng = np.random.default_rng(0)
+        raw = {col: rng.lognormal(1.0, 1.0, n_rows) for col in self.schema.numeric}
+        for col, categories in self.schema.categorical.items():
+            values = [categories[i % len(categories)] for i in range(n_rows)]
+            as_number = pd.to_numeric(pd.Series(values, dtype=object), errors='coerce')
+            raw[col] = [float(v) if not np.isnan(n) else v for v, n in zip(values, as_number)]
+        raw = pd.DataFrame(raw)
+
+        expected = raw.copy()
+        for feature in self.schema.features:
+            if feature.startswith(LOG_PREFIX):
+                expected[feature] = np.log1p(raw[feature[len(LOG_PREFIX):]])
+            elif feature == 'TotalSatisfaction' and feature not in raw:
+                expected[feature] = sum(raw[c] for c in SATISFACTION_COLUMNS)
+        for col, categories in self.schema.categorical.items():
+            expected[col] = [categories[i % len(categories)] for i in range(n_rows)]
+        return raw, expected[self.schema.features]
+
+    def matches(self, pipeline, atol: float = 1e-8) -> bool:
+        """Compara contra Pipeline.predict_proba; si difiere no se debe usar el modo compilado."""
+        raw, expected = self._probe_records()
+        reference = pipeline.predict_proba(expected)[:, 1]
+        return bool(np.allclose(self.predict_proba(raw), reference, atol=atol))
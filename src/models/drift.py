@@ -0,0 +1,204 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from src.models.schema import LOG_PREFIX
+
+# Fichero junto al artefacto: churn_pipeline.joblib -> churn_pipeline.drift.json
+DRIFT_SUFFIX = '.drift.json'
+DEFAULT_BINS = 10
+# Umbrales habituales del PSI: < 0.10 estable, < 0.25 cambio moderado, resto drift
+PSI_MODERATE = 0.10
+PSI_DRIFT = 0.25
+# Proporción mínima por bin (evita log(0) en bins vacíos)
+_EPS = 1e-4
+
+
+def drift_path(model_path: str) -> str:
+    return os.path.splitext(model_path)[0] + DRIFT_SUFFIX
+
+
+def _numeric_values(chunk: pd.DataFrame, name: str) -> np.ndarray:
+    """
+    Valores float de la columna; lo no numérico cuenta como ausente.
+    Log_X se usa tal cual si el chunk ya viene preparado y si no se deriva de X.
+    """
+    source = name[len(LOG_PREFIX):] if name.startswith(LOG_PREFIX) and name not in chunk.columns else name
+    values = chunk[source]
+    if not pd.api.types.is_numeric_dtype(values) or pd.api.types.is_bool_dtype(values):
+        values = pd.to_numeric(values, errors='coerce')
+    values = values.to_numpy(dtype=np.float64, na_value=np.nan)
+    if source != name:
+        with np.errstate(invalid='ignore', divide='ignore'):
+            values = np.log1p(values)
+    return values
+
+
+def _histogram(values: np.ndarray, edges: np.ndarray) -> np.ndarray:
+    """
+    Conteos por bin (bin = nº de cortes <= valor, como searchsorted side='right')
+    más el de ausentes al final. Con ~10 cortes, contar comparaciones es varias
+    veces más rápido que un searchsorted por valor.
+    """
+    n_valid = len(values) - int(np.count_nonzero(np.isnan(values)))
+    below = [np.count_nonzero(values < edge) for edge in edges]
+    return np.diff(np.array([0, *below, n_valid, len(values)], dtype=np.int64))
+
+
+class DriftReference:
+    """
+    Histogramas de referencia (datos de entrenamiento) de cada feature que ve el modelo:
+    las crudas, las Log_* derivadas y las categóricas.
+
+    - numéricas: cortes por cuantiles (o entre valores, si la columna es discreta,
+      ej: JobLevel 1-5) + un bin final de ausentes / no numéricos.
+    - categóricas: categorías de entrenamiento + un bin '(other)' (desconocidas / ausentes).
+    """
+
+    def __init__(self, features: dict, rows: int = 0, model: str = None):
+        self.features = features
+        self.rows = rows
+        self.model = model
+        for spec in features.values():
+            if spec['kind'] == 'numeric':
+                spec['edges'] = np.asarray(spec['edges'], dtype=np.float64)
+            else:
+                spec['index'] = pd.Index([str(c) for c in spec['categories']])
+            spec['proportions'] = np.asarray(spec.get('proportions', []), dtype=np.float64)
+
+    @staticmethod
+    def _edges(values: np.ndarray, n_bins: int) -> np.ndarray:
+        values = values[~np.isnan(values)]
+        unique = np.unique(values)
+        if len(unique) <= n_bins:
+            # Discreta: un bin por valor (cortes a mitad de camino)
+            return (unique[:-1] + unique[1:]) / 2
+        return np.unique(np.quantile(values, np.linspace(0.0, 1.0, n_bins + 1)[1:-1]))
+
+    @classmethod
+    def fit(cls, df: pd.DataFrame, schema, n_bins: int = DEFAULT_BINS, model: str = None):
+        """Histogramas de `df` (los datos de entrenamiento) para las features del esquema."""
+        features = {}
+        for name in schema.numeric + [LOG_PREFIX + col for col in schema.log_sources]:
+            features[name] = {'kind': 'numeric', 'edges': cls._edges(_numeric_values(df, name), n_bins)}
+        for col, categories in schema.categorical.items():
+            features[col] = {'kind': 'categorical', 'categories': [str(c) for c in categories]}
+
+        reference = cls(features, model=model)
+        counts = DriftMonitor(reference).update(df).counts
+        for name, spec in reference.features.items():
+            spec['proportions'] = counts[name] / max(len(df), 1)
+        reference.rows = len(df)
+        return reference
+
+    def save(self, path: str):
+        features = {}
+        for name, spec in self.features.items():
+            saved = {'kind': spec['kind'], 'proportions': spec['proportions'].tolist()}
+            if spec['kind'] == 'numeric':
+                saved['edges'] = spec['edges'].tolist()
+            else:
+                saved['categories'] = list(spec['categories'])
+            features[name] = saved
+        with open(path, 'w') as f:
+            json.dump({'model': self.model, 'rows': self.rows, 'features': features}, f)
+        print(f"💾 Histogramas de referencia guardados en: {path}")
+        return path
+
+    @classmethod
+    def load(cls, path: str):
+        with open(path) as f:
+            data = json.load(f)
+        return cls(data['features'], rows=data.get('rows', 0), model=data.get('model'))
+
+
+class DriftMonitor:
+    """
+    Acumula histogramas de un lote, chunk a chunk (una sola pasada), y los compara
+    con la referencia: PSI por feature y, en las numéricas, KS sobre los histogramas.
+
+        monitor = model_service.drift_monitor()
+        for chunk in chunks:
+            monitor.update(chunk)
+        monitor.report()
+    """
+
+    def __init__(self, reference: DriftReference):
+        self.reference = reference
+        self.rows = 0
+        self.counts = {}
+        for name, spec in reference.features.items():
+            n_bins = len(spec['edges']) + 2 if spec['kind'] == 'numeric' else len(spec['index']) + 1
+            self.counts[name] = np.zeros(n_bins, dtype=np.int64)
+
+    def update(self, chunk: pd.DataFrame):
+        """
+        Suma los histogramas de `chunk`. Vale tanto el chunk crudo como el ya preparado
+        por el esquema (ahí reutiliza las Log_* y los códigos de las categóricas).
+        """
+        for name, spec in self.reference.features.items():
+            counts = self.counts[name]
+            source = name[len(LOG_PREFIX):] if name.startswith(LOG_PREFIX) else name
+            if name not in chunk.columns and source not in chunk.columns:
+                counts[-1] += len(chunk)
+            elif spec['kind'] == 'numeric':
+                counts += _histogram(_numeric_values(chunk, name), spec['edges'])
+            else:
+                counts += self._category_counts(chunk[name], spec['index'])
+        self.rows += len(chunk)
+        return self
+
+    def _category_counts(self, column: pd.Series, index: pd.Index) -> np.ndarray:
+        n = len(index)
+        if isinstance(column.dtype, pd.CategoricalDtype) and index.equals(
+                pd.Index(self._category_keys(column.cat.categories))):
+            # Chunk preparado: mismas categorías que el encoder, basta con contar los códigos
+            codes = column.cat.codes.to_numpy()
+            return np.bincount(np.where(codes < 0, n, codes), minlength=n + 1)
+        # value_counts agrupa en el motor de la columna (Arrow para texto): sin bucle por fila
+        seen = column.value_counts()
+        positions = index.get_indexer(self._category_keys(seen.index))
+        known = positions >= 0
+        counts = np.zeros(n + 1, dtype=np.int64)
+        np.add.at(counts, positions[known], seen.to_numpy()[known])
+        counts[-1] = len(column) - counts[:-1].sum()
+        return counts
+
+    @staticmethod
+    def _category_keys(values: pd.Index) -> list:
+        """Texto de cada categoría vista; StockOptionLevel=1 o 1.0 -> '1', como en el esquema."""
+        if pd.api.types.is_numeric_dtype(values) and not pd.api.types.is_bool_dtype(values):
+            return [str(int(v)) if float(v).is_integer() else str(v) for v in values]
+        return [str(v) for v in values]
+
+    @staticmethod
+    def _psi(expected: np.ndarray, actual: np.ndarray) -> float:
+        expected = np.clip(expected, _EPS, None)
+        actual = np.clip(actual, _EPS, None)
+        return float(np.sum((actual - expected) * np.log(actual / expected)))
+
+    def report(self) -> pd.DataFrame:
+        """Una fila por feature: PSI, KS (numéricas), % de ausentes/desconocidos y estado."""
+        rows = []
+        for name, spec in self.reference.features.items():
+            actual = self.counts[name] / max(self.rows, 1)
+            expected = spec['proportions']
+            ks = np.nan
+            if spec['kind'] == 'numeric':
+                # KS sobre las CDF de los bins con valor (sin el de ausentes), renormalizadas
+                cdf_expected = np.cumsum(expected[:-1]) / max(expected[:-1].sum(), _EPS)
+                cdf_actual = np.cumsum(actual[:-1]) / max(actual[:-1].sum(), _EPS)
+                ks = float(np.max(np.abs(cdf_actual - cdf_expected)))
+            psi = self._psi(expected, actual)
+            rows.append({
+                'Feature': name,
+                'Type': spec['kind'],
+                'PSI': psi,
+                'KS': ks,
+                'Missing_Or_Unknown': float(actual[-1]),
+                'Status': 'drift' if psi >= PSI_DRIFT else 'moderate' if psi >= PSI_MODERATE else 'stable',
+            })
+        report = pd.DataFrame(rows, columns=['Feature', 'Type', 'PSI', 'KS', 'Missing_Or_Unknown', 'Status'])
+        return report.sort_values('PSI', ascending=False, kind='stable').reset_index(drop=True)
@@ -0,0 +1,111 @@
+import numpy as np
+import pandas as pd
+
+
+class Explainer:
+    """
+    Contribuciones por empleado (no solo la importancia global del modelo).
+
+    - Lineal (LogisticRegression): valor transformado * coeficiente.
+    - XGBoost: contribuciones TreeSHAP nativas (pred_contribs=True).
+    - Árboles de sklearn (RandomForest / DecisionTree): atribución por camino
+      (Saabas): cada split suma a su feature el cambio de probabilidad que produce.
+
+    Todo se calcula con operaciones de matriz sobre el lote completo. Los nombres
+    de features, coeficientes y matrices de los árboles se calculan una sola vez.
+    """
+
+    def __init__(self, pipeline):
+        self.preprocessor = pipeline.named_steps['preprocessor']
+        self.classifier = pipeline.named_steps['classifier']
+        self.feature_names = np.asarray(self.preprocessor.get_feature_names_out())
+
+        coef = getattr(self.classifier, 'coef_', None)
+        if coef is not None and np.ndim(coef) == 2 and coef.shape[0] == 1:
+            self.kind = 'linear'
+            self.coefficients = np.asarray(coef[0], dtype=np.float64)
+        elif hasattr(self.classifier, 'get_booster'):
+            self.kind = 'xgboost'
+        elif hasattr(self.classifier, 'tree_') or hasattr(self.classifier, 'estimators_'):
+            self.kind = 'tree'
+            trees = getattr(self.classifier, 'estimators_', [self.classifier])
+            positive = list(self.classifier.classes_).index(1)
+            self._tree_matrices = [self._edge_matrix(tree.tree_, positive) for tree in trees]
+            self._trees = trees
+        else:
+            raise ValueError(f"Modelo no soportado para explicaciones: {type(self.classifier).__name__}")
+
+    def global_importance(self) -> pd.DataFrame:
+        """Tabla global de pesos (solo modelos lineales), la de get_feature_importance."""
+        if self.kind != 'linear':
+            return pd.DataFrame()
+        return pd.DataFrame({'Variable': self.feature_names, 'Peso': self.coefficients})
+
+    # ------------------------------------------------------------------
+    # CONTRIBUCIONES
+    # ------------------------------------------------------------------
+
+    def _edge_matrix(self, tree, positive: int):
+        """
+        Matriz dispersa (nodos x features): D[hijo, feature del padre] = p(hijo) - p(padre).
+        Con decision_path (filas x nodos) la atribución de un árbol es decision_path @ D.
+        """
+        from scipy import sparse
+
+        value = tree.value[:, 0, :]
+        prob = value[:, positive] / value.sum(axis=1)
+
+        parent = np.full(tree.node_count, -1)
+        for side in (tree.children_left, tree.children_right):
+            is_split = side >= 0
+            parent[side[is_split]] = np.nonzero(is_split)[0]
+
+        children = np.nonzero(parent >= 0)[0]
+        rows = children
+        cols = tree.feature[parent[children]]
+        data = prob[children] - prob[parent[children]]
+        return sparse.csr_matrix((data, (rows, cols)),
+                                 shape=(tree.node_count, len(self.feature_names)))
+
+    def contributions(self, X_transformed) -> np.ndarray:
+        """Matriz (filas x features transformadas) con la aportación de cada feature."""
+        X_transformed = np.asarray(X_transformed, dtype=np.float64)
+
+        if self.kind == 'linear':
+            return X_transformed * self.coefficients
+
+        if self.kind == 'xgboost':
+            import xgboost as xgb
+
+            contribs = self.classifier.get_booster().predict(
+                xgb.DMatrix(X_transformed), pred_contribs=True)
+            return contribs[:, :-1]   # la última columna es el bias
+
+        total = np.zeros(X_transformed.shape, dtype=np.float64)
+        for tree, edges in zip(self._trees, self._tree_matrices):
+            total += (tree.decision_path(X_transformed.astype(np.float32)) @ edges).toarray()
+        return total / len(self._trees)
+
+    def top_drivers(self, contributions: np.ndarray, k: int = 3, index=None) -> pd.DataFrame:
+        """
+        Top-k features que más empujan hacia el churn en cada fila (formato largo:
+        una fila por empleado y driver), sin ordenar la matriz entera.
+        """
+        n_rows, n_features = contributions.shape
+        k = min(k, n_features)
+        if n_rows == 0 or k == 0:
+            return pd.DataFrame(columns=['row', 'rank', 'Variable', 'Peso'])
+
+        top = np.argpartition(-contributions, k - 1, axis=1)[:, :k]
+        top_values = np.take_along_axis(contributions, top, axis=1)
+        order = np.argsort(-top_values, axis=1)
+        top = np.take_along_axis(top, order, axis=1)
+        top_values = np.take_along_axis(top_values, order, axis=1)
+
+        rows = np.arange(n_rows) if index is None else np.asarray(index)
+        return pd.DataFrame({
+            'row': np.repeat(rows, k),
+            'rank': np.tile(np.arange(1, k + 1), n_rows),
+            'Variable': self.feature_names[top.ravel()],
+            'Peso': top_values.ravel(),
+        })
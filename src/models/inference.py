@@ -1,149 +1,494 @@
-import joblib
 import pandas as pd
 import numpy as np
 import os
+import threading
+
+from src.models.cache import PredictionCache, file_fingerprint, row_hashes
+from src.models.calibration import RiskCalibrator, calibration_path
+from src.models.drift import DriftMonitor, DriftReference, drift_path
+from src.models.compiled import CompiledLinearScorer
+from src.models.explain import Explainer
+from src.models.metrics import NullMetrics, InProcessMetrics
+from src.models.schema import InputSchema
+from src.models.streaming import DEFAULT_CHUNKSIZE, ChunkWriter, iter_chunks, read_frame
 
 # Ruta al modelo
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 MODEL_PATH = os.path.join(BASE_DIR, 'models', 'churn_pipeline.joblib')
+# Copia sin comprimir del pipeline: sus arrays se pueden mapear en memoria y compartir entre procesos
+MMAP_MODEL_PATH = os.path.join(BASE_DIR, 'models', 'churn_pipeline.mmap.joblib')
+CACHE_PATH = os.path.join(BASE_DIR, '.cache', 'predictions.sqlite')
+
+# Umbral por defecto (equivale a Pipeline.predict). La app lo sobreescribe con el slider.
+DEFAULT_THRESHOLD = 0.5
 
 class ModelLoader:
-    def __init__(self):
+    def __init__(self, compiled: bool = False, mmap: bool = False, model_path: str = None):
+        """
+        El modelo NO se carga aquí: se carga la primera vez que hace falta
+        (o al llamar a warm_up()), así importar este módulo es barato.
+
+        compiled=True activa el fast path lineal: si el clasificador es lineal
+        (LogisticRegression), se puntúa sin DataFrame ni ColumnTransformer.
+        mmap=True carga el artefacto sin comprimir en modo memory-map (ver export_mmap_artifact).
+        model_path permite servir otro .joblib (por defecto MODEL_PATH).
+        """
+        self.model_path = model_path or MODEL_PATH
         self.model = None
-        self.load_model()
+        self.compiled = compiled
+        self.mmap = mmap
+        self.compiled_scorer = None
+        self.schema = None
+        self.model_fingerprint = None
+        self.calibrator = RiskCalibrator()
+        self.drift_reference = None
+        self.cache = None
+        self._explainer = None
+        self.metrics = NullMetrics()
+        self._load_lock = threading.Lock()
+        # Aciertos / fallos de caché por hilo (cada sesión de Streamlit corre en el suyo)
+        self._cache_counts = threading.local()
+
+    def _ensure_loaded(self):
+        """Load-once y thread-safe: varios hilos de Streamlit/API pueden llegar a la vez."""
+        if self.model is None:
+            with self._load_lock:
+                if self.model is None:
+                    self._load()
 
     def load_model(self):
-        if os.path.exists(MODEL_PATH):
-            self.model = joblib.load(MODEL_PATH)
-            print(f"✅ Modelo cargado desde: {MODEL_PATH}")
+        """Fuerza la (re)carga del pipeline desde disco."""
+        with self._load_lock:
+            self._load()
+
+    def _load(self):
+        import joblib
+
+        mmap_path = self.mmap_path
+        use_mmap = self.mmap and os.path.exists(mmap_path)
+        path = mmap_path if use_mmap else self.model_path
+        if os.path.exists(path):
+            with self.metrics.timer('model_load_seconds'):
+                model = joblib.load(path, mmap_mode='r' if use_mmap else None)
+                self.model_fingerprint = file_fingerprint(path)
+            self.metrics.inc('model_loads_total')
+            print(f"✅ Modelo cargado desde: {path}")
         else:
-            raise FileNotFoundError(f"❌ No se encuentra el modelo en {MODEL_PATH}")
-        
-    def _preprocess(self, df: pd.DataFrame):
-        """Internal helper to clean data before prediction"""
-        df = df.copy()
-        
-        # 1. Type Corrections
-        if 'StockOptionLevel' in df.columns:
-            df['StockOptionLevel'] = df['StockOptionLevel'].astype(str)
-            
-        numeric_cols = ['MonthlyIncome', 'DistanceFromHome']
-        for col in numeric_cols:
-            if col in df.columns:
-                df[col] = df[col].astype(float)
-                # Feature Engineering
-                df[f'Log_{col}'] = np.log1p(df[col])
-        
-        return df
+            self.metrics.inc('model_load_errors_total')
+            raise FileNotFoundError(f"❌ No se encuentra el modelo en {path}")
+
+        if self.compiled:
+            with self.metrics.timer('model_compile_seconds'):
+                self._compile(model)
+        else:
+            self.compiled_scorer = None
+        self.schema = InputSchema.from_pipeline(model)
+        self.calibrator = self._load_sidecar(calibration_path(self.model_path), RiskCalibrator.load,
+                                             use_mmap) or RiskCalibrator()
+        self.drift_reference = self._load_sidecar(drift_path(self.model_path), DriftReference.load, use_mmap)
+        self._explainer = None
+        self.model = model
+
+    def _load_sidecar(self, path: str, load, use_mmap: bool = False):
+        """
+        Fichero auxiliar junto al .joblib (calibración, histogramas de referencia).
+        Si no existe o es de otra versión del modelo, None.
+        """
+        if not os.path.exists(path):
+            return None
+        sidecar = load(path)
+        # La huella se guarda con el .joblib original (la copia mmap tiene otra)
+        fingerprint = file_fingerprint(self.model_path) if use_mmap else self.model_fingerprint
+        if sidecar.model and sidecar.model != fingerprint:
+            print(f"⚠️ {path} es de otra versión del modelo ({sidecar.model}): se ignora")
+            return None
+        print(f"📎 Cargado: {path}")
+        return sidecar
+
+    def warm_up(self):
+        """
+        Hook explícito de arranque: carga el modelo y hace una predicción de prueba
+        para que la primera petición real no pague el coste de inicialización.
+        """
+        self._ensure_loaded()
+        self._predict_proba_uncached(pd.DataFrame([self._probe_row()]))
+        return self
+
+    def _probe_row(self) -> dict:
+        """Fila válida cualquiera: 0 en las numéricas, primera categoría en las categóricas."""
+        categorical = self.schema.categorical
+        return {col: categorical[col][0] if col in categorical else 0.0
+                for col in self.schema.required_columns}
+
+    @property
+    def mmap_path(self) -> str:
+        """churn_pipeline.joblib -> churn_pipeline.mmap.joblib (junto al original)."""
+        if self.model_path == MODEL_PATH:
+            return MMAP_MODEL_PATH
+        return os.path.splitext(self.model_path)[0] + '.mmap.joblib'
+
+    def export_mmap_artifact(self, path: str = None):
+        """Guarda el pipeline sin comprimir para poder cargarlo con mmap_mode='r'."""
+        import joblib
+
+        path = path or self.mmap_path
+        self._ensure_loaded()
+        joblib.dump(self.model, path, compress=0)
+        print(f"💾 Artefacto mmap guardado en: {path}")
+        return path
+
+    def _compile(self, model=None):
+        """Flatten the pipeline into NumPy arrays; keep the sklearn path if it can't be done."""
+        model = self.model if model is None else model
+        scorer = CompiledLinearScorer.from_pipeline(model)
+        if scorer is not None and scorer.matches(model):
+            self.compiled_scorer = scorer
+            print("⚡ Modo compilado activo (modelo lineal)")
+        else:
+            self.compiled_scorer = None
+            print("ℹ️ Modelo no lineal: se usa el Pipeline completo")
         
+    def enable_cache(self, path: str = CACHE_PATH, max_rows: int = None):
+        """
+        Activa la caché persistente de predicciones para predict_batch.
+        Es idempotente: la app lo llama en cada rerun de Streamlit.
+        """
+        if self.cache is None or self.cache.path != path:
+            kwargs = {} if max_rows is None else {'max_rows': max_rows}
+            self.cache = PredictionCache(path, **kwargs)
+        return self.cache
+
+    def cache_stats(self) -> dict:
+        """Contadores de toda la vida de la caché (compartida por todas las sesiones)."""
+        return self.cache.stats() if self.cache is not None else {}
+
+    def take_cache_counts(self) -> dict:
+        """
+        Aciertos / fallos de caché de las llamadas de ESTE hilo desde la última vez que
+        se pidieron (y los pone a cero). Vacío si en ese tiempo no se usó la caché.
+        """
+        counts = getattr(self._cache_counts, 'value', None)
+        self._cache_counts.value = None
+        if counts is None:
+            return {}
+        total = counts['hits'] + counts['misses']
+        return {**counts, 'hit_rate': counts['hits'] / total if total else 0.0}
+
+    @property
+    def expensive_to_score(self) -> bool:
+        """
+        True si puntuar cuesta más que buscar en la caché (árboles: XGBoost, RandomForest).
+        Un modelo lineal puntúa más rápido de lo que tarda el lookup en SQLite.
+        """
+        self._ensure_loaded()
+        return self.compiled_scorer is None and not hasattr(self.model[-1], 'coef_')
+
+    def enable_metrics(self, metrics=None):
+        """
+        Activa la instrumentación (tiempos por etapa, filas, tamaños de lote, caché y cargas).
+        Por defecto usa el colector en memoria; se puede pasar cualquier objeto
+        con la interfaz de NullMetrics (observe / inc / timer).
+        """
+        if metrics is None:
+            metrics = self.metrics if self.metrics.enabled else InProcessMetrics()
+        self.metrics = metrics
+        return metrics
+
+    def disable_metrics(self):
+        self.metrics = NullMetrics()
+
+    def _preprocess(self, data, inplace: bool = False):
+        """
+        Tipos, categorías y features derivadas (Log_*, TotalSatisfaction) según el
+        esquema compilado del modelo. Mismo código para un dict y para un DataFrame.
+        """
+        return self.schema.prepare(data, inplace=inplace)
+
+    def _transform(self, prepared):
+        """Matriz del clasificador: NumPy directo si el esquema lo permite, si no el ColumnTransformer."""
+        X = self.schema.transform(prepared)
+        if X is None:
+            X = self.model[:-1].transform(self.schema.to_frame(prepared))
+        return X
+
+    @property
+    def explainer(self):
+        """
+        Nombres de features, coeficientes y matrices de árboles: se calculan
+        una vez por modelo cargado y se reutilizan en cada clic.
+        """
+        self._ensure_loaded()
+        if self._explainer is None:
+            self._explainer = Explainer(self.model)
+        return self._explainer
+
     def get_feature_importance(self):
         """
         Extrae los coeficientes del modelo para explicar qué variables pesan más.
         """
-        if not self.model:
-            self.load_model()
-
         try:
-            # 1. Acceder a los pasos del Pipeline
-            # Asumimos que tu pipeline tiene pasos llamados 'preprocessor' y 'classifier'
-            # (Es el estándar si usaste ColumnTransformer y LogisticRegression en un Pipeline)
-            classifier = self.model.named_steps['classifier']
-            preprocessor = self.model.named_steps['preprocessor']
-
-            # 2. Obtener los nombres de las features tras el OneHotEncoding
-            # Esto es necesario porque 'Department' se convierte en 'Department_Sales', etc.
-            feature_names = preprocessor.get_feature_names_out()
-
-            # 3. Obtener los coeficientes (pesos)
-            # LogisticRegression devuelve una matriz de forma (1, n_features), cogemos la primera fila
-            coefficients = classifier.coef_[0]
-
-            # 4. Crear DataFrame
-            df_imp = pd.DataFrame({
-                'Variable': feature_names,
-                'Peso': coefficients
-            })
-
-            # 5. Calcular impacto absoluto para ordenar
+            # Tabla global (Variable, Peso) cacheada en el Explainer
+            df_imp = self.explainer.global_importance()
+            if df_imp.empty:
+                return df_imp
+
+            # Calcular impacto absoluto para ordenar y devolver el Top 10
             df_imp['AbsPeso'] = df_imp['Peso'].abs()
-            
-            # 6. Devolver el Top 10 ordenado
             return df_imp.sort_values(by='AbsPeso', ascending=False).head(10)
 
         except Exception as e:
             print(f"Error extrayendo importancia: {e}")
             # Si falla (ej: el modelo no es lineal o el pipeline es distinto), devolvemos vacío
             return pd.DataFrame()
-        
 
-    def predict(self, input_data: dict):
-        if not self.model:
-            self.load_model()
-            
-        # 1. Convertir diccionario a DataFrame
-        df_input = pd.DataFrame([input_data])
-        
-        # ---------------------------------------------------------
-        # 🚨 CORRECCIÓN DE TIPOS (CRÍTICO)
-        # ---------------------------------------------------------
-        
-        # A. La variable traicionera: StockOptionLevel debe ser STRING
-        # Aunque sea un número (0,1,2), el modelo la aprendió como categoría "0", "1"...
-        if 'StockOptionLevel' in df_input.columns:
-            df_input['StockOptionLevel'] = df_input['StockOptionLevel'].astype(str)
-            
-        # B. Asegurar que las numéricas sean float (por seguridad)
-        # Esto evita problemas con np.log1p si llegan como strings
-        numeric_cols_to_log = ['MonthlyIncome', 'DistanceFromHome']
-        for col in numeric_cols_to_log:
-            df_input[col] = df_input[col].astype(float)
-
-        # ---------------------------------------------------------
-        # 🧪 FEATURE ENGINEERING
-        # ---------------------------------------------------------
-        
-        # C. Aplicar Logaritmos (Feature Engineering del Notebook)
-        df_input['Log_MonthlyIncome'] = np.log1p(df_input['MonthlyIncome'])
-        df_input['Log_DistanceFromHome'] = np.log1p(df_input['DistanceFromHome'])
-        
-        # D. (Opcional) Borrar columnas originales si quieres limpiar, 
-        # aunque sklearn suele ignorarlas si no están en su lista.
-        # df_input.drop(columns=['MonthlyIncome', 'DistanceFromHome'], inplace=True)
+    def _contributions(self, df: pd.DataFrame) -> np.ndarray:
+        """Preprocesa y transforma el lote una sola vez y calcula todas las contribuciones."""
+        self._ensure_loaded()
+        return self.explainer.contributions(self._transform(self._preprocess(df)))
+
+    def explain(self, input_data: dict) -> pd.DataFrame:
+        """
+        Por qué ESTE empleado tiene este riesgo: aportación de cada feature
+        (mismas columnas que get_feature_importance: Variable, Peso, AbsPeso).
+        """
+        try:
+            contribs = self._contributions(input_data)[0]
+            df_imp = pd.DataFrame({'Variable': self.explainer.feature_names, 'Peso': contribs})
+            df_imp = df_imp[df_imp['Peso'] != 0]
+            df_imp['AbsPeso'] = df_imp['Peso'].abs()
+            return df_imp.sort_values(by='AbsPeso', ascending=False).reset_index(drop=True)
+        except Exception as e:
+            print(f"Error calculando contribuciones: {e}")
+            return pd.DataFrame()
+
+    def explain_batch(self, df: pd.DataFrame, top_k: int = 3) -> pd.DataFrame:
+        """
+        Top-k drivers de riesgo por empleado para todo el lote, con una sola
+        operación de matriz. Devuelve formato largo: row (índice de df), rank, Variable, Peso.
+        """
+        contribs = self._contributions(df)
+        return self.explainer.top_drivers(contribs, k=top_k, index=df.index)
+
+    @staticmethod
+    def _label(prediction: int) -> str:
+        return "Se va (Churn)" if prediction == 1 else "Se queda (Retained)"
+
+    def score(self, data, threshold: float = DEFAULT_THRESHOLD):
+        """
+        Punto de entrada único: un dict -> predict(), un DataFrame -> predict_batch().
+        En ambos casos el pipeline se ejecuta una sola vez y la etiqueta sale del umbral.
+        """
+        if isinstance(data, dict):
+            return self.predict(data, threshold=threshold)
+        return self.predict_batch(data, threshold=threshold)
+
+    def predict(self, input_data: dict, threshold: float = DEFAULT_THRESHOLD):
+        self._ensure_loaded()
+
+        metrics = self.metrics
+        metrics.inc('rows_scored_total', path='single')
+
+        # Tipos + features derivadas con el esquema compilado (sin DataFrame si no hace falta)
+        with metrics.timer('inference_stage_seconds', stage='preprocess', path='single'):
+            prepared = self._preprocess(input_data)
+
+        # Fast path: una sola suma ponderada sobre lo ya preparado, sin ColumnTransformer
+        if self.compiled_scorer is not None:
+            with metrics.timer('inference_stage_seconds', stage='compiled', path='single'):
+                probability = float(self.compiled_scorer.predict_proba_prepared(prepared)[0])
+            return self._single_result(probability, threshold)
 
-        # ---------------------------------------------------------
-        
         try:
-            # 2. Predecir
-            prediction = self.model.predict(df_input)[0]
-            probability = self.model.predict_proba(df_input)[0][1]
-            
-            return {
-                "prediction": int(prediction),
-                "probability": float(probability),
-                "label": "Se va (Churn)" if prediction == 1 else "Se queda (Retained)"
-            }
+            # 2. Predecir: una sola pasada, la clase se deriva de la probabilidad
+            probability = float(self._pipeline_proba(prepared, path='single')[0])
+            return self._single_result(probability, threshold)
         except Exception as e:
-            # Tip: Imprime los tipos de datos para depurar si vuelve a fallar
-            print("Tipos de datos actuales:\n", df_input.dtypes)
+            metrics.inc('inference_errors_total', path='single')
             raise ValueError(f"Error en inferencia: {str(e)}")
+
+    def _single_result(self, probability: float, threshold: float) -> dict:
+        prediction = int(probability >= threshold)
+        calibrated = float(self.calibrator.calibrate(probability))
+        return {
+            "prediction": prediction,
+            "probability": probability,
+            "label": self._label(prediction),
+            "calibrated_probability": calibrated,
+            "risk_tier": self.calibrator.risk_tier(calibrated)
+        }
+
+    def add_risk_tiers(self, df: pd.DataFrame, probabilities) -> pd.DataFrame:
+        """Añade 'Calibrated_Probability' y 'Risk_Tier' (Low / Watchlist / High) al DF."""
+        calibrated = self.calibrator.calibrate(probabilities)
+        df['Calibrated_Probability'] = calibrated
+        df['Risk_Tier'] = self.calibrator.risk_tiers(calibrated)
+        return df
         
-    def predict_batch(self, df: pd.DataFrame):
+    def required_columns(self):
         """
-        NUEVO: Predicción masiva para archivos Excel/CSV.
-        Devuelve el DF original con una columna extra 'Churn_Probability'
+        Columnas crudas que necesita el pipeline (Log_X se calcula a partir de X).
         """
-        if not self.model: self.load_model()
-        
-        # Preprocess the whole dataframe
-        df_processed = self._preprocess(df)
-        
+        self._ensure_loaded()
+        return list(self.schema.required_columns)
+
+    def input_dtypes(self) -> dict:
+        """
+        Tipos a fijar al leer un fichero: las categóricas del pipeline (ej: StockOptionLevel)
+        como texto, igual que en el entrenamiento.
+        """
+        self._ensure_loaded()
+        return {col: 'str' for col, categories in self.schema.categorical.items()
+                if categories.inferred_type == 'string'}
+
+    def read_batch_file(self, source, keep_columns=None, all_columns: bool = False) -> pd.DataFrame:
+        """
+        Lee un CSV / XLSX / Parquet / Arrow con solo las columnas del modelo (+ keep_columns)
+        y los tipos ya fijados, listo para predict_batch.
+        all_columns=True lee también el resto (IDs, nombres... que el informe debe conservar).
+        """
+        columns = None
+        if not all_columns:
+            keep_columns = list(keep_columns or [])
+            columns = keep_columns + [c for c in self.required_columns() if c not in keep_columns]
+        return read_frame(source, columns=columns, dtypes=self.input_dtypes())
+
+    def predict_proba_batch(self, df: pd.DataFrame, inplace: bool = False,
+                            use_cache: bool = True) -> np.ndarray:
+        """
+        Probabilidad de churn por fila, con una sola pasada por el modelo.
+        inplace=True evita la copia de _preprocess cuando el DF es desechable (chunks).
+        use_cache=False salta la caché (ej: contrafactuales que no se van a repetir).
+        """
+        self._ensure_loaded()
+        if not len(df):
+            # sklearn no acepta 0 filas (ej: un CSV con solo la cabecera)
+            return np.empty(0, dtype=np.float64)
+
+        metrics = self.metrics
+        if metrics.enabled:
+            metrics.observe('batch_size_rows', len(df))
+            metrics.inc('rows_scored_total', len(df), path='batch')
+
+        with metrics.timer('predict_batch_seconds'):
+            if self.cache is not None and use_cache:
+                return self._predict_proba_cached(df, inplace=inplace)
+            return self._predict_proba_uncached(df, inplace=inplace)
+
+    def _predict_proba_cached(self, df: pd.DataFrame, inplace: bool = False) -> np.ndarray:
+        """Sirve de la caché las filas ya vistas y solo puntúa las nuevas o cambiadas."""
+        metrics = self.metrics
+        with metrics.timer('inference_stage_seconds', stage='cache_lookup', path='batch'):
+            keys = row_hashes(df, self.required_columns())
+            probabilities = self.cache.get_many(self.model_fingerprint, keys)
+
+        missing = np.isnan(probabilities)
+        n_missing = int(missing.sum())
+        metrics.inc('cache_hits_total', len(df) - n_missing)
+        metrics.inc('cache_misses_total', n_missing)
+        counts = getattr(self._cache_counts, 'value', None) or {'hits': 0, 'misses': 0}
+        counts['hits'] += len(df) - n_missing
+        counts['misses'] += n_missing
+        self._cache_counts.value = counts
+        if n_missing:
+            fresh = self._predict_proba_uncached(df[missing], inplace=True)
+            probabilities[missing] = fresh
+            with metrics.timer('inference_stage_seconds', stage='cache_store', path='batch'):
+                self.cache.put_many(self.model_fingerprint, keys[missing], fresh)
+        return probabilities
+
+    def _pipeline_proba(self, prepared, path: str = 'batch') -> np.ndarray:
+        """
+        Equivale a Pipeline.predict_proba, pero ejecutando la transformación y el
+        clasificador por separado para poder medir cada etapa.
+        """
+        metrics = self.metrics
+        with metrics.timer('inference_stage_seconds', stage='transform', path=path):
+            X = self._transform(prepared)
+        with metrics.timer('inference_stage_seconds', stage='classifier', path=path):
+            return self.model[-1].predict_proba(X)[:, 1]
+
+    def _predict_proba_uncached(self, df: pd.DataFrame, inplace: bool = False) -> np.ndarray:
+        metrics = self.metrics
+        # Preprocess the whole dataframe (los errores de datos salen como SchemaValidationError)
+        with metrics.timer('inference_stage_seconds', stage='preprocess', path='batch'):
+            df_processed = self._preprocess(df, inplace=inplace)
+
+        if self.compiled_scorer is not None:
+            with metrics.timer('inference_stage_seconds', stage='compiled', path='batch'):
+                return self.compiled_scorer.predict_proba_prepared(df_processed)
+
         try:
-            # Predict probabilities for the whole batch
-            probabilities = self.model.predict_proba(df_processed)[:, 1]
-            df['Churn_Probability'] = probabilities
-            return df
+            return self._pipeline_proba(df_processed)
         except Exception as e:
+            metrics.inc('inference_errors_total', path='batch')
             raise ValueError(f"Batch Inference Error: {str(e)}")
+
+    def drift_monitor(self):
+        """DriftMonitor contra los histogramas de entrenamiento del modelo (None si no hay)."""
+        self._ensure_loaded()
+        if self.drift_reference is None:
+            return None
+        return DriftMonitor(self.drift_reference)
+
+    def check_drift(self, df: pd.DataFrame) -> pd.DataFrame:
+        """PSI / KS por feature de `df` frente al entrenamiento (vacío si no hay referencia)."""
+        monitor = self.drift_monitor()
+        if monitor is None:
+            return pd.DataFrame()
+        return monitor.update(df).report()
+
+    def predict_batch(self, df: pd.DataFrame, threshold: float = None, drift=None):
+        """
+        NUEVO: Predicción masiva para archivos Excel/CSV.
+        Devuelve el DF original con una columna extra 'Churn_Probability'
+        (y 'Churn_Prediction' si se pasa un umbral), más 'Calibrated_Probability'
+        y 'Risk_Tier'. Si se pasa un DriftMonitor (drift_monitor()), se actualiza con df.
+        """
+        if drift is not None:
+            drift.update(df)
+        probabilities = self.predict_proba_batch(df)
+        df['Churn_Probability'] = probabilities
+        if threshold is not None:
+            df['Churn_Prediction'] = (probabilities >= threshold).astype(int)
+        return self.add_risk_tiers(df, probabilities)
+
+    def predict_batch_iter(self, source, chunksize: int = DEFAULT_CHUNKSIZE,
+                           threshold: float = None, keep_columns=None, drift=None, scorer=None):
+        """
+        Versión streaming de predict_batch para ficheros enormes (CSV / XLSX / Parquet / Arrow).
+        Lee solo las columnas del modelo (+ keep_columns, ej: 'EmployeeNumber') y
+        va devolviendo un DF por chunk con 'Churn_Probability', así la memoria
+        máxima depende de `chunksize` y no del tamaño del fichero.
+        `drift` (un DriftMonitor) acumula los histogramas de cada chunk en la misma pasada.
+        `scorer` (ej: ParallelBatchScorer) puntúa cada chunk repartido entre varios procesos.
+        """
+        keep_columns = list(keep_columns or [])
+        columns = keep_columns + [c for c in self.required_columns() if c not in keep_columns]
+
+        for chunk in iter_chunks(source, chunksize=chunksize, columns=columns, dtypes=self.input_dtypes()):
+            # Las columnas de salida se toman antes de preparar el chunk in place
+            result = chunk[[c for c in keep_columns if c in chunk.columns]].copy()
+            if scorer is None:
+                probabilities = self.predict_proba_batch(chunk, inplace=True)
+            else:
+                probabilities = scorer.predict_proba_batch(chunk, columns=self.required_columns())
+            if drift is not None:
+                # Después del scoring: reutiliza las Log_* y los códigos categóricos ya calculados
+                # (con `scorer` el chunk sigue crudo y el monitor los deriva)
+                drift.update(chunk)
+            result['Churn_Probability'] = probabilities
+            if threshold is not None:
+                result['Churn_Prediction'] = (probabilities >= threshold).astype(int)
+            yield self.add_risk_tiers(result, probabilities)
+
+    def predict_batch_to_file(self, source, output_path: str, chunksize: int = DEFAULT_CHUNKSIZE,
+                              threshold: float = None, keep_columns=None, drift=None):
+        """Puntúa `source` por chunks y va escribiendo el resultado en CSV o Parquet."""
+        with ChunkWriter(output_path) as writer:
+            for result in self.predict_batch_iter(source, chunksize=chunksize, threshold=threshold,
+                                                  keep_columns=keep_columns, drift=drift):
+                writer.write(result)
+        return writer.rows
         
     
 
@@ -0,0 +1,205 @@
+import bisect
+import contextvars
+import threading
+import time
+
+# Buckets (en segundos) para los tiempos de cada etapa de inferencia
+LATENCY_BUCKETS = (0.0001, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+                   0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+# Buckets (en filas) para el tamaño de los lotes
+SIZE_BUCKETS = (1, 10, 100, 1_000, 10_000, 100_000, 1_000_000, 10_000_000)
+
+
+class _NullTimer:
+    """Context manager vacío y compartido: no crea objetos en cada llamada."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class _Timer:
+    def __init__(self, metrics, name, labels):
+        self.metrics = metrics
+        self.name = name
+        self.labels = labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.metrics.observe(self.name, time.perf_counter() - self.start, **self.labels)
+        return False
+
+
+class NullMetrics:
+    """
+    Interfaz de métricas que usa ModelLoader. Esta implementación no hace nada:
+    es la que está activa por defecto, así que instrumentar cuesta casi cero.
+    Para enviar las métricas a otro sistema basta con implementar estos tres métodos.
+    """
+    enabled = False
+
+    def observe(self, name: str, value: float, **labels):
+        """Añade una observación a un histograma."""
+
+    def inc(self, name: str, value: float = 1, **labels):
+        """Incrementa un contador."""
+
+    def timer(self, name: str, **labels):
+        """Mide el bloque `with` y lo observa en el histograma `name`."""
+        return _NULL_TIMER
+
+
+class _Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)   # el último es +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q: float) -> float:
+        """Aproximación por buckets (límite superior del bucket que contiene el cuantil)."""
+        if not self.count:
+            return 0.0
+        target = q * self.count
+        running = 0
+        for i, n in enumerate(self.counts):
+            running += n
+            if running >= target:
+                return self.buckets[i] if i < len(self.buckets) else float('inf')
+        return float('inf')
+
+
+class InProcessMetrics(NullMetrics):
+    """Colector en memoria (thread-safe) con histogramas y contadores por etiqueta."""
+    enabled = True
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histograms = {}
+        self._counters = {}
+
+    @staticmethod
+    def _key(name, labels):
+        return name, tuple(sorted(labels.items()))
+
+    def observe(self, name: str, value: float, **labels):
+        buckets = SIZE_BUCKETS if name.endswith('_rows') else LATENCY_BUCKETS
+        key = self._key(name, labels)
+        with self._lock:
+            hist = self._histograms.get(key)
+            if hist is None:
+                hist = self._histograms[key] = _Histogram(buckets)
+            hist.observe(value)
+
+    def inc(self, name: str, value: float = 1, **labels):
+        key = self._key(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def timer(self, name: str, **labels):
+        return _Timer(self, name, labels)
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+
+    def snapshot(self):
+        """
+        Foto de las métricas para mostrarlas (panel de diagnóstico):
+        (lista de histogramas, lista de contadores) como diccionarios planos.
+        """
+        with self._lock:
+            histograms = [
+                {'metric': name, **dict(labels), 'count': h.count, 'sum': h.sum,
+                 'mean': h.sum / h.count if h.count else 0.0,
+                 'p50': h.quantile(0.5), 'p95': h.quantile(0.95), 'p99': h.quantile(0.99)}
+                for (name, labels), h in self._histograms.items()
+            ]
+            counters = [
+                {'metric': name, **dict(labels), 'value': value}
+                for (name, labels), value in self._counters.items()
+            ]
+        return histograms, counters
+
+    def to_prometheus(self, prefix: str = 'retention_') -> str:
+        """Exporta en el formato de texto de Prometheus (para un endpoint /metrics)."""
+        def fmt_labels(labels, extra=()):
+            items = list(labels) + list(extra)
+            if not items:
+                return ''
+            return '{' + ','.join(f'{k}="{v}"' for k, v in items) + '}'
+
+        lines = []
+        with self._lock:
+            typed = set()
+            for (name, labels), value in sorted(self._counters.items()):
+                metric = prefix + name
+                if metric not in typed:
+                    lines.append(f"# TYPE {metric} counter")
+                    typed.add(metric)
+                lines.append(f"{metric}{fmt_labels(labels)} {value}")
+
+            for (name, labels), h in sorted(self._histograms.items(), key=lambda kv: kv[0]):
+                metric = prefix + name
+                if metric not in typed:
+                    lines.append(f"# TYPE {metric} histogram")
+                    typed.add(metric)
+                running = 0
+                for bound, n in zip(list(h.buckets) + ['+Inf'], h.counts):
+                    running += n
+                    lines.append(f"{metric}_bucket{fmt_labels(labels, [('le', bound)])} {running}")
+                lines.append(f"{metric}_sum{fmt_labels(labels)} {h.sum}")
+                lines.append(f"{metric}_count{fmt_labels(labels)} {h.count}")
+        return '\n'.join(lines) + '\n'
+
+
+class ContextMetrics(NullMetrics):
+    """
+    Reenvía cada métrica al colector activo en el contexto actual (contextvars) o a ninguno.
+    Los ModelLoader se comparten entre sesiones de Streamlit: con este objeto como
+    colector de todos ellos, cada sesión activa (o no) el suyo con use() al empezar
+    el rerun, y lo que mide o apaga una sesión no afecta a las demás.
+    """
+
+    def __init__(self):
+        self._current = contextvars.ContextVar('metrics', default=None)
+
+    @property
+    def enabled(self) -> bool:
+        return self._current.get() is not None
+
+    def use(self, metrics=None):
+        """Colector para lo que se ejecute en este contexto (hilo); None = sin métricas."""
+        self._current.set(metrics)
+
+    def observe(self, name: str, value: float, **labels):
+        metrics = self._current.get()
+        if metrics is not None:
+            metrics.observe(name, value, **labels)
+
+    def inc(self, name: str, value: float = 1, **labels):
+        metrics = self._current.get()
+        if metrics is not None:
+            metrics.inc(name, value, **labels)
+
+    def timer(self, name: str, **labels):
+        metrics = self._current.get()
+        return _NULL_TIMER if metrics is None else metrics.timer(name, **labels)
+
+
+# Colector por sesión de la app (uno por proceso: los loaders guardan esta instancia)
+session_metrics = ContextMetrics()
@@ -0,0 +1,118 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+from src.models.schema import SchemaValidationError
+
+DEFAULT_MAX_BATCH_SIZE = 64
+DEFAULT_MAX_WAIT_MS = 5.0
+
+
+class MicroBatcher:
+    """
+    Agrupa peticiones individuales concurrentes en un solo predict_proba vectorizado.
+
+    Cada submit() deja (registro, future) en una cola; un bucle en segundo plano
+    recoge hasta `max_batch_size` registros o espera como mucho `max_wait_ms`
+    desde el primero, y puntúa el lote en un pool de hilos para no bloquear
+    el event loop.
+    """
+
+    def __init__(self, score_fn, max_batch_size: int = DEFAULT_MAX_BATCH_SIZE,
+                 max_wait_ms: float = DEFAULT_MAX_WAIT_MS, workers: int = 1, executor=None):
+        self.score_fn = score_fn                  # DataFrame -> un resultado por fila (ej: probabilidades)
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.executor = executor or ThreadPoolExecutor(max_workers=workers)
+        # Como mucho un lote en vuelo por worker del pool
+        self.max_in_flight = workers
+        self._in_flight = None
+        self._pending = set()
+        self._queue = None
+        self._task = None
+        self.batches = 0
+        self.rows = 0
+
+    async def start(self):
+        if self._task is None:
+            self._queue = asyncio.Queue()
+            self._in_flight = asyncio.Semaphore(self.max_in_flight)
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def submit(self, record: dict):
+        """Encola un empleado y espera a que su lote se puntúe (devuelve su resultado de score_fn)."""
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((record, future))
+        return await future
+
+    async def _collect(self):
+        """Primer elemento bloqueante; el resto hasta llenar el lote o agotar max_wait."""
+        loop = asyncio.get_running_loop()
+        batch = [await self._queue.get()]
+        deadline = loop.time() + self.max_wait
+
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _score(self, batch):
+        loop = asyncio.get_running_loop()
+        records = [record for record, _ in batch]
+        futures = [future for _, future in batch]
+
+        try:
+            df = pd.DataFrame.from_records(records)
+            try:
+                results = await loop.run_in_executor(self.executor, self.score_fn, df)
+            except SchemaValidationError as e:
+                # Una fila inválida no debe tumbar al resto del micro-lote
+                bad_rows = set(e.errors['row'].dropna().astype(int))
+                if not bad_rows or len(bad_rows) == len(records):
+                    raise
+                for row in bad_rows:
+                    if not futures[row].done():
+                        futures[row].set_exception(
+                            SchemaValidationError(e.errors[e.errors['row'] == row].assign(row=0).reset_index(drop=True)))
+                good = [i for i in range(len(records)) if i not in bad_rows]
+                futures = [futures[i] for i in good]
+                records = [records[i] for i in good]
+                results = await loop.run_in_executor(
+                    self.executor, self.score_fn, df.iloc[good].reset_index(drop=True))
+        except Exception as e:
+            for future in futures:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        finally:
+            self._in_flight.release()
+
+        self.batches += 1
+        self.rows += len(records)
+        for future, result in zip(futures, results):
+            if not future.done():
+                future.set_result(result)
+
+    async def _run(self):
+        # Mientras un lote se puntúa en el pool, seguimos recogiendo el siguiente
+        while True:
+            await self._in_flight.acquire()
+            batch = await self._collect()
+            task = asyncio.create_task(self._score(batch))
+            self._pending.add(task)
+            task.add_done_callback(self._pending.discard)
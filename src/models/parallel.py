@@ -0,0 +1,119 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+# Filas por shard: lo bastante grande para amortizar el envío entre procesos
+DEFAULT_SHARD_SIZE = 20_000
+
+# Modelo propio de cada proceso worker (se carga una sola vez en el initializer)
+_worker_model = None
+
+
+def _init_worker(model_path: str, compiled: bool, mmap: bool, cache: tuple):
+    """
+    Initializer del pool: carga el pipeline una vez por proceso, no por shard.
+    Cada worker crea su propio ModelLoader (y su conexión SQLite): con fork el
+    model_service del padre llegaría con su conexión, su scorer y sus métricas.
+    """
+    global _worker_model
+    from src.models.inference import ModelLoader
+
+    _worker_model = ModelLoader(compiled=compiled, mmap=mmap, model_path=model_path)
+    if cache is not None:
+        _worker_model.enable_cache(*cache)
+    _worker_model.warm_up()
+
+    # Cada proceso ya ocupa un core: evitamos que XGBoost/RandomForest lancen
+    # sus propios hilos (n_jobs=-1 en el notebook) y se pisen entre ellos.
+    classifier = _worker_model.model.named_steps.get('classifier')
+    if classifier is not None and 'n_jobs' in classifier.get_params():
+        classifier.set_params(n_jobs=1)
+
+
+def _ping(_):
+    return os.getpid()
+
+
+def _score_shard(shard: pd.DataFrame) -> np.ndarray:
+    return _worker_model.predict_proba_batch(shard, inplace=True)
+
+
+class ParallelBatchScorer:
+    """
+    Reparte las filas de predict_batch entre un pool de procesos.
+    Los shards se devuelven en el mismo orden en que se enviaron.
+
+    Los workers cargan el mismo artefacto y la misma caché que `model_loader`
+    (por defecto inference.model_service), cada uno con su propia instancia.
+
+    Usar como context manager (o llamar a close()) para liberar los workers:
+
+        with ParallelBatchScorer(n_workers=4) as scorer:
+            results_df = scorer.predict_batch(df, threshold=0.5)
+    """
+
+    def __init__(self, n_workers: int = None, shard_size: int = DEFAULT_SHARD_SIZE,
+                 compiled: bool = False, model_loader=None):
+        if model_loader is None:
+            from src.models.inference import model_service as model_loader
+        self.n_workers = n_workers or os.cpu_count() or 1
+        self.shard_size = shard_size
+        self.compiled = compiled
+        self.model_loader = model_loader
+        self._pool = None
+
+    def _get_pool(self):
+        if self._pool is None:
+            cache = self.model_loader.cache
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.n_workers,
+                initializer=_init_worker,
+                initargs=(self.model_loader.model_path, self.compiled, self.model_loader.mmap,
+                          (cache.path, cache.max_rows) if cache is not None else None)
+            )
+        return self._pool
+
+    def warm_up(self):
+        """Arranca todos los workers (y carga el modelo en cada uno) antes de la primera petición."""
+        pool = self._get_pool()
+        list(pool.map(_ping, range(self.n_workers)))
+
+    def predict_proba_batch(self, df: pd.DataFrame, columns=None) -> np.ndarray:
+        """
+        Probabilidades para todo el DF, calculadas por shards en paralelo.
+        `columns` limita lo que se envía a los workers (ej: ModelLoader.required_columns()).
+        """
+        if columns is not None:
+            df = df[[c for c in columns if c in df.columns]]
+
+        shards = [df.iloc[start:start + self.shard_size]
+                  for start in range(0, len(df), self.shard_size)]
+        if not shards:
+            return np.empty(0)
+
+        # map() conserva el orden de entrada
+        results = self._get_pool().map(_score_shard, shards)
+        return np.concatenate(list(results))
+
+    def predict_batch(self, df: pd.DataFrame, threshold: float = None, columns=None):
+        """Misma salida que ModelLoader.predict_batch, pero usando todos los cores."""
+        probabilities = self.predict_proba_batch(df, columns=columns)
+        df['Churn_Probability'] = probabilities
+        if threshold is not None:
+            df['Churn_Prediction'] = (probabilities >= threshold).astype(int)
+        # La calibración (y su comprobación de versión) va con el modelo del proceso principal
+        self.model_loader._ensure_loaded()
+        return self.model_loader.add_risk_tiers(df, probabilities)
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,271 @@
+import datetime
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+from src.models.calibration import calibration_path
+from src.models.drift import drift_path
+from src.models.inference import BASE_DIR, CACHE_PATH, MODEL_PATH, ModelLoader
+from src.models.metrics import InProcessMetrics
+
+MODELS_DIR = os.path.join(BASE_DIR, 'models')
+# El modelo de siempre (churn_pipeline.joblib) es el campeón por defecto
+DEFAULT_CHAMPION = os.path.splitext(os.path.basename(MODEL_PATH))[0]
+DEFAULT_POLL_SECONDS = 5.0
+MMAP_SUFFIX = '.mmap.joblib'
+
+
+class ModelRegistry:
+    """
+    Varios pipelines versionados en memoria, uno por cada .joblib de `models_dir`
+    (el nombre es el del fichero: churn_logreg.joblib -> 'churn_logreg').
+
+    - refresh() / start_watching(): detecta ficheros nuevos o modificados, carga y
+      calienta el nuevo ModelLoader FUERA del lock y luego cambia la referencia
+      (swap atómico). Las predicciones en curso terminan con el modelo que tenían.
+    - champion / challenger: el campeón es el que sirve get() por defecto; el
+      retador se compara con shadow_score() sobre los mismos datos preprocesados.
+    """
+
+    def __init__(self, models_dir: str = MODELS_DIR, champion: str = DEFAULT_CHAMPION,
+                 challenger: str = None, compiled: bool = False,
+                 poll_seconds: float = DEFAULT_POLL_SECONDS):
+        self.models_dir = models_dir
+        self.champion = champion
+        self.challenger = challenger
+        self.compiled = compiled
+        self.poll_seconds = poll_seconds
+
+        self._models = {}        # nombre -> ModelLoader ya cargado
+        self._signatures = {}    # nombre -> (mtime_ns, tamaño) del fichero cargado
+        self._loaded_at = {}
+        self._failed = {}        # nombre -> firma que no se pudo cargar (no se reintenta igual)
+        self._lock = threading.Lock()           # protege los dicts: el swap es una asignación
+        self._refresh_lock = threading.Lock()   # un solo refresh (carga) a la vez
+        self._watcher = None
+        self._stop = threading.Event()
+
+        # Configuración que heredan todas las versiones (también las que lleguen después)
+        self._metrics = None
+        self._cache_path = None
+
+    # ------------------------------------------------------------------
+    # CARGA Y RECARGA
+    # ------------------------------------------------------------------
+
+    def _scan(self) -> dict:
+        found = {}
+        if not os.path.isdir(self.models_dir):
+            return found
+        for entry in os.scandir(self.models_dir):
+            if entry.is_file() and entry.name.endswith('.joblib') and not entry.name.endswith(MMAP_SUFFIX):
+                stat = entry.stat()
+                signature = (stat.st_mtime_ns, stat.st_size)
+                # Una calibración o referencia de drift nueva también recarga el modelo
+                for sidecar in (calibration_path(entry.path), drift_path(entry.path)):
+                    if os.path.exists(sidecar):
+                        signature += (os.stat(sidecar).st_mtime_ns,)
+                found[entry.name[:-len('.joblib')]] = (entry.path, signature)
+        return found
+
+    def _new_loader(self, path: str) -> ModelLoader:
+        loader = ModelLoader(compiled=self.compiled, model_path=path)
+        if self._metrics is not None:
+            loader.enable_metrics(self._metrics)
+        if self._cache_path is not None:
+            loader.enable_cache(self._cache_path)
+        return loader.warm_up()
+
+    def refresh(self) -> list:
+        """
+        Carga los modelos nuevos o modificados y descarta los borrados.
+        Devuelve los nombres que han cambiado.
+        """
+        with self._refresh_lock:
+            found = self._scan()
+            changed = []
+            for name, (path, signature) in sorted(found.items()):
+                if self._signatures.get(name) == signature or self._failed.get(name) == signature:
+                    continue
+                try:
+                    loader = self._new_loader(path)
+                except Exception as e:
+                    # Ej: el fichero se está copiando todavía; se reintenta cuando vuelva a cambiar
+                    print(f"⚠️ No se pudo cargar '{name}': {e}")
+                    self._failed[name] = signature
+                    continue
+                self._failed.pop(name, None)
+                with self._lock:
+                    self._models[name] = loader
+                    self._signatures[name] = signature
+                    self._loaded_at[name] = datetime.datetime.now().isoformat(timespec='seconds')
+                changed.append(name)
+                print(f"🔄 Modelo '{name}' en servicio (versión {loader.model_fingerprint})")
+
+            with self._lock:
+                # El campeón se sigue sirviendo desde memoria aunque borren su fichero
+                for name in [n for n in self._models if n not in found and n != self.champion]:
+                    del self._models[name]
+                    del self._signatures[name]
+                    del self._loaded_at[name]
+                    changed.append(name)
+            return changed
+
+    def _watch(self):
+        while not self._stop.wait(self.poll_seconds):
+            try:
+                self.refresh()
+            except Exception as e:
+                print(f"⚠️ Error vigilando {self.models_dir}: {e}")
+
+    def start_watching(self):
+        """Vigila `models_dir` en un hilo de fondo. Idempotente (la app lo llama en cada rerun)."""
+        if self._watcher is not None and self._watcher.is_alive():
+            return self
+        self._stop.clear()
+        self._watcher = threading.Thread(target=self._watch, name='model-registry-watcher', daemon=True)
+        self._watcher.start()
+        return self
+
+    def stop_watching(self):
+        self._stop.set()
+        if self._watcher is not None:
+            self._watcher.join()
+            self._watcher = None
+
+    # ------------------------------------------------------------------
+    # ACCESO
+    # ------------------------------------------------------------------
+
+    def get(self, name: str = None) -> ModelLoader:
+        """ModelLoader de `name` (por defecto el campeón), cargando la primera vez."""
+        if not self._models:
+            self.refresh()
+        name = name or self.champion
+        loader = self._models.get(name)
+        if loader is None:
+            raise FileNotFoundError(f"❌ No hay ningún modelo '{name}' en {self.models_dir}")
+        return loader
+
+    def names(self) -> list:
+        if not self._models:
+            self.refresh()
+        return sorted(self._models)
+
+    def set_champion(self, name: str):
+        self.get(name)
+        self.champion = name
+
+    def set_challenger(self, name: str = None):
+        if name is not None:
+            self.get(name)
+        self.challenger = name
+
+    def versions(self) -> pd.DataFrame:
+        """Una fila por modelo cargado: versión (huella del .joblib), rol y hora de carga."""
+        with self._lock:
+            rows = [{
+                'Model': name,
+                'Version': loader.model_fingerprint,
+                'Classifier': type(loader.model[-1]).__name__,
+                'Role': 'champion' if name == self.champion else 'challenger' if name == self.challenger else '',
+                'Loaded_At': self._loaded_at[name],
+            } for name, loader in sorted(self._models.items())]
+        return pd.DataFrame(rows, columns=['Model', 'Version', 'Classifier', 'Role', 'Loaded_At'])
+
+    def enable_metrics(self, metrics=None):
+        """Un mismo colector para todas las versiones, así el histórico no se pierde en cada swap."""
+        metrics = metrics or self._metrics or InProcessMetrics()
+        self._metrics = metrics
+        with self._lock:
+            for loader in self._models.values():
+                loader.enable_metrics(metrics)
+        return metrics
+
+    def disable_metrics(self):
+        self._metrics = None
+        with self._lock:
+            for loader in self._models.values():
+                loader.disable_metrics()
+
+    @property
+    def metrics_enabled(self) -> bool:
+        return self._metrics is not None
+
+    def enable_cache(self, path: str = CACHE_PATH):
+        """
+        La caché va por huella del modelo: todas las versiones pueden compartir el fichero.
+        Devuelve la caché del campeón si ya está cargado (None si no), sin forzar su carga.
+        """
+        self._cache_path = path
+        with self._lock:
+            for loader in self._models.values():
+                loader.enable_cache(path)
+            champion = self._models.get(self.champion)
+        return champion.cache if champion is not None else None
+
+    # ------------------------------------------------------------------
+    # SHADOW SCORING
+    # ------------------------------------------------------------------
+
+    def shadow_score(self, df: pd.DataFrame, challenger: str = None, threshold: float = None,
+                     champion: str = None):
+        """
+        Puntúa `df` con el campeón y el retador en una sola pasada de preprocesado:
+        si los dos pipelines comparten esquema (y scaler/encoder) se reutiliza la
+        misma matriz y solo se ejecutan los dos clasificadores.
+
+        Devuelve (scores, summary): scores tiene Champion_Probability,
+        Challenger_Probability y Difference por fila (mismo índice que df).
+        `champion` permite comparar contra otro modelo que no sea el campeón actual.
+        """
+        champion_name = champion or self.champion
+        champion = self.get(champion_name)
+        challenger_name = challenger or self.challenger
+        if challenger_name is None:
+            raise ValueError("No hay modelo retador (set_challenger)")
+        shadow = self.get(challenger_name)
+
+        prepared = champion._preprocess(df)
+        X = champion._transform(prepared)
+        champion_proba = champion.model[-1].predict_proba(X)[:, 1]
+
+        if shadow.schema.same_transform(champion.schema):
+            shared = 'matrix'
+            X_shadow = X
+        elif shadow.schema.same_input(champion.schema):
+            shared = 'prepared'
+            X_shadow = shadow._transform(prepared)
+        else:
+            shared = 'none'
+            X_shadow = shadow._transform(shadow._preprocess(df))
+        shadow_proba = shadow.model[-1].predict_proba(X_shadow)[:, 1]
+
+        difference = shadow_proba - champion_proba
+        scores = pd.DataFrame({
+            'Champion_Probability': champion_proba,
+            'Challenger_Probability': shadow_proba,
+            'Difference': difference,
+        }, index=df.index)
+
+        summary = {
+            'champion': champion_name,
+            'challenger': challenger_name,
+            'rows': len(df),
+            'shared': shared,
+            'mean_abs_difference': float(np.abs(difference).mean()) if len(df) else 0.0,
+            'max_abs_difference': float(np.abs(difference).max()) if len(df) else 0.0,
+        }
+        if threshold is not None and len(df):
+            champion_flag = champion_proba >= threshold
+            shadow_flag = shadow_proba >= threshold
+            summary['agreement'] = float((champion_flag == shadow_flag).mean())
+            summary['champion_at_risk'] = int(champion_flag.sum())
+            summary['challenger_at_risk'] = int(shadow_flag.sum())
+        return scores, summary
+
+
+# Instancia compartida (app / API). No carga nada hasta el primer get().
+model_registry = ModelRegistry()
@@ -0,0 +1,92 @@
+import io
+
+import numpy as np
+import pandas as pd
+
+from src.models.streaming import ChunkWriter
+
+# Filas por trozo al escribir el informe descargable
+REPORT_CHUNK_ROWS = 50_000
+
+
+class BatchResults:
+    """
+    Resultado de un lote: el DF leído + un array con la probabilidad de cada fila.
+
+    Nada depende del umbral hasta que se pide: cambiar el slider solo vuelve a
+    comparar el array (sin re-puntuar ni copiar el DF). El top-K se elige con
+    np.partition (empates en el corte por posición) y solo se ordenan las K filas elegidas.
+    """
+
+    def __init__(self, df: pd.DataFrame, probabilities):
+        self.df = df
+        self.probabilities = np.asarray(probabilities, dtype=np.float64)
+
+    def __len__(self):
+        return len(self.probabilities)
+
+    def count_at_risk(self, threshold: float) -> int:
+        return int(np.count_nonzero(self.probabilities >= threshold))
+
+    def top_positions(self, k: int, threshold: float = None) -> np.ndarray:
+        """Posiciones de las k filas con más riesgo (>= threshold), de mayor a menor."""
+        candidates = np.arange(len(self)) if threshold is None else np.flatnonzero(self.probabilities >= threshold)
+        k = min(k, len(candidates))
+        if k <= 0:
+            return candidates[:0]
+        values = self.probabilities[candidates]
+        if k < len(candidates):
+            # argpartition elige al azar entre los empatados con el k-ésimo valor y las
+            # páginas se solaparían: se toma todo lo que está por encima y se completa
+            # con los empatados por orden de posición (candidates ya va ordenado)
+            kth = -np.partition(-values, k - 1)[k - 1]
+            above = np.flatnonzero(values > kth)
+            tied = np.flatnonzero(values == kth)[:k - len(above)]
+            chosen = np.concatenate([above, tied])
+        else:
+            chosen = np.arange(len(candidates))
+        # Orden estable por posición ante empates, como sort_values
+        order = np.lexsort((candidates[chosen], -values[chosen]))
+        return candidates[chosen[order]]
+
+    def _frame(self, positions, threshold: float = None, columns=None) -> pd.DataFrame:
+        frame = self.df.iloc[positions]
+        if columns is not None:
+            frame = frame[[c for c in columns if c in frame.columns]]
+        # Un fichero ya puntuado que se vuelve a subir trae sus columnas de resultado antiguas
+        frame = frame.drop(columns=['Churn_Probability', 'Churn_Prediction'], errors='ignore')
+        frame.insert(0, 'Churn_Probability', self.probabilities[positions])
+        if threshold is not None:
+            frame['Churn_Prediction'] = (frame['Churn_Probability'] >= threshold).astype(int)
+        return frame
+
+    def page(self, page: int, page_size: int, threshold: float, columns=None) -> pd.DataFrame:
+        """
+        Página `page` (desde 0) de los empleados en riesgo ordenados por probabilidad.
+        Solo se seleccionan/ordenan las (page + 1) * page_size primeras filas.
+        """
+        positions = self.top_positions((page + 1) * page_size, threshold)[page * page_size:]
+        return self._frame(positions, columns=columns)
+
+    def n_pages(self, page_size: int, threshold: float) -> int:
+        return max(1, -(-self.count_at_risk(threshold) // page_size))
+
+    def iter_report(self, threshold: float, chunk_rows: int = REPORT_CHUNK_ROWS):
+        """Empleados en riesgo, de mayor a menor probabilidad, en trozos de `chunk_rows` filas."""
+        at_risk = np.flatnonzero(self.probabilities >= threshold)
+        order = at_risk[np.lexsort((at_risk, -self.probabilities[at_risk]))]
+        for start in range(0, len(order), chunk_rows):
+            yield self._frame(order[start:start + chunk_rows], threshold=threshold)
+
+    def write_report(self, target, threshold: float, fmt: str = None, chunk_rows: int = REPORT_CHUNK_ROWS) -> int:
+        """Escribe el informe de riesgo por trozos en un fichero o buffer (CSV o Parquet)."""
+        with ChunkWriter(target, fmt=fmt) as writer:
+            for chunk in self.iter_report(threshold, chunk_rows=chunk_rows):
+                writer.write(chunk)
+        return writer.rows
+
+    def report_bytes(self, threshold: float, fmt: str = 'csv') -> bytes:
+        """Informe completo en memoria (para st.download_button), sin pasar por un string gigante."""
+        buffer = io.BytesIO()
+        self.write_report(buffer, threshold, fmt=fmt)
+        return buffer.getvalue()
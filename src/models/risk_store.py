@@ -0,0 +1,266 @@
+import datetime
+import os
+import sqlite3
+import threading
+
+import numpy as np
+import pandas as pd
+
+from src.models.cache import row_hashes
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+RISK_STORE_PATH = os.path.join(BASE_DIR, '.cache', 'risk_history.sqlite')
+ID_COLUMN = 'EmployeeNumber'
+# Variaciones más pequeñas que esto son ruido de coma flotante: se guardan como 0
+DELTA_TOLERANCE = 1e-9
+
+
+class RiskStore:
+    """
+    Histórico persistente (SQLite) del riesgo de cada empleado, por EmployeeNumber.
+
+    - employees_latest: último estado conocido (hash de features, probabilidad, modelo).
+    - risk_history: solo los puntos de cambio (nuevo empleado o features/modelo distintos),
+      con la variación respecto al punto anterior en fecha ya calculada e indexada.
+    - snapshots: resumen de cada carga.
+
+    Cada carga se compara con el último estado y solo se re-puntúan las filas nuevas
+    o cambiadas; el resto reutiliza la probabilidad guardada. Una carga con fecha
+    anterior (relleno histórico) añade sus puntos pero no sustituye al último estado.
+    """
+
+    def __init__(self, path: str = RISK_STORE_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS employees_latest (
+                employee_number INTEGER PRIMARY KEY,
+                row_hash INTEGER NOT NULL,
+                model TEXT NOT NULL,
+                probability REAL NOT NULL,
+                snapshot_date TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_latest_date ON employees_latest (snapshot_date);
+            CREATE TABLE IF NOT EXISTS risk_history (
+                employee_number INTEGER NOT NULL,
+                snapshot_date TEXT NOT NULL,
+                probability REAL NOT NULL,
+                delta REAL,
+                model TEXT NOT NULL,
+                PRIMARY KEY (employee_number, snapshot_date)
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS idx_history_date_delta ON risk_history (snapshot_date, delta);
+            CREATE TABLE IF NOT EXISTS snapshots (
+                snapshot_date TEXT NOT NULL,
+                created_at TEXT NOT NULL,
+                model TEXT NOT NULL,
+                rows INTEGER NOT NULL,
+                new INTEGER NOT NULL,
+                changed INTEGER NOT NULL,
+                rescored INTEGER NOT NULL
+            );
+        """)
+        self._conn.commit()
+
+    # ------------------------------------------------------------------
+    # INGESTA
+    # ------------------------------------------------------------------
+
+    def _load_ids(self, ids):
+        """Carga los IDs en una tabla temporal para hacer JOIN contra ella (no IN gigante)."""
+        self._conn.execute("CREATE TEMP TABLE IF NOT EXISTS upload_ids (employee_number INTEGER PRIMARY KEY)")
+        self._conn.execute("DELETE FROM upload_ids")
+        self._conn.executemany("INSERT OR IGNORE INTO upload_ids VALUES (?)", ((i,) for i in ids))
+
+    def _latest_for(self, ids):
+        """Estado guardado de esos empleados."""
+        self._load_ids(ids)
+        return pd.read_sql_query(
+            "SELECT l.employee_number, l.row_hash, l.model, l.probability, l.snapshot_date "
+            "FROM upload_ids u JOIN employees_latest l ON l.employee_number = u.employee_number",
+            self._conn
+        )
+
+    def _neighbours(self, ids, snapshot_date: str, before: bool) -> pd.DataFrame:
+        """
+        Punto del histórico inmediatamente anterior (before=True) o posterior a
+        `snapshot_date` para cada empleado, por fecha y no por orden de carga.
+        """
+        self._load_ids(ids)
+        op, agg = ('<', 'MAX') if before else ('>', 'MIN')
+        return pd.read_sql_query(
+            f"SELECT h.employee_number, h.snapshot_date, h.probability "
+            f"FROM upload_ids u JOIN risk_history h ON h.employee_number = u.employee_number "
+            f"AND h.snapshot_date = (SELECT {agg}(p.snapshot_date) FROM risk_history p "
+            f"WHERE p.employee_number = u.employee_number AND p.snapshot_date {op} ?)",
+            self._conn, params=(snapshot_date,)
+        ).set_index('employee_number')
+
+    def ingest(self, df: pd.DataFrame, model_loader, snapshot_date: str = None,
+               use_cache: bool = True) -> pd.DataFrame:
+        """
+        Registra una carga: puntúa solo lo nuevo o cambiado y añade los cambios al histórico.
+        Devuelve df con 'Churn_Probability' y 'Risk_Status' (new / changed / unchanged).
+        """
+        if ID_COLUMN not in df.columns:
+            raise ValueError(f"Se necesita la columna '{ID_COLUMN}' para seguir el riesgo en el tiempo")
+        ids = _employee_ids(df[ID_COLUMN])
+        if pd.Series(ids).duplicated().any():
+            raise ValueError(f"'{ID_COLUMN}' tiene valores duplicados")
+
+        snapshot_date = snapshot_date or datetime.date.today().isoformat()
+        # required_columns() carga el modelo si aún no lo estaba: la huella va después
+        keys = row_hashes(df, model_loader.required_columns())
+        model = model_loader.model_fingerprint or ''
+
+        with self._lock:
+            latest = self._latest_for(ids.tolist()).set_index('employee_number')
+
+        # Posición de cada empleado en el último estado (-1 = no lo conocíamos)
+        pos = latest.index.get_indexer(ids)
+        is_new = pos < 0
+        safe = np.where(is_new, 0, pos)
+        if len(latest):
+            prev_hash = latest['row_hash'].to_numpy(dtype=np.int64)[safe]
+            prev_model = latest['model'].to_numpy(dtype=object)[safe]
+            prev_prob = np.where(is_new, np.nan, latest['probability'].to_numpy(dtype=np.float64)[safe])
+            prev_date = latest['snapshot_date'].to_numpy(dtype=object)[safe]
+        else:
+            prev_hash = np.zeros(len(ids), dtype=np.int64)
+            prev_model = np.full(len(ids), model, dtype=object)
+            prev_prob = np.full(len(ids), np.nan)
+            prev_date = np.full(len(ids), None, dtype=object)
+
+        is_changed = ~is_new & ((prev_hash != keys) | (prev_model != model))
+        rescore = is_new | is_changed
+        # El histórico guarda un punto por empleado y día: una segunda carga del mismo
+        # día sustituye ese punto (la variación sigue siendo respecto al día anterior)
+        same_day = int(np.count_nonzero(is_changed & (prev_date == snapshot_date)))
+        if same_day:
+            print(f"⚠️ {same_day} empleados ya tenían un punto del {snapshot_date} en el histórico: "
+                  f"se sustituye por el de esta carga")
+
+        probabilities = prev_prob.copy()
+        if rescore.any():
+            probabilities[rescore] = model_loader.predict_proba_batch(df[rescore], use_cache=use_cache)
+
+        n_rescored = int(rescore.sum())
+        with self._lock:
+            # La variación se calcula contra el punto anterior en fecha: en un relleno
+            # histórico ese no es el último estado, y el punto siguiente cambia de base
+            rescored_ids = ids[rescore]
+            before = self._neighbours(rescored_ids.tolist(), snapshot_date, before=True)
+            after = self._neighbours(rescored_ids.tolist(), snapshot_date, before=False)
+            base = before['probability'].reindex(rescored_ids).to_numpy(dtype=np.float64)
+            deltas = _snap(probabilities[rescore] - base)
+            # El último estado solo avanza: una carga con fecha anterior no lo pisa
+            self._conn.executemany(
+                "INSERT INTO employees_latest VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT (employee_number) DO UPDATE SET "
+                "row_hash = excluded.row_hash, model = excluded.model, "
+                "probability = excluded.probability, snapshot_date = excluded.snapshot_date "
+                "WHERE excluded.snapshot_date >= employees_latest.snapshot_date",
+                zip(rescored_ids.tolist(), keys[rescore].tolist(), [model] * n_rescored,
+                    probabilities[rescore].tolist(), [snapshot_date] * n_rescored)
+            )
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO risk_history VALUES (?, ?, ?, ?, ?)",
+                zip(rescored_ids.tolist(), [snapshot_date] * n_rescored, probabilities[rescore].tolist(),
+                    [None if np.isnan(d) else d for d in deltas.tolist()], [model] * n_rescored)
+            )
+            if len(after):
+                new_base = pd.Series(probabilities[rescore], index=rescored_ids).reindex(after.index)
+                after_deltas = _snap(after['probability'].to_numpy() - new_base.to_numpy())
+                self._conn.executemany(
+                    "UPDATE risk_history SET delta = ? WHERE employee_number = ? AND snapshot_date = ?",
+                    zip(after_deltas.tolist(), after.index.tolist(), after['snapshot_date'].tolist())
+                )
+            self._conn.execute(
+                "INSERT INTO snapshots VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (snapshot_date, datetime.datetime.now().isoformat(timespec='seconds'), model,
+                 len(df), int(is_new.sum()), int(is_changed.sum()), int(rescore.sum()))
+            )
+            self._conn.commit()
+
+        df['Churn_Probability'] = probabilities
+        df['Risk_Status'] = np.where(is_new, 'new', np.where(is_changed, 'changed', 'unchanged'))
+        return df
+
+    # ------------------------------------------------------------------
+    # CONSULTAS
+    # ------------------------------------------------------------------
+
+    def risers(self, points: float = 0.20, since: str = None) -> pd.DataFrame:
+        """
+        Empleados cuyo riesgo actual supera en más de `points` (0.20 = 20 puntos)
+        al que tenían al empezar la ventana `since` (por defecto, el día 1 del mes actual):
+        el último punto anterior a `since` o, si el empleado apareció dentro de la
+        ventana, su primer punto en ella.
+        Los puntos se buscan por la clave primaria (employee_number, snapshot_date).
+        """
+        since = since or datetime.date.today().replace(day=1).isoformat()
+        query = """
+            SELECT l.employee_number AS EmployeeNumber,
+                   b.probability AS Probability_Before,
+                   l.probability AS Probability_Now,
+                   l.probability - b.probability AS Change,
+                   l.snapshot_date AS Last_Change
+            FROM employees_latest l
+            JOIN risk_history b
+              ON b.employee_number = l.employee_number
+             AND b.snapshot_date = COALESCE(
+                     (SELECT MAX(h.snapshot_date) FROM risk_history h
+                      WHERE h.employee_number = l.employee_number AND h.snapshot_date < :since),
+                     (SELECT MIN(h.snapshot_date) FROM risk_history h
+                      WHERE h.employee_number = l.employee_number AND h.snapshot_date >= :since))
+            WHERE l.snapshot_date >= :since
+              AND l.probability - b.probability > :points
+            ORDER BY Change DESC
+        """
+        with self._lock:
+            return pd.read_sql_query(query, self._conn, params={'since': since, 'points': points})
+
+    def changes(self, since: str, min_delta: float = None) -> pd.DataFrame:
+        """Cambios registrados desde `since` (usa el índice (snapshot_date, delta))."""
+        query = "SELECT * FROM risk_history WHERE snapshot_date >= ?"
+        params = [since]
+        if min_delta is not None:
+            query += " AND delta > ?"
+            params.append(min_delta)
+        with self._lock:
+            return pd.read_sql_query(query, self._conn, params=params)
+
+    def history(self, employee_number: int) -> pd.DataFrame:
+        with self._lock:
+            return pd.read_sql_query(
+                "SELECT snapshot_date, probability, delta, model FROM risk_history "
+                "WHERE employee_number = ? ORDER BY snapshot_date",
+                self._conn, params=(int(employee_number),)
+            )
+
+    def snapshots(self) -> pd.DataFrame:
+        with self._lock:
+            return pd.read_sql_query("SELECT * FROM snapshots ORDER BY created_at", self._conn)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def _employee_ids(values: pd.Series) -> np.ndarray:
+    """IDs como int64; error claro si hay vacíos, texto o decimales en vez de petar en astype."""
+    numbers = pd.to_numeric(values, errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
+    bad = ~np.isfinite(numbers) | (numbers != np.round(numbers))
+    if bad.any():
+        examples = ', '.join(repr(v) for v in values[bad].head(3).tolist())
+        raise ValueError(f"'{ID_COLUMN}' debe ser un número entero en todas las filas: "
+                         f"{int(bad.sum())} no lo son (ej: {examples})")
+    return numbers.astype(np.int64)
+
+
+def _snap(deltas: np.ndarray) -> np.ndarray:
+    """Variaciones por debajo de DELTA_TOLERANCE (ej: revertir el mismo día) cuentan como 0."""
+    return np.where(np.abs(deltas) < DELTA_TOLERANCE, 0.0, deltas)
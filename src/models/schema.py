@@ -0,0 +1,335 @@
+import numpy as np
+import pandas as pd
+
+# TotalSatisfaction = suma de las cuatro encuestas (igual que en el notebook de EDA)
+SATISFACTION_COLUMNS = ('EnvironmentSatisfaction', 'JobSatisfaction',
+                        'RelationshipSatisfaction', 'JobInvolvement')
+LOG_PREFIX = 'Log_'
+
+# Hasta este nº de filas las categorías se codifican valor a valor (sin factorize)
+_SMALL_BATCH = 16
+# Máximo de errores que se enumeran en el mensaje de la excepción (la tabla los tiene todos)
+_MESSAGE_ERRORS = 5
+# Qué hace prepare() con una categoría que el encoder no vio al entrenar:
+# 'ignore' (a ceros, como handle_unknown='ignore'), 'warn' (igual, pero avisa) o 'error'
+UNKNOWN_CATEGORY_MODES = ('ignore', 'warn', 'error')
+_UNKNOWN_CATEGORY = "categoría desconocida"
+
+
+class SchemaValidationError(ValueError):
+    """Datos de entrada inválidos. `errors` es un DF con row / column / value / error."""
+
+    def __init__(self, errors: pd.DataFrame):
+        self.errors = errors
+        lines = [
+            (f"Fila {e.row}, " if e.row is not None else "") + f"{e.column}: {e.error}"
+            for e in errors.head(_MESSAGE_ERRORS).itertuples()
+        ]
+        if len(errors) > _MESSAGE_ERRORS:
+            lines.append(f"... y {len(errors) - _MESSAGE_ERRORS} errores más")
+        super().__init__("Datos de entrada inválidos:\n" + "\n".join(lines))
+
+
+def _codes_of(values) -> np.ndarray:
+    """Códigos de una columna ya preparada (Categorical suelto o Series categórica)."""
+    return np.asarray(getattr(values, 'array', values).codes)
+
+
+class InputSchema:
+    """
+    Esquema de entrada del pipeline, compilado una vez por modelo cargado.
+
+    Declara qué columnas crudas hacen falta y cómo se preparan:
+      - numéricas -> float64 (sin copia si ya lo son)
+      - categóricas -> códigos enteros contra las categorías del OneHotEncoder
+        (StockOptionLevel=1 y '1' caen en la misma categoría, sin pasar por astype(str))
+      - derivadas -> Log_<X> = log1p(X) y TotalSatisfaction, solo si el modelo las usa
+    y valida fila a fila (SchemaValidationError con la tabla de errores).
+    Las categorías desconocidas se avisan por defecto (unknown='warn') y se puntúan
+    a ceros, como el OneHotEncoder con handle_unknown='ignore'.
+
+    Si el ColumnTransformer es el del notebook (StandardScaler + OneHotEncoder denso),
+    transform() construye la matriz del clasificador directamente con NumPy.
+    Sirve igual para un dict (un empleado) que para un DataFrame (lote).
+    """
+
+    def __init__(self, features, numeric, categorical, allow_nan=False, plan=None, unknown='warn'):
+        if unknown not in UNKNOWN_CATEGORY_MODES:
+            raise ValueError(f"unknown debe ser uno de {UNKNOWN_CATEGORY_MODES}: {unknown}")
+        self.features = list(features)          # columnas que espera el preprocessor
+        self.numeric = list(numeric)            # crudas numéricas
+        self.categorical = dict(categorical)    # cruda categórica -> categorías (pd.Index)
+        self.allow_nan = allow_nan
+        self.plan = plan
+        self.unknown = unknown
+
+        # Búsqueda valor -> código por texto y por número (StockOptionLevel=1 -> categoría '1')
+        self._lookup = {}
+        for col, cats in self.categorical.items():
+            as_number = pd.to_numeric(pd.Series(cats, dtype=object), errors='coerce').to_numpy(dtype=np.float64)
+            self._lookup[col] = ({str(c): i for i, c in enumerate(cats)},
+                                 {v: i for i, v in enumerate(as_number) if not np.isnan(v)})
+        self.log_sources = [f[len(LOG_PREFIX):] for f in self.features if f.startswith(LOG_PREFIX)]
+
+        required = []
+        for col in self.features:
+            if col.startswith(LOG_PREFIX):
+                sources = [col[len(LOG_PREFIX):]]
+            elif col == 'TotalSatisfaction':
+                sources = list(SATISFACTION_COLUMNS)
+            else:
+                sources = [col]
+            required.extend(c for c in sources if c not in required)
+        self.required_columns = required
+
+    # ------------------------------------------------------------------
+    # COMPILACIÓN
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def from_pipeline(cls, pipeline):
+        preprocessor = pipeline.named_steps['preprocessor']
+        features = list(preprocessor.feature_names_in_)
+
+        categorical = {}
+        for _, transformer, columns in preprocessor.transformers_:
+            step = transformer[-1] if hasattr(transformer, 'steps') else transformer
+            categories = getattr(step, 'categories_', None)
+            if categories is not None:
+                for col, cats in zip(columns, categories):
+                    categorical[col] = pd.Index(np.asarray(cats, dtype=object))
+
+        derived = {'TotalSatisfaction'} | {f for f in features if f.startswith(LOG_PREFIX)}
+        numeric = []
+        for col in features:
+            sources = ([col[len(LOG_PREFIX):]] if col.startswith(LOG_PREFIX)
+                       else list(SATISFACTION_COLUMNS) if col == 'TotalSatisfaction' else [col])
+            for raw in sources:
+                if raw not in categorical and raw not in derived and raw not in numeric:
+                    numeric.append(raw)
+
+        classifier = pipeline.steps[-1][1]
+        try:
+            allow_nan = bool(classifier.__sklearn_tags__().input_tags.allow_nan)
+        except Exception:
+            allow_nan = False
+
+        plan = cls._compile_plan(preprocessor) if len(pipeline.steps) == 2 else None
+        return cls(features, numeric, categorical, allow_nan=allow_nan, plan=plan)
+
+    @staticmethod
+    def _compile_plan(preprocessor):
+        """
+        Lista de bloques (tipo, columnas, parámetros) que reproduce el ColumnTransformer.
+        None si hay algún paso que no sabemos replicar exactamente.
+        """
+        from sklearn.preprocessing import OneHotEncoder, StandardScaler
+
+        if getattr(preprocessor, 'sparse_output_', True):
+            return None
+
+        plan = []
+        for _, transformer, columns in preprocessor.transformers_:
+            if isinstance(columns, slice):
+                return None
+            if isinstance(transformer, str) and transformer == 'drop' or len(columns) == 0:
+                continue
+            if isinstance(columns[0], (int, np.integer)):
+                return None
+            steps = [s for _, s in transformer.steps] if hasattr(transformer, 'steps') else [transformer]
+            steps = [s for s in steps if s != 'passthrough']
+
+            if not steps:
+                plan.append(('numeric', list(columns), None, None))
+            elif len(steps) == 1 and isinstance(steps[0], StandardScaler):
+                est = steps[0]
+                n = len(columns)
+                mean = est.mean_ if est.with_mean else np.zeros(n)
+                scale = est.scale_ if est.with_std else np.ones(n)
+                plan.append(('numeric', list(columns), np.asarray(mean, dtype=np.float64),
+                             np.asarray(scale, dtype=np.float64)))
+            elif len(steps) == 1 and isinstance(steps[0], OneHotEncoder):
+                est = steps[0]
+                if (est.drop is not None or est.handle_unknown != 'ignore'
+                        or getattr(est, '_infrequent_enabled', False)):
+                    return None
+                plan.append(('onehot', list(columns), [len(c) for c in est.categories_], None))
+            else:
+                return None
+        return plan
+
+    def same_input(self, other) -> bool:
+        """True si prepare() da lo mismo con los dos esquemas (mismas columnas y categorías)."""
+        return (self.features == other.features and self.numeric == other.numeric
+                and self.categorical.keys() == other.categorical.keys()
+                and all(self.categorical[c].equals(other.categorical[c]) for c in self.categorical))
+
+    def same_transform(self, other) -> bool:
+        """True si además transform() da la misma matriz (mismo scaler y mismo encoder)."""
+        if not self.same_input(other) or self.plan is None or other.plan is None:
+            return False
+        if len(self.plan) != len(other.plan):
+            return False
+        for (kind_a, cols_a, first_a, second_a), (kind_b, cols_b, first_b, second_b) in zip(self.plan, other.plan):
+            if kind_a != kind_b or cols_a != cols_b:
+                return False
+            if kind_a == 'onehot':
+                if first_a != first_b:
+                    return False
+            elif not all(a is b or (a is not None and b is not None and np.array_equal(a, b))
+                         for a, b in ((first_a, first_b), (second_a, second_b))):
+                return False
+        return True
+
+    # ------------------------------------------------------------------
+    # PREPARACIÓN
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _as_frame(data, inplace):
+        """
+        dict -> columnas de 1 elemento; DataFrame -> el mismo (inplace) o copia superficial;
+        record array (NumPy estructurado) o lista de dicts -> DataFrame nuevo.
+        """
+        if isinstance(data, dict):
+            return {col: np.asarray([value]) for col, value in data.items()}, pd.RangeIndex(1)
+        if not isinstance(data, pd.DataFrame):
+            frame = pd.DataFrame.from_records(data)
+            return frame, frame.index
+        return (data if inplace else data.copy(deep=False)), data.index
+
+    def _code(self, col, value) -> int:
+        """Código de un valor suelto: los números se comparan como número y el resto como texto."""
+        by_text, by_number = self._lookup[col]
+        if isinstance(value, (int, float, np.number)) and not isinstance(value, (bool, np.bool_)):
+            return by_number.get(float(value), -1)
+        return by_text.get(str(value), -1)
+
+    def _categorical_codes(self, col, values) -> np.ndarray:
+        if len(values) <= _SMALL_BATCH:
+            return np.array([self._code(col, v) for v in values], dtype=np.int64)
+
+        # factorize (hash en C, o dictionary_encode si la columna es Arrow) y solo se
+        # traducen los valores distintos, que son unos pocos
+        factor_codes, uniques = pd.factorize(values)
+        lut = np.array([self._code(col, u) for u in uniques] + [-1], dtype=np.int64)
+        return lut[factor_codes]   # factorize marca los nulos con -1 -> último elemento de lut
+
+    def prepare(self, data, inplace: bool = False, unknown: str = None):
+        """
+        Tipos, categorías y features derivadas en una pasada vectorizada.
+        Devuelve un DataFrame (o un dict de arrays si `data` era un dict) con las
+        columnas originales más las que espera el preprocessor.
+        Lanza SchemaValidationError si alguna fila no se puede puntuar.
+        `unknown` sustituye al modo del esquema para esta llamada (ver UNKNOWN_CATEGORY_MODES).
+        """
+        unknown = unknown or self.unknown
+        frame, index = self._as_frame(data, inplace)
+        columns = frame.keys() if isinstance(frame, dict) else frame.columns
+
+        missing = [c for c in self.required_columns if c not in columns]
+        if missing:
+            raise SchemaValidationError(pd.DataFrame({
+                'row': None, 'column': missing, 'value': None, 'error': "columna obligatoria ausente"
+            }))
+
+        errors = []
+
+        def add_errors(col, mask, values, message):
+            rows = np.nonzero(mask)[0]
+            if len(rows):
+                errors.append(pd.DataFrame({
+                    'row': np.asarray(index)[rows], 'column': col,
+                    'value': np.asarray(values, dtype=object)[rows], 'error': message
+                }))
+
+        for col in self.numeric:
+            raw = frame[col]
+            if pd.api.types.is_numeric_dtype(raw) and not pd.api.types.is_bool_dtype(raw):
+                values = np.asarray(raw, dtype=np.float64)
+                empty = np.isnan(values)
+            else:
+                values = pd.to_numeric(pd.Series(raw), errors='coerce').to_numpy(dtype=np.float64)
+                empty = pd.isna(np.asarray(raw, dtype=object))
+                add_errors(col, np.isnan(values) & ~empty, raw, "no es un número")
+            if not self.allow_nan:
+                add_errors(col, empty, raw, "valor vacío")
+            if col in self.log_sources:
+                add_errors(col, values < 0, raw, "no puede ser negativo")
+            frame[col] = values
+
+        unknowns = []
+        for col, categories in self.categorical.items():
+            raw = frame[col]
+            codes = self._categorical_codes(col, raw)
+            # -1 = categoría desconocida: el OneHotEncoder (handle_unknown='ignore') la deja a ceros
+            if unknown != 'ignore' and (codes < 0).any():
+                if unknown == 'error':
+                    add_errors(col, codes < 0, raw, _UNKNOWN_CATEGORY)
+                else:
+                    unknowns.append((col, np.asarray(raw, dtype=object)[codes < 0]))
+            frame[col] = pd.Categorical.from_codes(codes, categories=categories)
+
+        if errors:
+            errors = pd.concat(errors, ignore_index=True)
+            raise SchemaValidationError(errors.sort_values('row', kind='stable').reset_index(drop=True))
+
+        for col, values in unknowns:
+            examples = ', '.join(repr(v) for v in pd.unique(values)[:3])
+            print(f"⚠️ {col}: {len(values)} filas con categorías que el modelo no conoce ({examples}); "
+                  f"se puntúan sin esa categoría")
+
+        for feature in self.features:
+            if feature.startswith(LOG_PREFIX):
+                frame[feature] = np.log1p(frame[feature[len(LOG_PREFIX):]])
+            elif feature == 'TotalSatisfaction' and 'TotalSatisfaction' not in columns:
+                frame[feature] = sum(np.asarray(frame[c], dtype=np.float64) for c in SATISFACTION_COLUMNS)
+
+        return frame
+
+    def validate(self, data) -> pd.DataFrame:
+        """
+        Tabla de errores por fila (vacía si todo es válido), sin lanzar excepción.
+        Incluye las categorías desconocidas aunque el esquema solo las avise.
+        """
+        try:
+            self.prepare(data, unknown='error')
+        except SchemaValidationError as e:
+            return e.errors
+        return pd.DataFrame(columns=['row', 'column', 'value', 'error'])
+
+    # ------------------------------------------------------------------
+    # TRANSFORMACIÓN
+    # ------------------------------------------------------------------
+
+    def transform(self, prepared):
+        """
+        Matriz de entrada del clasificador a partir de prepare(), sin ColumnTransformer.
+        None si el preprocessor no es compilable (el llamador usa el de sklearn).
+        """
+        if self.plan is None:
+            return None
+
+        n = len(prepared[self.features[0]])
+        blocks = []
+        for kind, columns, first, second in self.plan:
+            if kind == 'numeric':
+                block = np.column_stack([np.asarray(prepared[c], dtype=np.float64) for c in columns])
+                if first is not None:
+                    block = (block - first) / second
+                blocks.append(block)
+            else:
+                block = np.zeros((n, sum(first)), dtype=np.float64)
+                offset = 0
+                rows = np.arange(n)
+                for col, width in zip(columns, first):
+                    codes = _codes_of(prepared[col])
+                    known = codes >= 0
+                    block[rows[known], offset + codes[known]] = 1.0
+                    offset += width
+                blocks.append(block)
+        return np.hstack(blocks) if len(blocks) > 1 else blocks[0]
+
+    def to_frame(self, prepared) -> pd.DataFrame:
+        """Para el camino de sklearn: el ColumnTransformer necesita un DataFrame."""
+        return prepared if isinstance(prepared, pd.DataFrame) else pd.DataFrame(prepared)
@@ -0,0 +1,118 @@
+import itertools
+
+import numpy as np
+import pandas as pd
+
+# Valores válidos de StockOptionLevel en los datos de IBM
+STOCK_OPTION_MAX = 3
+
+
+def scenario_grid(income_multipliers=(1.0,), overtime=(None,), stock_option_bumps=(0,),
+                  promoted=(False,)):
+    """
+    Producto cartesiano de intervenciones. Cada escenario es un dict con:
+        income_multiplier  MonthlyIncome * x (1.10 = +10% de salario)
+        overtime           'Yes' / 'No' fuerza OverTime; None lo deja como está
+        stock_option_bump  +n niveles de StockOptionLevel (con tope en 3)
+        promoted           True -> YearsSinceLastPromotion = 0
+    """
+    scenarios = []
+    for mult, ot, bump, promo in itertools.product(income_multipliers, overtime,
+                                                   stock_option_bumps, promoted):
+        parts = []
+        if mult != 1.0:
+            parts.append(f"Salary {mult - 1:+.0%}")
+        if ot is not None:
+            parts.append(f"OverTime={ot}")
+        if bump:
+            parts.append(f"Stock +{bump}")
+        if promo:
+            parts.append("Promoted")
+        scenarios.append({
+            'name': ', '.join(parts) or 'No change',
+            'income_multiplier': mult,
+            'overtime': ot,
+            'stock_option_bump': bump,
+            'promoted': promo,
+        })
+    return scenarios
+
+
+class RetentionSimulator:
+    """
+    Motor de "what-if" sobre un ModelLoader: construye todos los contrafactuales
+    (empleados x escenarios) como un único lote y lo puntúa con una sola llamada.
+    """
+
+    def __init__(self, model_loader):
+        self.model_loader = model_loader
+
+    def _counterfactuals(self, population: pd.DataFrame, scenarios) -> pd.DataFrame:
+        """Bloque 0 = población original; bloque s = población con el escenario s aplicado."""
+        columns = [c for c in self.model_loader.required_columns() if c in population.columns]
+        base = population[columns].reset_index(drop=True)
+        n, n_blocks = len(base), len(scenarios) + 1
+
+        frame = base.iloc[np.tile(np.arange(n), n_blocks)].reset_index(drop=True)
+
+        def per_row(key, default):
+            values = [default] + [scenario.get(key, default) for scenario in scenarios]
+            return np.repeat(np.asarray(values, dtype=object), n)
+
+        if 'MonthlyIncome' in frame.columns:
+            multiplier = per_row('income_multiplier', 1.0).astype(np.float64)
+            frame['MonthlyIncome'] = frame['MonthlyIncome'].to_numpy(dtype=np.float64) * multiplier
+
+        if 'OverTime' in frame.columns:
+            overtime = per_row('overtime', None)
+            forced = overtime != None  # noqa: E711 (comparación elemento a elemento)
+            frame['OverTime'] = np.where(forced, overtime, frame['OverTime'].to_numpy(dtype=object))
+
+        if 'StockOptionLevel' in frame.columns:
+            bump = per_row('stock_option_bump', 0).astype(np.int64)
+            stock = pd.to_numeric(frame['StockOptionLevel']).to_numpy()
+            frame['StockOptionLevel'] = np.clip(stock + bump, 0, STOCK_OPTION_MAX).astype(stock.dtype)
+
+        if 'YearsSinceLastPromotion' in frame.columns:
+            promoted = per_row('promoted', False).astype(bool)
+            frame['YearsSinceLastPromotion'] = np.where(
+                promoted, 0, frame['YearsSinceLastPromotion'].to_numpy())
+
+        return frame
+
+    def run(self, population: pd.DataFrame, scenarios, threshold: float = None):
+        """
+        Devuelve (deltas, summary):
+          deltas  -> DF empleados x escenarios con (riesgo nuevo - riesgo actual)
+          summary -> una fila por escenario con el efecto agregado; si se pasa
+                     `threshold`, cuántos empleados dejan de estar en riesgo.
+        """
+        if not scenarios:
+            raise ValueError("Se necesita al menos un escenario")
+
+        n = len(population)
+        frame = self._counterfactuals(population, scenarios)
+        probabilities = self.model_loader.predict_proba_batch(frame, inplace=True, use_cache=False)
+        probabilities = probabilities.reshape(len(scenarios) + 1, n)
+
+        baseline, simulated = probabilities[0], probabilities[1:]
+        delta = simulated - baseline
+
+        names = [scenario.get('name', f"Scenario {i + 1}") for i, scenario in enumerate(scenarios)]
+        deltas = pd.DataFrame(delta.T, index=population.index, columns=names)
+        deltas.insert(0, 'Baseline_Probability', baseline)
+
+        summary = pd.DataFrame({
+            'Scenario': names,
+            'Mean_Baseline': baseline.mean(),
+            'Mean_Simulated': simulated.mean(axis=1),
+            'Mean_Delta': delta.mean(axis=1),
+            'Min_Delta': delta.min(axis=1),
+            'Max_Delta': delta.max(axis=1),
+        })
+        if threshold is not None:
+            at_risk = baseline >= threshold
+            summary['At_Risk_Before'] = int(at_risk.sum())
+            summary['Retained'] = ((simulated < threshold) & at_risk).sum(axis=1)
+
+        return deltas, summary.sort_values('Mean_Delta').reset_index(drop=True)
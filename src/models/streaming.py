@@ -0,0 +1,201 @@
+import os
+import pandas as pd
+
+# Tamaño de chunk por defecto: suficiente para vectorizar, pequeño para no llenar la RAM
+DEFAULT_CHUNKSIZE = 50_000
+
+
+def _file_format(source) -> str:
+    """Detecta el formato por la extensión (también sirve para los UploadedFile de Streamlit)."""
+    name = source if isinstance(source, (str, os.PathLike)) else getattr(source, 'name', '')
+    ext = os.path.splitext(str(name))[1].lower()
+    if ext in ('.xlsx', '.xlsm'):
+        return 'excel'
+    if ext in ('.parquet', '.pq'):
+        return 'parquet'
+    if ext in ('.arrow', '.feather', '.ipc'):
+        return 'arrow'
+    return 'csv'
+
+
+def _arrow_to_pandas(table, dtypes, release: bool = False):
+    """
+    Tabla Arrow -> DataFrame fijando los tipos en Arrow (ej: StockOptionLevel a string)
+    en vez de hacer astype después. split_blocks evita consolidar columnas en un bloque;
+    con release=True (tabla de un solo uso) se libera la memoria Arrow columna a columna.
+    """
+    import pyarrow as pa
+
+    for col, dtype in (dtypes or {}).items():
+        if col in table.column_names and dtype == 'str' and not pa.types.is_string(table.schema.field(col).type):
+            table = table.set_column(table.column_names.index(col), col, table[col].cast(pa.string()))
+    return table.to_pandas(split_blocks=True, self_destruct=release)
+
+
+def _open_arrow(source):
+    """Lector Arrow IPC: formato fichero (.arrow / .feather v2) o, si no, formato stream."""
+    import pyarrow as pa
+
+    if isinstance(source, (str, os.PathLike)):
+        # mmap: solo se leen de disco las columnas que se usan
+        source = pa.memory_map(str(source))
+    try:
+        return pa.ipc.open_file(source)
+    except pa.ArrowInvalid:
+        if hasattr(source, 'seek'):
+            source.seek(0)
+        return pa.ipc.open_stream(source)
+
+
+def _iter_excel(source, chunksize: int, wanted, dtypes=None):
+    """read_excel no admite chunksize: leemos las filas en modo read_only con openpyxl."""
+    from openpyxl import load_workbook
+
+    wb = load_workbook(source, read_only=True, data_only=True)
+    try:
+        rows = wb.active.iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return
+        keep = [i for i, col in enumerate(header) if wanted is None or col in wanted]
+        columns = [header[i] for i in keep]
+
+        def frame(buffer):
+            chunk = pd.DataFrame(buffer, columns=columns)
+            return chunk.astype({c: t for c, t in (dtypes or {}).items() if c in chunk.columns})
+
+        buffer = []
+        for row in rows:
+            buffer.append([row[i] for i in keep])
+            if len(buffer) >= chunksize:
+                yield frame(buffer)
+                buffer = []
+        if buffer:
+            yield frame(buffer)
+    finally:
+        wb.close()
+
+
+def _iter_parquet(source, chunksize: int, wanted, dtypes=None):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    pf = pq.ParquetFile(source)
+    columns = None if wanted is None else [c for c in pf.schema_arrow.names if c in wanted]
+    for batch in pf.iter_batches(batch_size=chunksize, columns=columns):
+        yield _arrow_to_pandas(pa.Table.from_batches([batch]), dtypes)
+
+
+def _iter_arrow(source, chunksize: int, wanted, dtypes=None):
+    import pyarrow as pa
+
+    reader = _open_arrow(source)
+    columns = None if wanted is None else [c for c in reader.schema.names if c in wanted]
+    batches = (reader.get_batch(i) for i in range(reader.num_record_batches)) \
+        if isinstance(reader, pa.ipc.RecordBatchFileReader) else reader
+
+    for batch in batches:
+        if columns is not None:
+            batch = batch.select(columns)
+        for offset in range(0, batch.num_rows, chunksize):
+            yield _arrow_to_pandas(pa.Table.from_batches([batch.slice(offset, chunksize)]), dtypes)
+
+
+def iter_chunks(source, chunksize: int = DEFAULT_CHUNKSIZE, columns=None, dtypes=None):
+    """
+    Lee un CSV / Excel / Parquet / Arrow IPC por trozos de `chunksize` filas.
+    Si se pasa `columns`, solo se leen esas columnas (las que falten se ignoran).
+    `dtypes` ({columna: tipo}) fija los tipos al leer, ej: {'StockOptionLevel': 'str'}.
+    """
+    wanted = None if columns is None else set(columns)
+    fmt = _file_format(source)
+
+    if fmt == 'excel':
+        yield from _iter_excel(source, chunksize, wanted, dtypes)
+    elif fmt == 'parquet':
+        yield from _iter_parquet(source, chunksize, wanted, dtypes)
+    elif fmt == 'arrow':
+        yield from _iter_arrow(source, chunksize, wanted, dtypes)
+    else:
+        usecols = None if wanted is None else (lambda c: c in wanted)
+        yield from pd.read_csv(source, chunksize=chunksize, usecols=usecols, dtype=dtypes)
+
+
+def read_frame(source, columns=None, dtypes=None) -> pd.DataFrame:
+    """
+    Lee el fichero completo (CSV / Excel / Parquet / Arrow IPC) en un DataFrame.
+    Parquet y Arrow son columnares: con `columns` solo se leen esas columnas del disco
+    y los tipos de `dtypes` se fijan en Arrow antes de pasar a pandas.
+    """
+    wanted = None if columns is None else set(columns)
+    fmt = _file_format(source)
+
+    if fmt == 'parquet':
+        import pyarrow.parquet as pq
+
+        names = pq.ParquetFile(source).schema_arrow.names
+        if hasattr(source, 'seek'):
+            source.seek(0)
+        selected = None if wanted is None else [c for c in names if c in wanted]
+        return _arrow_to_pandas(pq.read_table(source, columns=selected), dtypes, release=True)
+
+    if fmt == 'arrow':
+        reader = _open_arrow(source)
+        table = reader.read_all()
+        if wanted is not None:
+            table = table.select([c for c in table.column_names if c in wanted])
+        return _arrow_to_pandas(table, dtypes, release=True)
+
+    usecols = None if wanted is None else (lambda c: c in wanted)
+    if fmt == 'excel':
+        return pd.read_excel(source, usecols=usecols, dtype=dtypes)
+    return pd.read_csv(source, usecols=usecols, dtype=dtypes)
+
+
+class ChunkWriter:
+    """
+    Escribe los chunks puntuados a CSV, Parquet o Arrow IPC sin acumularlos en memoria.
+    `path` puede ser una ruta o un buffer binario (en ese caso, indicar `fmt`).
+    """
+
+    def __init__(self, path, fmt: str = None):
+        self.path = path
+        detected = _file_format(path)
+        self.format = fmt or (detected if detected in ('parquet', 'arrow') else 'csv')
+        self._writer = None
+        self._schema = None
+        self._header_written = False
+        self.rows = 0
+
+    def write(self, chunk: pd.DataFrame):
+        if self.format in ('parquet', 'arrow'):
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+
+            table = pa.Table.from_pandas(chunk, preserve_index=False)
+            if self._writer is None:
+                if self.format == 'parquet':
+                    self._writer = pq.ParquetWriter(self.path, table.schema)
+                else:
+                    self._writer = pa.ipc.new_file(self.path, table.schema)
+                self._schema = table.schema
+            else:
+                # Todos los row groups / batches deben compartir el esquema del primero
+                table = table.cast(self._schema)
+            self._writer.write_table(table)
+        else:
+            chunk.to_csv(self.path, mode='a' if self._header_written else 'w',
+                         header=not self._header_written, index=False)
+            self._header_written = True
+        self.rows += len(chunk)
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,85 @@
+import asyncio
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+os.environ.setdefault('MODEL_WATCH', '0')
+
+from src.models.calibration import RiskCalibrator
+from src.models.microbatch import MicroBatcher
+from src.models.schema import SchemaValidationError
+
+
+def _age_must_be_positive(df: pd.DataFrame) -> np.ndarray:
+    ages = pd.to_numeric(df['Age'], errors='coerce')
+    bad = np.flatnonzero(~(ages > 0))
+    if len(bad):
+        raise SchemaValidationError(pd.DataFrame({'row': bad, 'column': 'Age',
+                                                  'value': df['Age'].to_numpy()[bad], 'error': "no es un número"}))
+    return ages.to_numpy() / 100
+
+
+def test_microbatcher_isolates_invalid_rows():
+    async def run():
+        batcher = MicroBatcher(_age_must_be_positive, max_batch_size=8, max_wait_ms=50)
+        await batcher.start()
+        try:
+            return await asyncio.gather(*(batcher.submit({'Age': age}) for age in (30, 'x', 50, -1)),
+                                        return_exceptions=True)
+        finally:
+            await batcher.stop()
+
+    results = asyncio.run(run())
+    assert results[0] == pytest.approx(0.30) and results[2] == pytest.approx(0.50)
+    for bad in (results[1], results[3]):
+        assert isinstance(bad, SchemaValidationError)
+        # El error se renumera a la fila 0 de la petición que lo envió
+        assert bad.errors['row'].tolist() == [0]
+
+
+def test_microbatcher_groups_concurrent_requests():
+    async def run():
+        batcher = MicroBatcher(lambda df: df['Age'].to_numpy(), max_batch_size=4, max_wait_ms=50)
+        await batcher.start()
+        try:
+            results = await asyncio.gather(*(batcher.submit({'Age': i}) for i in range(8)))
+        finally:
+            await batcher.stop()
+        return results, batcher.batches
+
+    results, batches = asyncio.run(run())
+    assert results == list(range(8))
+    assert batches == 2
+
+
+class _FakeLoader:
+    def __init__(self, error=None):
+        self.error = error
+        self.calibrator = RiskCalibrator()
+
+    def predict_proba_batch(self, df):
+        if self.error is not None:
+            raise self.error
+        return np.full(len(df), 0.7)
+
+
+def test_api_status_codes(monkeypatch):
+    from fastapi.testclient import TestClient
+
+    from api import main
+
+    cases = [(None, 200), (ValueError("Batch Inference Error: x"), 422), (RuntimeError("disk full"), 500)]
+    loader = _FakeLoader()
+    monkeypatch.setattr(main.model_registry, 'get', lambda name=None: loader)
+    # Un solo ciclo de vida: el executor del módulo se cierra al terminar el lifespan
+    with TestClient(main.app) as client:
+        for error, status in cases:
+            loader.error = error
+            single = client.post('/predict', json={'employee': {'Age': 30}})
+            batch = client.post('/predict/batch', json={'employees': [{'Age': 30}, {'Age': 40}]})
+            assert (single.status_code, batch.status_code) == (status, status), error
+            if status == 200:
+                assert single.json()['risk_tier'] == 'High'
+                assert [r['prediction'] for r in batch.json()['results']] == [1, 1]
@@ -0,0 +1,78 @@
+import joblib
+import numpy as np
+import pytest
+
+from benchmarks.pipelines import build_pipeline
+from benchmarks.synthetic import make_population
+from src.models import cache as cache_module
+from src.models.cache import PredictionCache, row_hashes
+from src.models.inference import ModelLoader
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1_000_000.0]
+    monkeypatch.setattr(cache_module.time, 'time', lambda: now[0])
+    return now
+
+
+def test_get_many_returns_stored_and_nan_for_missing(tmp_path):
+    cache = PredictionCache(str(tmp_path / 'p.sqlite'))
+    cache.put_many('m1', np.array([1, 2], dtype=np.int64), np.array([0.25, 0.75]))
+
+    result = cache.get_many('m1', np.array([2, 3, 1, 2], dtype=np.int64))
+    np.testing.assert_array_equal(result[[0, 2, 3]], [0.75, 0.25, 0.75])
+    assert np.isnan(result[1])
+    assert (cache.hits, cache.misses) == (3, 1)
+    # Otra huella de modelo no ve esas entradas
+    assert np.isnan(cache.get_many('m2', np.array([1, 2], dtype=np.int64))).all()
+
+
+def test_non_finite_probabilities_are_not_stored(tmp_path):
+    cache = PredictionCache(str(tmp_path / 'p.sqlite'))
+    cache.put_many('m', np.array([1, 2, 3], dtype=np.int64), np.array([0.1, np.nan, np.inf]))
+    assert cache.stats()['entries'] == 1
+
+
+def test_eviction_drops_least_recently_used(tmp_path, clock):
+    cache = PredictionCache(str(tmp_path / 'p.sqlite'), max_rows=3)
+    for key in (1, 2, 3):
+        cache.put_many('m', np.array([key], dtype=np.int64), np.array([key / 10]))
+        clock[0] += 1
+
+    # Un acierto tras más de _TOUCH_INTERVAL refresca last_used: la 1 pasa a ser reciente
+    clock[0] += cache_module._TOUCH_INTERVAL + 1
+    cache.get_many('m', np.array([1], dtype=np.int64))
+    clock[0] += 1
+    cache.put_many('m', np.array([4], dtype=np.int64), np.array([0.4]))
+
+    result = cache.get_many('m', np.array([1, 2, 3, 4], dtype=np.int64))
+    assert np.isnan(result[1])
+    np.testing.assert_array_equal(result[[0, 2, 3]], [0.1, 0.3, 0.4])
+
+
+def test_row_hashes_ignore_extra_columns_and_int_vs_float():
+    df = make_population(5)
+    columns = ['Age', 'StockOptionLevel', 'JobRole']
+    as_float = df.assign(StockOptionLevel=df['StockOptionLevel'].astype(float), Extra=1)
+    np.testing.assert_array_equal(row_hashes(df, columns), row_hashes(as_float, columns))
+
+
+def test_new_model_version_invalidates_cached_scores(tmp_path):
+    model_path = tmp_path / 'model.joblib'
+    joblib.dump(build_pipeline('logreg', seed=1), model_path)
+    loader = ModelLoader(model_path=str(model_path))
+    loader.enable_cache(str(tmp_path / 'p.sqlite'))
+    df = make_population(100)
+
+    first = loader.predict_proba_batch(df.copy())
+    assert loader.take_cache_counts() == {'hits': 0, 'misses': 100, 'hit_rate': 0.0}
+    np.testing.assert_array_equal(loader.predict_proba_batch(df.copy()), first)
+    assert loader.take_cache_counts()['hits'] == 100
+    assert loader.take_cache_counts() == {}
+
+    joblib.dump(build_pipeline('logreg', seed=2), model_path)
+    loader.load_model()
+    second = loader.predict_proba_batch(df.copy())
+    assert loader.take_cache_counts()['misses'] == 100
+    assert not np.allclose(first, second)
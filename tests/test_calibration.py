@@ -0,0 +1,73 @@
+import numpy as np
+import pytest
+
+from cli import calibrate
+from src.models.calibration import DEFAULT_TIERS, RiskCalibrator
+
+
+def _holdout(n=5000, seed=0):
+    """El modelo sobreestima: el riesgo real es la mitad de la probabilidad que da."""
+    rng = np.random.default_rng(seed)
+    probabilities = rng.uniform(size=n)
+    target = (rng.uniform(size=n) < probabilities / 2).astype(float)
+    return probabilities, target
+
+
+def test_identity_keeps_probabilities_and_default_tiers():
+    calibrator = RiskCalibrator()
+    p = np.array([0.0, 0.29, 0.3, 0.59, 0.6, 1.0])
+    np.testing.assert_array_equal(calibrator.calibrate(p), p)
+    assert [calibrator.risk_tier(v) for v in p] == ['Low', 'Low', 'Watchlist', 'Watchlist', 'High', 'High']
+    assert calibrator.tiers == DEFAULT_TIERS
+
+
+@pytest.mark.parametrize('method', ['isotonic', 'sigmoid'])
+def test_fit_is_monotonic_and_corrects_overestimation(method):
+    probabilities, target = _holdout()
+    calibrator = RiskCalibrator.fit(probabilities, target, method=method)
+
+    grid = np.linspace(0.0, 1.0, 101)
+    calibrated = calibrator.calibrate(grid)
+    assert np.all(np.diff(calibrated) >= 0)
+    assert calibrator.calibrate(probabilities).mean() == pytest.approx(target.mean(), abs=0.02)
+    assert calibrator.calibrate(np.array([0.8]))[0] == pytest.approx(0.4, abs=0.08)
+
+
+def test_isotonic_downsampling_warns_and_can_be_disabled(capsys):
+    probabilities, target = _holdout(n=20000)
+    exact = RiskCalibrator.fit(probabilities, target, n_knots=None)
+    assert 'se aproxima' not in capsys.readouterr().out
+
+    small = RiskCalibrator.fit(probabilities, target, n_knots=len(exact.x) // 4)
+    assert 'se aproxima' in capsys.readouterr().out
+    assert len(small.x) < len(exact.x)
+    # Aproximación: la tabla reducida se parece a la exacta, pero no es igual
+    assert np.abs(small.calibrate(probabilities) - exact.calibrate(probabilities)).mean() < 0.01
+
+
+@pytest.mark.parametrize('tiers', [{'Low': 0.1, 'High': 0.6}, {'Low': 0.0, 'A': 0.5, 'B': 0.5},
+                                   {'Low': 0.0, 'High': 1.5}, {}])
+def test_invalid_tiers_are_rejected(tiers):
+    with pytest.raises(ValueError):
+        RiskCalibrator(tiers=tiers or {'Only': 0.2})
+
+
+def test_tiers_are_sorted_by_cut():
+    calibrator = RiskCalibrator(tiers={'High': 0.7, 'Low': 0.0, 'Mid': 0.4})
+    assert calibrator.tier_labels == ['Low', 'Mid', 'High']
+    assert list(calibrator.risk_tiers(np.array([0.1, 0.4, 0.9]))) == ['Low', 'Mid', 'High']
+
+
+def test_save_and_load_round_trip(tmp_path):
+    probabilities, target = _holdout()
+    calibrator = RiskCalibrator.fit(probabilities, target, tiers={'Low': 0.0, 'High': 0.25}, model='abc')
+    loaded = RiskCalibrator.load(calibrator.save(str(tmp_path / 'm.calibration.json')))
+
+    np.testing.assert_array_equal(loaded.calibrate(probabilities), calibrator.calibrate(probabilities))
+    assert loaded.tiers == {'Low': 0.0, 'High': 0.25} and loaded.model == 'abc'
+
+
+def test_cli_rejects_tiers_not_starting_at_zero(capsys):
+    with pytest.raises(SystemExit):
+        calibrate.main(['holdout.csv', '--tiers', 'Low=0.1,High=0.6'])
+    assert 'debe empezar en 0' in capsys.readouterr().err
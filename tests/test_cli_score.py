@@ -0,0 +1,83 @@
+import os
+
+import joblib
+import pandas as pd
+import pytest
+
+from benchmarks.pipelines import build_pipeline
+from benchmarks.synthetic import make_population
+from cli import score
+
+
+@pytest.fixture(scope='module')
+def model_path(tmp_path_factory):
+    path = tmp_path_factory.mktemp('models') / 'logreg.joblib'
+    joblib.dump(build_pipeline('logreg'), path)
+    return str(path)
+
+
+def test_output_stems_disambiguate_same_name():
+    sources = ['/in/sales.csv', '/in/sales.parquet', '/in/hr.csv', '/in/2024/rd.csv', '/in/2025/rd.csv']
+    assert score.output_stems(sources) == {
+        '/in/sales.csv': 'sales_csv', '/in/sales.parquet': 'sales_parquet', '/in/hr.csv': 'hr',
+        '/in/2024/rd.csv': '2024_rd_csv', '/in/2025/rd.csv': '2025_rd_csv',
+    }
+
+
+def test_same_stem_inputs_get_separate_outputs(model_path, tmp_path):
+    df = make_population(300)
+    df.iloc[:100].to_csv(tmp_path / 'sales.csv', index=False)
+    df.iloc[100:].to_parquet(tmp_path / 'sales.parquet')
+    out = tmp_path / 'out'
+
+    assert score.main([str(tmp_path / 'sales.csv'), str(tmp_path / 'sales.parquet'),
+                       '--output', str(out), '--model', model_path]) == 0
+    assert len(pd.read_csv(out / 'sales_csv_scored.csv')) == 100
+    assert len(pd.read_csv(out / 'sales_parquet_scored.csv')) == 200
+
+
+def test_single_file_workers_match_sequential(model_path, tmp_path, capsys):
+    make_population(2000).to_csv(tmp_path / 'hr.csv', index=False)
+
+    assert score.main([str(tmp_path / 'hr.csv'), '--output', str(tmp_path / 'seq.csv'),
+                       '--model', model_path, '--chunk-size', '500']) == 0
+    sequential = capsys.readouterr().out
+    assert score.main([str(tmp_path / 'hr.csv'), '--output', str(tmp_path / 'par.csv'),
+                       '--model', model_path, '--chunk-size', '500', '--workers', '2']) == 0
+    assert '2 worker(s)' in capsys.readouterr().out
+
+    seq, par = pd.read_csv(tmp_path / 'seq.csv'), pd.read_csv(tmp_path / 'par.csv')
+    pd.testing.assert_frame_equal(seq, par)
+    # at_risk se cuenta aunque no se pida el extracto (--high-risk)
+    at_risk = int(seq['Churn_Prediction'].sum())
+    assert at_risk > 0 and f"{at_risk:,} en riesgo" in sequential
+    assert not os.path.exists(tmp_path / 'seq_high_risk.csv')
+
+
+@pytest.mark.parametrize('fmt', ['csv', 'parquet'])
+def test_high_risk_extract_is_sorted_across_chunks(model_path, tmp_path, fmt):
+    make_population(3000, seed=5).to_csv(tmp_path / 'hr.csv', index=False)
+    out = tmp_path / 'out'
+
+    assert score.main([str(tmp_path / 'hr.csv'), '--output', str(out), '--format', fmt, '--model', model_path,
+                       '--chunk-size', '700', '--threshold', '0.3', '--high-risk']) == 0
+    read = pd.read_csv if fmt == 'csv' else pd.read_parquet
+    scored, extract = read(out / f'hr_scored.{fmt}'), read(out / f'hr_high_risk.{fmt}')
+
+    expected = (scored[scored['Churn_Prediction'] == 1]
+                .sort_values('Churn_Probability', ascending=False, kind='stable').reset_index(drop=True))
+    assert len(expected) > 700   # el extracto abarca varios chunks
+    pd.testing.assert_frame_equal(extract, expected, check_dtype=False, check_categorical=False)
+    # El volcado temporal no se queda en la carpeta de salida
+    assert sorted(os.listdir(out)) == [f'hr_high_risk.{fmt}', f'hr_scored.{fmt}']
+
+
+def test_empty_input_writes_empty_outputs(model_path, tmp_path):
+    make_population(5).iloc[:0].to_csv(tmp_path / 'empty.csv', index=False)
+    out = tmp_path / 'out'
+
+    assert score.main([str(tmp_path / 'empty.csv'), '--output', str(out), '--model', model_path,
+                       '--high-risk']) == 0
+    extract = pd.read_csv(out / 'empty_high_risk.csv')
+    assert extract.empty and {'EmployeeNumber', 'Churn_Probability'} <= set(extract.columns)
+    assert pd.read_csv(out / 'empty_scored.csv').empty
@@ -0,0 +1,71 @@
+import numpy as np
+import pytest
+
+from benchmarks.pipelines import CATEGORICAL_FEATURES, build_pipeline
+from benchmarks.synthetic import make_population
+from src.models.compiled import CompiledLinearScorer
+
+
+@pytest.fixture(scope='module')
+def pipeline():
+    return build_pipeline('logreg')
+
+
+@pytest.fixture(scope='module')
+def scorer(pipeline):
+    scorer = CompiledLinearScorer.from_pipeline(pipeline)
+    assert scorer is not None
+    return scorer
+
+
+def _notebook_frame(raw):
+    """Preparación del notebook (log1p + categóricas a texto): lo que espera el Pipeline."""
+    df = raw.copy()
+    df['Log_MonthlyIncome'] = np.log1p(df['MonthlyIncome'])
+    df['Log_DistanceFromHome'] = np.log1p(df['DistanceFromHome'])
+    for col in CATEGORICAL_FEATURES:
+        df[col] = df[col].astype(str)
+    return df
+
+
+def test_matches_pipeline(scorer, pipeline):
+    assert scorer.matches(pipeline)
+
+
+@pytest.mark.parametrize('stock_dtype', ['int64', 'float64', 'str'])
+def test_batch_parity_with_raw_records(scorer, pipeline, stock_dtype):
+    raw = make_population(500, seed=7)
+    expected = pipeline.predict_proba(_notebook_frame(raw))[:, 1]
+
+    raw['StockOptionLevel'] = raw['StockOptionLevel'].astype(stock_dtype)
+    np.testing.assert_allclose(scorer.predict_proba(raw), expected, atol=1e-10)
+
+
+def test_single_record_parity(scorer, pipeline):
+    raw = make_population(20, seed=3)
+    expected = pipeline.predict_proba(_notebook_frame(raw))[:, 1]
+
+    for i, record in enumerate(raw.to_dict('records')):
+        record['StockOptionLevel'] = float(record['StockOptionLevel'])   # 1 -> 1.0, no '1.0'
+        assert scorer.predict_proba_one(record) == pytest.approx(expected[i], abs=1e-10)
+
+
+def test_unknown_category_scores_like_handle_unknown_ignore(scorer, pipeline):
+    raw = make_population(5, seed=1)
+    raw['JobRole'] = 'Chief Happiness Officer'
+    expected = pipeline.predict_proba(_notebook_frame(raw))[:, 1]
+    np.testing.assert_allclose(scorer.predict_proba(raw), expected, atol=1e-10)
+
+
+@pytest.mark.parametrize('container', ['recarray', 'structured', 'records'])
+def test_record_array_and_list_parity(scorer, pipeline, container):
+    raw = make_population(50, seed=5)
+    expected = pipeline.predict_proba(_notebook_frame(raw))[:, 1]
+
+    if container == 'records':
+        records = raw.to_dict('records')
+    else:
+        records = raw.to_records(index=False)
+        if container == 'structured':
+            records = records.view(np.ndarray)
+    np.testing.assert_allclose(scorer.predict_proba(records), expected, atol=1e-10)
@@ -0,0 +1,78 @@
+import numpy as np
+import pytest
+
+from benchmarks.pipelines import build_pipeline
+from benchmarks.synthetic import make_population
+from src.models.drift import DriftMonitor, DriftReference
+from src.models.schema import InputSchema
+
+
+@pytest.fixture(scope='module')
+def schema():
+    return InputSchema.from_pipeline(build_pipeline('logreg'))
+
+
+@pytest.fixture(scope='module')
+def reference(schema):
+    return DriftReference.fit(make_population(20000, seed=1), schema)
+
+
+def _report(reference, df, chunk_rows=None):
+    monitor = DriftMonitor(reference)
+    for start in range(0, len(df), chunk_rows or len(df)):
+        monitor.update(df.iloc[start:start + (chunk_rows or len(df))])
+    return monitor.report().set_index('Feature')
+
+
+def test_same_population_is_stable(reference):
+    report = _report(reference, make_population(20000, seed=2))
+    assert (report['Status'] == 'stable').all()
+    assert report['PSI'].max() < 0.02
+    assert report['KS'].dropna().max() < 0.05
+
+
+def test_shifted_feature_is_flagged(reference):
+    df = make_population(20000, seed=2)
+    df['MonthlyIncome'] = df['MonthlyIncome'] * 2
+    df['OverTime'] = 'Yes'
+    report = _report(reference, df)
+
+    for feature in ('MonthlyIncome', 'Log_MonthlyIncome', 'OverTime'):
+        assert report.loc[feature, 'Status'] == 'drift'
+    assert report.loc['MonthlyIncome', 'KS'] > 0.3
+    assert np.isnan(report.loc['OverTime', 'KS'])
+    assert report.loc['Age', 'Status'] == 'stable'
+    # El informe va de más a menos PSI
+    assert report['PSI'].is_monotonic_decreasing
+
+
+def test_chunked_updates_match_one_pass(reference):
+    df = make_population(5000, seed=3)
+    np.testing.assert_allclose(_report(reference, df, chunk_rows=777)['PSI'], _report(reference, df)['PSI'])
+
+
+def test_prepared_chunk_counts_like_raw(reference, schema):
+    df = make_population(3000, seed=4)
+    raw = _report(reference, df)
+    prepared = _report(reference, schema.prepare(df))
+    np.testing.assert_allclose(prepared['PSI'], raw['PSI'])
+
+
+def test_unknown_and_missing_values_go_to_last_bin(reference):
+    df = make_population(1000, seed=5)
+    df['Department'] = df['Department'].where(df.index >= 100, 'Legal')
+    df['Age'] = df['Age'].astype(object).where(df.index >= 250, 'n/a')
+    df = df.drop(columns=['JobRole'])
+    report = _report(reference, df)
+
+    assert report.loc['Department', 'Missing_Or_Unknown'] == pytest.approx(0.10)
+    assert report.loc['Age', 'Missing_Or_Unknown'] == pytest.approx(0.25)
+    assert report.loc['JobRole', 'Missing_Or_Unknown'] == 1.0
+
+
+def test_save_and_load_round_trip(reference, tmp_path):
+    loaded = DriftReference.load(reference.save(str(tmp_path / 'm.drift.json')))
+    df = make_population(2000, seed=6)
+    df['Age'] = df['Age'] + 10
+    np.testing.assert_allclose(_report(loaded, df)['PSI'], _report(reference, df)['PSI'])
+    assert loaded.rows == reference.rows == 20000
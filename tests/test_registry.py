@@ -0,0 +1,85 @@
+import os
+
+import joblib
+import numpy as np
+import pytest
+
+from benchmarks.pipelines import build_pipeline
+from benchmarks.synthetic import make_population
+from src.models.registry import ModelRegistry
+
+
+def _dump(models_dir, name, variant='logreg', seed=1):
+    path = os.path.join(models_dir, f'{name}.joblib')
+    joblib.dump(build_pipeline(variant, seed=seed), path)
+    return path
+
+
+def test_refresh_hot_swaps_changed_file(tmp_path):
+    path = _dump(tmp_path, 'churn_pipeline', seed=1)
+    registry = ModelRegistry(models_dir=str(tmp_path))
+    before = registry.get()
+    population = make_population(50, seed=3)
+    old_scores = before.predict_proba_batch(population)
+
+    _dump(tmp_path, 'churn_pipeline', seed=2)
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    assert registry.refresh() == ['churn_pipeline']
+
+    after = registry.get()
+    assert after is not before
+    assert after.model_fingerprint != before.model_fingerprint
+    # Quien aún tenga el loader anterior sigue puntuando con su modelo
+    np.testing.assert_array_equal(before.predict_proba_batch(population), old_scores)
+    assert registry.refresh() == []
+
+
+def test_refresh_drops_deleted_models_but_keeps_champion(tmp_path):
+    champion_path = _dump(tmp_path, 'churn_pipeline')
+    other_path = _dump(tmp_path, 'churn_rf', variant='random_forest')
+    registry = ModelRegistry(models_dir=str(tmp_path))
+    assert registry.names() == ['churn_pipeline', 'churn_rf']
+
+    os.remove(other_path)
+    os.remove(champion_path)
+    assert registry.refresh() == ['churn_rf']
+    assert registry.names() == ['churn_pipeline']
+    with pytest.raises(FileNotFoundError):
+        registry.get('churn_rf')
+
+
+def test_enable_cache_without_champion_file(tmp_path):
+    _dump(tmp_path, 'churn_other')
+    registry = ModelRegistry(models_dir=str(tmp_path))
+    assert registry.enable_cache(str(tmp_path / 'cache.sqlite')) is None
+    # Las versiones que se cargan después heredan la caché
+    assert registry.get('churn_other').cache is not None
+
+    registry.set_champion('churn_other')
+    assert registry.enable_cache(str(tmp_path / 'cache.sqlite')) is registry.get().cache
+
+
+def test_shadow_score_matches_each_model(tmp_path):
+    _dump(tmp_path, 'churn_pipeline', variant='logreg')
+    _dump(tmp_path, 'churn_xgb', variant='xgboost')
+    registry = ModelRegistry(models_dir=str(tmp_path), challenger='churn_xgb')
+    population = make_population(200, seed=4)
+
+    scores, summary = registry.shadow_score(population, threshold=0.5)
+
+    np.testing.assert_allclose(scores['Champion_Probability'],
+                               registry.get().predict_proba_batch(population), rtol=1e-6)
+    np.testing.assert_allclose(scores['Challenger_Probability'],
+                               registry.get('churn_xgb').predict_proba_batch(population), rtol=1e-6)
+    np.testing.assert_allclose(scores['Difference'],
+                               scores['Challenger_Probability'] - scores['Champion_Probability'])
+    assert summary['rows'] == 200 and summary['shared'] in ('matrix', 'prepared')
+    assert 0.0 <= summary['agreement'] <= 1.0
+    assert summary['champion_at_risk'] == int((scores['Champion_Probability'] >= 0.5).sum())
+
+
+def test_shadow_score_requires_challenger(tmp_path):
+    _dump(tmp_path, 'churn_pipeline')
+    with pytest.raises(ValueError, match="retador"):
+        ModelRegistry(models_dir=str(tmp_path)).shadow_score(make_population(5))
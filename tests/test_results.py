@@ -0,0 +1,44 @@
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.models.results import BatchResults
+
+TIED = [.1, .9, .5, .9, .3, .7, .95, .2, .6, .9]
+
+
+def _results(probabilities):
+    df = pd.DataFrame({'EmployeeNumber': np.arange(len(probabilities)) + 100})
+    return BatchResults(df, probabilities)
+
+
+def _expected_order(probabilities, threshold):
+    frame = pd.DataFrame({'p': probabilities})
+    return frame[frame['p'] >= threshold].sort_values('p', ascending=False, kind='stable').index.tolist()
+
+
+def test_pages_with_ties_are_disjoint_and_ordered():
+    results = _results(TIED)
+    pages = [results.page(i, 3, threshold=0.5)['EmployeeNumber'].tolist()
+             for i in range(results.n_pages(3, threshold=0.5))]
+    assert [p - 100 for page in pages for p in page] == [6, 1, 3, 9, 5, 8, 2]
+    assert [len(page) for page in pages] == [3, 3, 1]
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_top_positions_match_stable_sort(seed):
+    rng = np.random.default_rng(seed)
+    probabilities = rng.integers(0, 8, size=500) / 8   # muchos empates
+    results = _results(probabilities)
+    expected = _expected_order(probabilities, 0.25)
+    for k in (1, 7, 50, 200, len(expected), len(expected) + 10):
+        assert results.top_positions(k, threshold=0.25).tolist() == expected[:k]
+
+
+def test_report_matches_pages():
+    results = _results(TIED)
+    report = pd.read_csv(io.BytesIO(results.report_bytes(0.5)))
+    assert (report['EmployeeNumber'] - 100).tolist() == [6, 1, 3, 9, 5, 8, 2]
+    assert report['Churn_Prediction'].eq(1).all()
@@ -0,0 +1,100 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.models.risk_store import RiskStore
+
+
+class _AgeModel:
+    """Riesgo = Age / 100; cuenta cuántas filas puntúa."""
+    model_fingerprint = 'age-v1'
+
+    def __init__(self):
+        self.scored = 0
+
+    def required_columns(self):
+        return ['Age']
+
+    def predict_proba_batch(self, df, use_cache=True):
+        self.scored += len(df)
+        return df['Age'].to_numpy(dtype=np.float64) / 100
+
+
+def _upload(ages: dict) -> pd.DataFrame:
+    return pd.DataFrame({'EmployeeNumber': list(ages), 'Age': list(ages.values())})
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = RiskStore(str(tmp_path / 'risk.sqlite'))
+    yield store
+    store.close()
+
+
+def test_ingest_rescores_only_new_or_changed_rows(store):
+    model = _AgeModel()
+    first = store.ingest(_upload({1: 30, 2: 40}), model, snapshot_date='2024-01-01')
+    assert first['Risk_Status'].tolist() == ['new', 'new']
+
+    second = store.ingest(_upload({1: 30, 2: 55, 3: 20}), model, snapshot_date='2024-02-01')
+    assert second['Risk_Status'].tolist() == ['unchanged', 'changed', 'new']
+    assert second['Churn_Probability'].tolist() == pytest.approx([0.30, 0.55, 0.20])
+    assert model.scored == 2 + 2
+
+    history = store.history(2)
+    assert history['snapshot_date'].tolist() == ['2024-01-01', '2024-02-01']
+    assert np.isnan(history['delta'].iloc[0]) and history['delta'].iloc[1] == pytest.approx(0.15)
+
+
+def test_backfill_keeps_latest_and_deltas_follow_dates(store):
+    model = _AgeModel()
+    store.ingest(_upload({1: 60}), model, snapshot_date='2024-03-01')
+    store.ingest(_upload({1: 40}), model, snapshot_date='2024-01-01')
+
+    # El último estado sigue siendo el de marzo: la carga de enero no lo pisa
+    again = store.ingest(_upload({1: 60}), model, snapshot_date='2024-04-01')
+    assert again['Risk_Status'].tolist() == ['unchanged']
+
+    history = store.history(1)
+    assert history['snapshot_date'].tolist() == ['2024-01-01', '2024-03-01']
+    assert np.isnan(history['delta'].iloc[0])
+    assert history['delta'].iloc[1] == pytest.approx(0.20)
+
+
+def test_same_day_revert_is_no_change(store):
+    model = _AgeModel()
+    store.ingest(_upload({1: 33}), model, snapshot_date='2024-01-01')
+    store.ingest(_upload({1: 71}), model, snapshot_date='2024-02-01')
+    store.ingest(_upload({1: 33}), model, snapshot_date='2024-02-01')
+
+    assert store.history(1)['delta'].iloc[-1] == 0.0
+    assert store.changes('2024-02-01', min_delta=0).empty
+
+
+@pytest.mark.parametrize('bad_id', [np.nan, 'abc', 1.5])
+def test_invalid_employee_numbers_raise_clear_error(store, bad_id):
+    upload = pd.DataFrame({'EmployeeNumber': [1, bad_id], 'Age': [30, 40]})
+    with pytest.raises(ValueError, match="EmployeeNumber' debe ser un número entero"):
+        store.ingest(upload, _AgeModel(), snapshot_date='2024-01-01')
+
+
+def test_numeric_text_ids_are_accepted_and_duplicates_rejected(store):
+    scored = store.ingest(_upload({'7': 30}), _AgeModel(), snapshot_date='2024-01-01')
+    assert store.history(7)['probability'].tolist() == pytest.approx([0.30])
+    assert scored['Risk_Status'].tolist() == ['new']
+    with pytest.raises(ValueError, match="duplicados"):
+        store.ingest(pd.DataFrame({'EmployeeNumber': ['7', 7], 'Age': [1, 2]}), _AgeModel())
+
+
+def test_risers_compare_with_point_before_window(store):
+    model = _AgeModel()
+    store.ingest(_upload({1: 30, 2: 30, 3: 50}), model, snapshot_date='2024-01-15')
+    store.ingest(_upload({1: 60, 2: 35, 3: 50}), model, snapshot_date='2024-02-10')
+    store.ingest(_upload({1: 65, 2: 35, 3: 50}), model, snapshot_date='2024-02-20')
+
+    risers = store.risers(points=0.20, since='2024-02-01')
+    assert risers['EmployeeNumber'].tolist() == [1]
+    assert risers['Change'].iloc[0] == pytest.approx(0.35)
+
+    changes = store.changes('2024-02-01', min_delta=0.1)
+    assert changes['employee_number'].tolist() == [1]
@@ -0,0 +1,73 @@
+import joblib
+import numpy as np
+import pytest
+
+from benchmarks.pipelines import build_pipeline
+from benchmarks.synthetic import make_population
+from src.models.inference import ModelLoader
+from src.models.schema import InputSchema, SchemaValidationError
+
+
+@pytest.fixture(scope='module')
+def pipeline():
+    return build_pipeline('logreg')
+
+
+@pytest.fixture(scope='module')
+def compiled_loader(pipeline, tmp_path_factory):
+    path = tmp_path_factory.mktemp('models') / 'logreg.joblib'
+    joblib.dump(pipeline, path)
+    loader = ModelLoader(compiled=True, model_path=str(path)).warm_up()
+    assert loader.compiled_scorer is not None
+    return loader
+
+
+@pytest.mark.parametrize('path', ['single', 'batch'])
+def test_compiled_path_reports_missing_column(compiled_loader, path):
+    record = make_population(1).drop(columns='MonthlyIncome').iloc[0].to_dict()
+    with pytest.raises(SchemaValidationError) as e:
+        if path == 'single':
+            compiled_loader.predict(record)
+        else:
+            compiled_loader.predict_proba_batch(make_population(3).drop(columns='MonthlyIncome'))
+    assert e.value.errors['column'].tolist() == ['MonthlyIncome']
+
+
+@pytest.mark.parametrize('path', ['single', 'batch'])
+def test_compiled_path_rejects_empty_age(compiled_loader, path):
+    df = make_population(3)
+    df['Age'] = df['Age'].astype(float)
+    df.loc[1, 'Age'] = np.nan
+    with pytest.raises(SchemaValidationError) as e:
+        if path == 'single':
+            compiled_loader.predict(df.iloc[1].to_dict())
+        else:
+            compiled_loader.predict_proba_batch(df)
+    assert e.value.errors['error'].tolist() == ["valor vacío"]
+
+
+def test_compiled_and_pipeline_paths_agree(compiled_loader, pipeline, tmp_path):
+    path = tmp_path / 'logreg.joblib'
+    joblib.dump(pipeline, path)
+    df = make_population(200, seed=11)
+    expected = ModelLoader(model_path=str(path)).predict_proba_batch(df.copy())
+    np.testing.assert_allclose(compiled_loader.predict_proba_batch(df.copy()), expected, atol=1e-10)
+
+
+def test_unknown_categories_are_reported(pipeline, capsys):
+    schema = InputSchema.from_pipeline(pipeline)
+    df = make_population(4)
+    df.loc[2, 'JobRole'] = 'Chief Happiness Officer'
+
+    prepared = schema.prepare(df)
+    assert prepared['JobRole'].cat.codes.tolist()[2] == -1
+    assert 'JobRole: 1 filas' in capsys.readouterr().out
+
+    errors = schema.validate(df)
+    assert errors[['row', 'column', 'value']].values.tolist() == [[2, 'JobRole', 'Chief Happiness Officer']]
+
+    with pytest.raises(SchemaValidationError):
+        schema.prepare(df, unknown='error')
+
+    schema.prepare(df, unknown='ignore')
+    assert capsys.readouterr().out == ''